@@ -37,7 +37,7 @@ args = parser.parse_args()
 # Load the font with the parts of fonttools that are imported with the line:
 # from fontTools.ttLib import TTFont
 # Docs Link: https://fonttools.readthedocs.io/en/latest/ttLib/ttFont.html
-ttFont = TTFont(FONT_PATH)
+ttFont = TTFont(FONT_PATH, lazy=True)
 
 # Constants that are worked out dynamically
 MY_URL = subprocess.check_output("git remote get-url origin", shell=True).decode()
@@ -1,12 +1,14 @@
 import path from "node:path";
-import Image from "next/image";
 import { Fragment } from "react";
 import { StatusBadge } from "@/components/StatusBadge";
 import { PlatformIcons } from "@/components/PlatformIcons";
 import { FailMessage } from "@/components/FailMessage";
 import { DisclosureLink } from "@/components/DisclosureLink";
 import { IconKeys } from "@/components/IconKey";
+import { ScreenshotPicture } from "@/components/ScreenshotPicture";
 import {
+  getScreenshotUrls,
+  getScreenshotVariants,
   getTestGroups,
   sortHtmls,
   sortPngs,
@@ -29,6 +31,8 @@ function groupLabel(groupName: string) {
 
 export default async function TestsPage() {
   const groups = await getTestGroups();
+  const screenshotUrls = await getScreenshotUrls();
+  const screenshotVariants = await getScreenshotVariants();
 
   const tocGroups: TocGroup[] = groups.map(([groupName, { htmls }]) => ({
     id: groupName,
@@ -85,7 +89,8 @@ export default async function TestsPage() {
                           <ul>
                             {screenshots.map((png) => {
                               const pngUrl = addBasePath(
-                                `/tests/static/${groupName}/${png}`,
+                                screenshotUrls[`${groupName}/${png}`] ??
+                                  `/tests/static/${groupName}/${png}`,
                               );
                               const pngName = path.parse(png).name;
                               const failMd = `${pngName}.fail.md`;
@@ -108,13 +113,14 @@ export default async function TestsPage() {
                                         browser={browser}
                                       />
                                       <a href={pngUrl} className="pl-9">
-                                        <Image
+                                        <ScreenshotPicture
                                           src={pngUrl}
                                           alt={png}
-                                          width={1440}
-                                          height={400}
-                                          unoptimized
-                                          className="block w-full h-auto"
+                                          variants={
+                                            screenshotVariants[
+                                              `${groupName}/${png}`
+                                            ]
+                                          }
                                         />
                                       </a>
                                     </div>
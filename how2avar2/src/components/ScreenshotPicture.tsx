@@ -0,0 +1,50 @@
+import Image from "next/image";
+// see the notes on addBasePath in src/app/tests/page.tsx
+import { addBasePath } from "next/dist/client/add-base-path.js";
+import type { ScreenshotVariant } from "@/utils/testFiles";
+
+// preferred formats first, the browser picks the first it supports
+const formatOrder = ["avif", "webp"];
+
+export function ScreenshotPicture({
+  src,
+  alt,
+  variants = [],
+}: {
+  src: string;
+  alt: string;
+  variants?: ScreenshotVariant[];
+}) {
+  const image1x = variants.find((variant) => variant.variant === "1x");
+  const image = (
+    <Image
+      src={src}
+      alt={alt}
+      width={image1x?.width ?? 1440}
+      height={image1x?.height ?? 400}
+      unoptimized
+      className="block w-full h-auto"
+    />
+  );
+  if (variants.length === 0) return image;
+
+  const formats = formatOrder.filter((format) =>
+    variants.some((variant) => variant.format === format),
+  );
+  return (
+    <picture>
+      {formats.map((format) => (
+        <source
+          key={format}
+          type={`image/${format}`}
+          sizes="100vw"
+          srcSet={variants
+            .filter((variant) => variant.format === format)
+            .map((variant) => `${addBasePath(variant.url)} ${variant.width}w`)
+            .join(", ")}
+        />
+      ))}
+      {image}
+    </picture>
+  );
+}
@@ -1,4 +1,4 @@
-import { glob } from "node:fs/promises";
+import { glob, readFile } from "node:fs/promises";
 import path from "node:path";
 import sortOn from "sort-on";
 import type { Status } from "@/utils/statuses";
@@ -6,6 +6,63 @@ import type { Status } from "@/utils/statuses";
 type FileGroup = { htmls: string[]; pngs: string[]; mds: string[] };
 
 export const testsDirectory = path.resolve("public/tests/static");
+// screenshots stored once per unique image by scripts/screenshot-store.py
+export const screenshotsDirectory = path.resolve("public/tests/screenshots");
+
+type Manifest = { screenshots: Record<string, string> };
+
+async function loadManifest(): Promise<Manifest> {
+  const manifestPath = path.join(screenshotsDirectory, "manifest.json");
+  const text = await readFile(manifestPath, "utf8").catch((error) => {
+    if (error.code === "ENOENT") return undefined;
+    throw error;
+  });
+  return text ? JSON.parse(text) : { screenshots: {} };
+}
+
+// URL of each packed screenshot by `<group>/<name>.png`, the same for
+// identical images so that they are downloaded once
+export async function getScreenshotUrls(): Promise<Record<string, string>> {
+  const { screenshots } = await loadManifest();
+  return Object.fromEntries(
+    Object.entries(screenshots).map(([name, hash]) => [
+      name,
+      `/tests/screenshots/blobs/${hash}.png`,
+    ]),
+  );
+}
+
+// lighter variants generated by scripts/screenshot-thumbnails.py
+export const thumbnailsDirectory = path.resolve("public/tests/thumbnails");
+
+export type ScreenshotVariant = {
+  variant: "2x" | "1x" | "thumb";
+  format: string;
+  width: number;
+  height: number;
+  url: string;
+};
+
+type ThumbnailsManifest = Record<
+  string,
+  { hash: string; variants: ScreenshotVariant[] }
+>;
+
+// variants of each screenshot by `<group>/<name>.png`, empty until the
+// thumbnails are generated
+export async function getScreenshotVariants(): Promise<
+  Record<string, ScreenshotVariant[]>
+> {
+  const manifestPath = path.join(thumbnailsDirectory, "manifest.json");
+  const text = await readFile(manifestPath, "utf8").catch((error) => {
+    if (error.code === "ENOENT") return undefined;
+    throw error;
+  });
+  const manifest: ThumbnailsManifest = text ? JSON.parse(text) : {};
+  return Object.fromEntries(
+    Object.entries(manifest).map(([name, { variants }]) => [name, variants]),
+  );
+}
 
 const fileGroupKey = (fileName: string): keyof FileGroup => {
   if (fileName.endsWith(".html")) return "htmls";
@@ -17,6 +74,10 @@ export async function getTestGroups(): Promise<[string, FileGroup][]> {
   const files = await Array.fromAsync(
     glob("**/*.{html,png,fail.md}", { cwd: testsDirectory }),
   );
+  const { screenshots } = await loadManifest();
+  for (const name of Object.keys(screenshots)) {
+    if (!files.includes(name)) files.push(name);
+  }
   const grouped = files.reduce<Record<string, FileGroup>>((acc, file) => {
     const [groupName, fileName] = file.split("/");
     acc[groupName] ??= { htmls: [], pngs: [], mds: [] };
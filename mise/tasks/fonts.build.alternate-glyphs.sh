@@ -1,41 +1,47 @@
 #!/usr/bin/env bash
 # [MISE] depends=["fonts.setup"]
-# [MISE] sources=["scripts/fix-axis-bounds.py", "scripts/rename-fonts.py", "sources/alternate-glyphs/config*.yaml", "sources/alternate-glyphs/*.glyphspackage", "sources/alternate-glyphs/*.fea", "sources/designspaces/*.designspace"]
+# [MISE] sources=["scripts/build-timer.py", "scripts/dedupe-instances.py", "scripts/fix-axis-bounds.py", "scripts/rename-fonts.py", "sources/alternate-glyphs/config*.yaml", "sources/alternate-glyphs/*.glyphspackage", "sources/alternate-glyphs/*.fea", "sources/designspaces/*.designspace"]
 # [MISE] outputs=["fonts/alternate-glyphs/**/*"]
 
 set -euo pipefail
 
+# record the time, CPU, memory and output bytes of each step in out/build-timings
+step() { ./scripts/build-timer.py run alternate-glyphs --watch ./fonts/alternate-glyphs -- "$@"; }
+./scripts/build-timer.py start alternate-glyphs
+
 rm -rf ./fonts/alternate-glyphs
 
 # build base font
-gftools builder ./sources/alternate-glyphs/config-alternate-glyphs.yaml
+step gftools builder ./sources/alternate-glyphs/config-alternate-glyphs.yaml
 
 # opentype mappings https://learn.microsoft.com/en-us/typography/opentype/spec/os2#usweightclass
 
 # fix opentype features
-fonttools feaLib "./sources/alternate-glyphs/variable-font-substitutions.fea" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" -o "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf"
+step fonttools feaLib "./sources/alternate-glyphs/variable-font-substitutions.fea" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" -o "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf"
 
 # fix opsz axis
-./scripts/fix-axis-bounds.py --inplace --axis opsz --min 6 --max 144 "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf"
+step ./scripts/fix-axis-bounds.py --inplace --axis opsz --min 6 --max 144 "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf"
 
 # create Avar1 demo with axis mappings
-fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar1[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar1.designspace"
-./scripts/rename-fonts.py --inplace --suffix " Avar1" "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar1[opsz,wdth,wght].ttf"
+step fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar1[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar1.designspace"
+step ./scripts/rename-fonts.py --inplace --suffix " Avar1" "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar1[opsz,wdth,wght].ttf"
 
 # create Avar2 demo with axis mappings
-fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar2[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar2.designspace"
-./scripts/rename-fonts.py --inplace --suffix " Avar2" "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar2[opsz,wdth,wght].ttf"
+step fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar2[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar2.designspace"
+step ./scripts/rename-fonts.py --inplace --suffix " Avar2" "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar2[opsz,wdth,wght].ttf"
 
 # create Avar2 demo with fences
-fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar2Fences.designspace"
-./scripts/rename-fonts.py --inplace --suffix " Fences Avar2" "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf"
+step fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar2Fences.designspace"
+step ./scripts/rename-fonts.py --inplace --suffix " Fences Avar2" "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf"
 
 # create instances of the fences font
-fonttools varLib.instancer "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" wght=1000 wdth=75 opsz=16 -o "./fonts/alternate-glyphs/AlternateGlyphsFencesBlackCondensed.ttf"
-./scripts/rename-fonts.py --inplace --suffix " Black Condensed" "./fonts/alternate-glyphs/AlternateGlyphsFencesBlackCondensed.ttf"
-fonttools varLib.instancer "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" wght=400 wdth=100 opsz=16 -o "./fonts/alternate-glyphs/AlternateGlyphsFencesDefault.ttf"
-./scripts/rename-fonts.py --inplace --suffix " Default" "./fonts/alternate-glyphs/AlternateGlyphsFencesDefault.ttf"
+step ./scripts/dedupe-instances.py instance "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" wght=1000 wdth=75 opsz=16 -o "./fonts/alternate-glyphs/AlternateGlyphsFencesBlackCondensed.ttf"
+step ./scripts/rename-fonts.py --inplace --suffix " Black Condensed" "./fonts/alternate-glyphs/AlternateGlyphsFencesBlackCondensed.ttf"
+step ./scripts/dedupe-instances.py instance "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" wght=400 wdth=100 opsz=16 -o "./fonts/alternate-glyphs/AlternateGlyphsFencesDefault.ttf"
+step ./scripts/rename-fonts.py --inplace --suffix " Default" "./fonts/alternate-glyphs/AlternateGlyphsFencesDefault.ttf"
 
 # create Avar2 demo with optical size
-fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsOpticalSizeAvar2[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar2OpticalSize.designspace"
-./scripts/rename-fonts.py --inplace --suffix " Optical Size Avar2" "./fonts/alternate-glyphs/variable/AlternateGlyphsOpticalSizeAvar2[opsz,wdth,wght].ttf"
+step fonttools varLib.avar.build -o "./fonts/alternate-glyphs/variable/AlternateGlyphsOpticalSizeAvar2[opsz,wdth,wght].ttf" "./fonts/alternate-glyphs/variable/AlternateGlyphs[opsz,wdth,wght].ttf" "./sources/designspaces/avar2OpticalSize.designspace"
+step ./scripts/rename-fonts.py --inplace --suffix " Optical Size Avar2" "./fonts/alternate-glyphs/variable/AlternateGlyphsOpticalSizeAvar2[opsz,wdth,wght].ttf"
+
+./scripts/build-timer.py report alternate-glyphs
@@ -1,10 +1,16 @@
 #!/usr/bin/env bash
 # [MISE] depends=["fonts.setup"]
-# [MISE] sources=["./sources/linear-rotation/config*.yaml", "./sources/linear-rotation/*.glyphspackage"]
+# [MISE] sources=["scripts/build-timer.py", "./sources/linear-rotation/config*.yaml", "./sources/linear-rotation/*.glyphspackage"]
 # [MISE] outputs=["fonts/linear-rotation/**/*"]
 
 set -euo pipefail
 
+# record the time, CPU, memory and output bytes of each step in out/build-timings
+step() { ./scripts/build-timer.py run linear-rotation --watch ./fonts/linear-rotation -- "$@"; }
+./scripts/build-timer.py start linear-rotation
+
 rm -rf ./fonts/linear-rotation
 
-gftools builder ./sources/linear-rotation/config-linear-rotation.yaml
+step gftools builder ./sources/linear-rotation/config-linear-rotation.yaml
+
+./scripts/build-timer.py report linear-rotation
@@ -1,21 +1,27 @@
 #!/usr/bin/env bash
 # [MISE] depends=["fonts.setup"]
-# [MISE] sources=["scripts/fix-axis-bounds.py", "scripts/avar1-quadratic-rotation.py", "sources/quadratic-rotation/config*.yaml", "sources/quadratic-rotation/*.glyphspackage", "sources/quadratic-rotation/*.designspace"]
+# [MISE] sources=["scripts/build-timer.py", "scripts/fix-axis-bounds.py", "scripts/avar1-quadratic-rotation.py", "sources/quadratic-rotation/config*.yaml", "sources/quadratic-rotation/*.glyphspackage", "sources/quadratic-rotation/*.designspace"]
 # [MISE] outputs=["fonts/quadratic-rotation/**/*"]
 
 set -euo pipefail
 
+# record the time, CPU, memory and output bytes of each step in out/build-timings
+step() { ./scripts/build-timer.py run quadratic-rotation --watch ./fonts/quadratic-rotation -- "$@"; }
+./scripts/build-timer.py start quadratic-rotation
+
 rm -rf ./fonts/quadratic-rotation
 
-gftools builder ./sources/quadratic-rotation/config-quadratic-rotation.yaml
+step gftools builder ./sources/quadratic-rotation/config-quadratic-rotation.yaml
 
 # fix ZROT axis
-./scripts/fix-axis-bounds.py --inplace --axis ZROT --min 0 --max 90 "./fonts/quadratic-rotation/variable/QuadraticRotation[AAAA,BBBB,ZROT].ttf"
+step ./scripts/fix-axis-bounds.py --inplace --axis ZROT --min 0 --max 90 "./fonts/quadratic-rotation/variable/QuadraticRotation[AAAA,BBBB,ZROT].ttf"
 
 # create Avar1 demo with quadratic rotation
-python3 ./scripts/avar1-quadratic-rotation.py
-./scripts/rename-fonts.py --inplace --suffix " Avar1" "./fonts/quadratic-rotation/variable/QuadraticRotation[ZROT].ttf"
+step python3 ./scripts/avar1-quadratic-rotation.py
+step ./scripts/rename-fonts.py --inplace --suffix " Avar1" "./fonts/quadratic-rotation/variable/QuadraticRotation[ZROT].ttf"
 
 # create Avar2 demo with quadratic rotation
-fonttools varLib.avar.build -o "./fonts/quadratic-rotation/variable/QuadraticRotationAvar2[AAAA,BBBB,ZROT].ttf" "./fonts/quadratic-rotation/variable/QuadraticRotation[AAAA,BBBB,ZROT].ttf" "./sources/quadratic-rotation/avar2QuadraticRotation.designspace"
-./scripts/rename-fonts.py --inplace --suffix " Avar2" "./fonts/quadratic-rotation/variable/QuadraticRotationAvar2[AAAA,BBBB,ZROT].ttf"
+step fonttools varLib.avar.build -o "./fonts/quadratic-rotation/variable/QuadraticRotationAvar2[AAAA,BBBB,ZROT].ttf" "./fonts/quadratic-rotation/variable/QuadraticRotation[AAAA,BBBB,ZROT].ttf" "./sources/quadratic-rotation/avar2QuadraticRotation.designspace"
+step ./scripts/rename-fonts.py --inplace --suffix " Avar2" "./fonts/quadratic-rotation/variable/QuadraticRotationAvar2[AAAA,BBBB,ZROT].ttf"
+
+./scripts/build-timer.py report quadratic-rotation
@@ -1,7 +1,7 @@
 #!/usr/bin/env bash
 # [MISE] description="Generate font images"
 # [MISE] depends=["fonts.build"]
-# [MISE] sources=["fonts/**/*", "documentation/*.py"]
+# [MISE] sources=["fonts/**/*", "documentation/*.py", "documentation/specimens.toml", "scripts/render-specimens.py", "scripts/specimens.py"]
 # [MISE] outputs=["documentation/*.png"]
 # [USAGE] arg "[image-stem]" help="Image filename stem"
 
@@ -17,9 +17,15 @@ if [[ -n "$image_stem" ]]; then
     image_stem="${image_stem%.py}"
     image_stem="${image_stem%.png}"
 
-    python3 "documentation/$image_stem.py" --output "documentation/$image_stem.png"
+    if [[ -f "documentation/$image_stem.py" ]]; then
+        python3 "documentation/$image_stem.py" --output "documentation/$image_stem.png"
+    else
+        # specimens of documentation/specimens.toml, e.g. image5-TestFont
+        python3 scripts/render-specimens.py "${image_stem%%-*}"
+    fi
 else
     while IFS= read -r -d '' file; do
         python3 "$file" --output "${file%.py}.png"
     done < <(find "./documentation" -type f -name '*.py' -print0)
+    python3 scripts/render-specimens.py
 fi
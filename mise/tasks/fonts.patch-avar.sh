@@ -0,0 +1,37 @@
+#!/usr/bin/env bash
+# [MISE] description="Patch the avar tables of built fonts after designspace-only edits"
+# [MISE] sources=["scripts/patch-avar.py", "sources/designspaces/*.designspace", "sources/quadratic-rotation/*.designspace"]
+
+# Faster than fonts.build when only axis mappings changed: the avar tables of
+# the built fonts are replaced in place and their static instances refreshed.
+# Fails when the designspace axes changed, which needs a full fonts.build.
+
+set -euo pipefail
+
+# test font
+./scripts/patch-avar.py "./sources/designspaces/avar1.designspace" "./fonts/test-font/variable/TestFontAvar1[opsz,wdth,wght].ttf"
+./scripts/patch-avar.py "./sources/designspaces/avar2.designspace" "./fonts/test-font/variable/TestFontAvar2[opsz,wdth,wght].ttf"
+./scripts/patch-avar.py "./sources/designspaces/avar2Fences.designspace" "./fonts/test-font/variable/TestFontFencesAvar2[opsz,wdth,wght].ttf" \
+  --instance "./fonts/test-font/TestFontFencesBlackCondensed.ttf" wght=900 wdth=75 opsz=16 \
+  --instance "./fonts/test-font/TestFontFencesDefault.ttf" wght=400 wdth=100 opsz=16
+./scripts/patch-avar.py "./sources/designspaces/avar2OpticalSize.designspace" "./fonts/test-font/variable/TestFontOpticalSizeAvar2[opsz,wdth,wght].ttf" \
+  --instance "./fonts/test-font/TestFontOpticalSizeRegularCaption.ttf" wght=400 wdth=100 opsz=6 \
+  --instance "./fonts/test-font/TestFontOpticalSizeRegularText.ttf" wght=400 wdth=100 opsz=16 \
+  --instance "./fonts/test-font/TestFontOpticalSizeRegularCinema.ttf" wght=400 wdth=100 opsz=144 \
+  --instance "./fonts/test-font/TestFontOpticalSizeThinExpandedCaption.ttf" wght=100 wdth=125 opsz=6 \
+  --instance "./fonts/test-font/TestFontOpticalSizeThinExpandedText.ttf" wght=100 wdth=125 opsz=16 \
+  --instance "./fonts/test-font/TestFontOpticalSizeThinExpandedCinema.ttf" wght=100 wdth=125 opsz=144 \
+  --instance "./fonts/test-font/TestFontOpticalSizeBlackCondensedCaption.ttf" wght=900 wdth=75 opsz=6 \
+  --instance "./fonts/test-font/TestFontOpticalSizeBlackCondensedText.ttf" wght=900 wdth=75 opsz=16 \
+  --instance "./fonts/test-font/TestFontOpticalSizeBlackCondensedCinema.ttf" wght=900 wdth=75 opsz=144
+
+# alternate glyphs
+./scripts/patch-avar.py "./sources/designspaces/avar1.designspace" "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar1[opsz,wdth,wght].ttf"
+./scripts/patch-avar.py "./sources/designspaces/avar2.designspace" "./fonts/alternate-glyphs/variable/AlternateGlyphsAvar2[opsz,wdth,wght].ttf"
+./scripts/patch-avar.py "./sources/designspaces/avar2Fences.designspace" "./fonts/alternate-glyphs/variable/AlternateGlyphsFencesAvar2[opsz,wdth,wght].ttf" \
+  --instance "./fonts/alternate-glyphs/AlternateGlyphsFencesBlackCondensed.ttf" wght=1000 wdth=75 opsz=16 \
+  --instance "./fonts/alternate-glyphs/AlternateGlyphsFencesDefault.ttf" wght=400 wdth=100 opsz=16
+./scripts/patch-avar.py "./sources/designspaces/avar2OpticalSize.designspace" "./fonts/alternate-glyphs/variable/AlternateGlyphsOpticalSizeAvar2[opsz,wdth,wght].ttf"
+
+# quadratic rotation
+./scripts/patch-avar.py "./sources/quadratic-rotation/avar2QuadraticRotation.designspace" "./fonts/quadratic-rotation/variable/QuadraticRotationAvar2[AAAA,BBBB,ZROT].ttf"
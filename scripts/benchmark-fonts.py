@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+
+"""Script to benchmark the runtime cost of variable fonts with and without avar.
+
+Each font is measured over a fixed grid of design locations, `--steps` values
+per axis from the minimum to the maximum plus the default, in these stages:
+
+- `normalize`: default normalization of the design location with `fvar`,
+- `avar`: mapping of the normalized location by `avar` (avar1 segment maps
+  and avar2 delta sets), skipped for fonts without `avar`,
+- `gvar`: applying the `gvar` deltas to every glyph at the mapped location,
+- `hvar`: applying the `HVAR` deltas to every advance width,
+- `harfbuzz`: setting the design location of a HarfBuzz font and shaping
+  every character of the `cmap`, i.e. the cost of one layout,
+- `instance`: `instantiateVariableFont` at the default and at the minimum and
+  maximum corners.
+
+Times are the fastest average over `--repeats` runs of at least 50 ms, in
+nanoseconds per location (per instance for `instance`). Fonts without `avar` in the same
+directory and with the same axes are used as the base of the others, e.g.
+`TestFont[opsz,wdth,wght].ttf` for `TestFontAvar2[opsz,wdth,wght].ttf`, and
+the summary shows the overhead of each stage over the base.
+
+With `--baseline`, stages slower than the baseline by more than `--threshold`
+are reported as regressions and the script exits with an error. Times depend
+on the machine, so the baseline isn't committed: when it doesn't exist yet,
+the results are saved as the baseline, as with `--update-baseline`, e.g.
+
+    ./scripts/benchmark-fonts.py --report out/benchmark.json \\
+      --baseline out/benchmark-baseline.json fonts/*/variable/*.ttf
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import platform
+import sys
+import time
+from pathlib import Path
+
+import fontTools
+import uharfbuzz as hb
+from fontTools.pens.basePen import NullPen
+from fontTools.ttLib import TTFont
+from fontTools.varLib.instancer import instantiateVariableFont
+from fontTools.varLib.models import normalizeLocation
+from fontTools.varLib.varStore import VarStoreInstancer
+
+logger = logging.getLogger()
+
+REPORT_VERSION = 1
+GRID_STEPS = 5
+BENCHMARK_REPEATS = 5
+MIN_RUN_NS = 50_000_000
+THRESHOLD = 0.25
+STAGES = ["normalize", "avar", "gvar", "hvar", "harfbuzz", "instance"]
+
+
+def design_grid(axes, steps):
+    """Return design locations covering the axes, including their defaults."""
+    values = []
+    for axis in axes:
+        axis_values = {
+            axis.minValue + (axis.maxValue - axis.minValue) * i / (steps - 1)
+            for i in range(steps)
+        }
+        axis_values.add(axis.defaultValue)
+        values.append(sorted(axis_values))
+    return [
+        {axis.axisTag: value for axis, value in zip(axes, location)}
+        for location in itertools.product(*values)
+    ]
+
+
+def instance_locations(axes):
+    return [
+        {axis.axisTag: axis.defaultValue for axis in axes},
+        {axis.axisTag: axis.minValue for axis in axes},
+        {axis.axisTag: axis.maxValue for axis in axes},
+    ]
+
+
+def timed(function, count, repeats):
+    """Return the fastest average time of `function` in ns per item of `count`.
+
+    Like `timeit`, the function is called enough times for each run to last
+    at least MIN_RUN_NS, so that short stages aren't dominated by noise.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= MIN_RUN_NS:
+            break
+        number *= 2
+    timings = [elapsed]
+    for _ in range(repeats - 1):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        timings.append(time.perf_counter_ns() - start)
+    return round(min(timings) / number / count)
+
+
+def benchmark_font(path, steps, repeats):
+    """Return the timings of each stage for a font, in ns."""
+    data = Path(path).read_bytes()
+    font = TTFont(path)
+    axes = font["fvar"].axes
+    triples = {
+        axis.axisTag: (axis.minValue, axis.defaultValue, axis.maxValue) for axis in axes
+    }
+    avar = font["avar"] if "avar" in font else None
+    glyph_order = font.getGlyphOrder()
+
+    locations = design_grid(axes, steps)
+    normalized = [normalizeLocation(location, triples) for location in locations]
+    mapped = [
+        avar.renormalizeLocation(location, font) if avar is not None else location
+        for location in normalized
+    ]
+
+    def normalize():
+        for location in locations:
+            normalizeLocation(location, triples)
+
+    def avar_mapping():
+        for location in normalized:
+            avar.renormalizeLocation(location, font)
+
+    pen = NullPen()
+    glyph_sets = [
+        font.getGlyphSet(location=location, normalized=True) for location in mapped
+    ]
+
+    def gvar():
+        for glyph_set in glyph_sets:
+            for name in glyph_order:
+                glyph_set[name].draw(pen)
+
+    hvar = font["HVAR"].table if "HVAR" in font else None
+
+    def hvar_deltas():
+        for location in mapped:
+            instancer = VarStoreInstancer(hvar.VarStore, axes, location)
+            for gid, name in enumerate(glyph_order):
+                if hvar.AdvWidthMap is not None:
+                    instancer[hvar.AdvWidthMap.mapping[name]]
+                else:
+                    instancer[gid]
+
+    hb_font = hb.Font(hb.Face(data))
+    text = "".join(chr(codepoint) for codepoint in sorted(font.getBestCmap()))
+
+    def harfbuzz():
+        for location in locations:
+            hb_font.set_variations(location)
+            buffer = hb.Buffer()
+            buffer.add_str(text)
+            buffer.guess_segment_properties()
+            hb.shape(hb_font, buffer)
+
+    limits = instance_locations(axes)
+
+    def instance():
+        for location in limits:
+            instantiateVariableFont(font, location)
+
+    result = {
+        "locations": len(locations),
+        "glyphs": len(glyph_order),
+        "avar": getattr(avar, "majorVersion", 1) if avar is not None else None,
+        "axes": [axis.axisTag for axis in axes],
+        "stages": {},
+    }
+    stages = {
+        "normalize": (normalize, len(locations)),
+        "avar": (avar_mapping, len(locations)) if avar is not None else None,
+        "gvar": (gvar, len(locations)) if "gvar" in font else None,
+        "hvar": (hvar_deltas, len(locations)) if hvar is not None else None,
+        "harfbuzz": (harfbuzz, len(locations)),
+        "instance": (instance, len(limits)),
+    }
+    for stage, benchmark in stages.items():
+        if benchmark is None:
+            continue
+        function, count = benchmark
+        result["stages"][stage] = timed(function, count, repeats)
+    font.close()
+    return result
+
+
+def find_bases(fonts):
+    """Return the font without avar with the same directory and axes of each font."""
+    bases = {}
+    for name, result in fonts.items():
+        if result["avar"] is None:
+            continue
+        for base_name, base in fonts.items():
+            if (
+                base["avar"] is None
+                and Path(base_name).parent == Path(name).parent
+                and sorted(base["axes"]) == sorted(result["axes"])
+            ):
+                bases[name] = base_name
+                break
+    return bases
+
+
+def compare(report, baseline, threshold):
+    """Return the regressions of the report against the baseline."""
+    regressions = []
+    for name, result in report["fonts"].items():
+        base = baseline["fonts"].get(name)
+        if base is None:
+            continue
+        for stage, ns in result["stages"].items():
+            base_ns = base["stages"].get(stage)
+            if base_ns and ns > base_ns * (1 + threshold):
+                regressions.append((name, stage, base_ns, ns))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input_fonts", metavar="FONTFILE", nargs="+")
+    parser.add_argument(
+        "--steps", type=int, default=GRID_STEPS, help="Grid steps per axis"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=BENCHMARK_REPEATS,
+        help="Runs of each stage, the fastest is kept",
+    )
+    parser.add_argument("--report", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON report to compare the results with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Slowdown over the baseline reported as a regression, e.g. 0.25 "
+        "for 25%%",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the --baseline file instead of comparing",
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.update_baseline and not options.baseline:
+        parser.error("argument --update-baseline requires --baseline")
+
+    report = {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "fontTools": fontTools.version,
+        "harfbuzz": hb.version_string(),
+        "machine": platform.machine(),
+        "steps": options.steps,
+        "fonts": {},
+    }
+    failed = []
+    for input_name in options.input_fonts:
+        logger.info("Benchmarking font: '%s'", input_name)
+        try:
+            report["fonts"][input_name] = benchmark_font(
+                input_name, options.steps, options.repeats
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to benchmark '%s': %s: %s", input_name, type(e).__name__, e
+            )
+            failed.append(input_name)
+
+    bases = find_bases(report["fonts"])
+    for name, result in report["fonts"].items():
+        result["base"] = bases.get(name)
+        base = report["fonts"][bases[name]] if name in bases else None
+        columns = []
+        for stage in STAGES:
+            ns = result["stages"].get(stage)
+            if ns is None:
+                continue
+            column = f"{stage} {ns} ns"
+            if base is not None and base["stages"].get(stage):
+                column += f" ({ns / base['stages'][stage]:.2f}x)"
+            columns.append(column)
+        print(f"{Path(name).name}: " + ", ".join(columns))
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+    # don't save or compare a baseline missing the fonts that failed
+    if failed:
+        logger.error("Failed to benchmark %d font(s)", len(failed))
+        sys.exit(1)
+
+    update_baseline = options.update_baseline
+    if options.baseline and not Path(options.baseline).exists():
+        logger.warning("No baseline at '%s', saving the results", options.baseline)
+        update_baseline = True
+    if update_baseline:
+        with open(options.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logger.info("Saved baseline: '%s'", options.baseline)
+    elif options.baseline:
+        with open(options.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, options.threshold)
+        for name, stage, base_ns, ns in regressions:
+            logger.error(
+                "Regression: %s %s %d -> %d ns (%+.0f%%)",
+                Path(name).name,
+                stage,
+                base_ns,
+                ns,
+                100 * (ns / base_ns - 1),
+            )
+        if regressions:
+            sys.exit(1)
+
+    logger.info("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+"""Script to time the steps of the `fonts.build.*` tasks.
+
+Each build step is run through `run`, which records its wall time, CPU time
+(user and system, including subprocesses), peak resident memory and the bytes
+of the files it wrote in the `--watch` directory:
+
+    ./scripts/build-timer.py start test-font
+    ./scripts/build-timer.py run test-font --watch fonts/test-font -- \\
+      fonttools varLib.avar.build -o ...
+    ./scripts/build-timer.py report test-font
+
+`report` writes `<build>.json` with the steps and the totals of each stage,
+and `<build>.trace.json` in the Chrome trace event format, which can be opened
+in `chrome://tracing` or https://ui.perfetto.dev. It also appends the stage
+totals and the current commit to `history.jsonl`, and `history` shows how the
+stages of a build changed between commits:
+
+    ./scripts/build-timer.py history test-font
+
+Steps are grouped in stages named after the command, e.g. `gftools builder`,
+`fonttools varLib.instancer` or `rename-fonts`, unless `--stage` is given.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TIMINGS_DIR = ROOT_DIR / "out" / "build-timings"
+HISTORY_FILE = "history.jsonl"
+THRESHOLD = 0.25
+# stages faster than this are too noisy to be flagged as regressions
+MIN_REGRESSION_S = 0.1
+# commands whose first argument is the name of a subcommand
+SUBCOMMAND_TOOLS = {"fonttools", "gftools", "python", "python3"}
+
+
+def stage_name(command):
+    name = Path(command[0]).name.removesuffix(".py")
+    if name in SUBCOMMAND_TOOLS and len(command) > 1:
+        name = f"{name} {Path(command[1]).name.removesuffix('.py')}"
+    return name
+
+
+def snapshot(directory):
+    """Return the (mtime, size) of every file in the directory."""
+    if directory is None or not directory.exists():
+        return {}
+    files = {}
+    for path in directory.rglob("*"):
+        if path.is_file():
+            stat = path.stat()
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def run_step(command):
+    """Run a command, returning its exit code and resource usage."""
+    start_ns = time.time_ns()
+    start = time.perf_counter_ns()
+    pid = os.posix_spawnp(command[0], command, os.environ)
+    _, status, usage = os.wait4(pid, 0)
+    return os.waitstatus_to_exitcode(status), {
+        "start_us": start_ns // 1000,
+        "wall_s": (time.perf_counter_ns() - start) / 1e9,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        # kilobytes on Linux, bytes on macOS
+        "peak_rss_mib": usage.ru_maxrss
+        / (1 << 20 if sys.platform == "darwin" else 1 << 10),
+    }
+
+
+def events_path(build):
+    return TIMINGS_DIR / f"{build}.events.jsonl"
+
+
+def read_events(build):
+    path = events_path(build)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def summarize(events):
+    """Return the totals of each stage, in the order they first ran."""
+    stages = {}
+    for event in events:
+        stage = stages.setdefault(
+            event["stage"],
+            {"steps": 0, "wall_s": 0, "cpu_s": 0, "peak_rss_mib": 0, "bytes": 0},
+        )
+        stage["steps"] += 1
+        stage["wall_s"] += event["wall_s"]
+        stage["cpu_s"] += event["cpu_s"]
+        stage["peak_rss_mib"] = max(stage["peak_rss_mib"], event["peak_rss_mib"])
+        stage["bytes"] += event["bytes"]
+    for stage in stages.values():
+        stage["wall_s"] = round(stage["wall_s"], 3)
+        stage["cpu_s"] = round(stage["cpu_s"], 3)
+        stage["peak_rss_mib"] = round(stage["peak_rss_mib"], 1)
+    return stages
+
+
+def trace_events(build, events):
+    """Return the steps as Chrome trace events, with peak memory counters."""
+    trace = [
+        {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": build}},
+    ]
+    for event in events:
+        trace.append(
+            {
+                "name": event["stage"],
+                "cat": "build",
+                "ph": "X",
+                "ts": event["start_us"],
+                "dur": round(event["wall_s"] * 1e6),
+                "pid": 1,
+                "tid": 1,
+                "args": {
+                    "command": " ".join(event["command"]),
+                    "cpu_s": round(event["cpu_s"], 3),
+                    "peak_rss_mib": round(event["peak_rss_mib"], 1),
+                    "bytes": event["bytes"],
+                    "returncode": event["returncode"],
+                },
+            }
+        )
+        trace.append(
+            {
+                "name": "peak RSS",
+                "ph": "C",
+                "ts": event["start_us"],
+                "pid": 1,
+                "args": {"MiB": round(event["peak_rss_mib"], 1)},
+            }
+        )
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def git_commit():
+    """Return the current commit and whether the tree has local changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(dirty)
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+        file.write("\n")
+
+
+def report(build):
+    events = read_events(build)
+    if not events:
+        logger.warning("No steps recorded for %s", build)
+        return
+    stages = summarize(events)
+    commit, dirty = git_commit()
+    start_us = events[0]["start_us"]
+    end_us = max(event["start_us"] + event["wall_s"] * 1e6 for event in events)
+    summary = {
+        "build": build,
+        "commit": commit,
+        "dirty": dirty,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(start_us / 1e6)),
+        "wall_s": round((end_us - start_us) / 1e6, 3),
+        "cpu_s": round(sum(stage["cpu_s"] for stage in stages.values()), 3),
+        "peak_rss_mib": max(stage["peak_rss_mib"] for stage in stages.values()),
+        "bytes": sum(stage["bytes"] for stage in stages.values()),
+        "stages": stages,
+    }
+
+    write_json(TIMINGS_DIR / f"{build}.json", {**summary, "steps": events})
+    write_json(TIMINGS_DIR / f"{build}.trace.json", trace_events(build, events))
+    with open(TIMINGS_DIR / HISTORY_FILE, "a", encoding="utf-8") as file:
+        file.write(json.dumps(summary) + "\n")
+
+    for name, stage in stages.items():
+        print(
+            f"{build} {name}: {stage['steps']} steps, {stage['wall_s']:.2f} s, "
+            f"CPU {stage['cpu_s']:.2f} s, peak RSS {stage['peak_rss_mib']:.0f} MiB, "
+            f"{stage['bytes']} bytes"
+        )
+    print(f"{build}: {summary['wall_s']:.2f} s")
+
+
+def history(builds, count, threshold):
+    entries = []
+    path = TIMINGS_DIR / HISTORY_FILE
+    if path.exists():
+        with open(path, encoding="utf-8") as file:
+            entries = [json.loads(line) for line in file]
+    for build in builds or sorted({entry["build"] for entry in entries}):
+        build_entries = [entry for entry in entries if entry["build"] == build]
+        if not build_entries:
+            logger.warning("No history for %s", build)
+            continue
+        previous = None
+        for entry in build_entries[-count:]:
+            commit = (entry["commit"] or "unknown") + ("+" if entry["dirty"] else "")
+            print(f"{build} {commit} {entry['date']}: {entry['wall_s']:.2f} s")
+            for name, stage in entry["stages"].items():
+                line = f"  {name}: {stage['wall_s']:.2f} s"
+                before = previous["stages"].get(name) if previous else None
+                if before and before["wall_s"]:
+                    change = stage["wall_s"] / before["wall_s"] - 1
+                    line += f" ({change:+.0%})"
+                    if (
+                        change > threshold
+                        and stage["wall_s"] - before["wall_s"] >= MIN_REGRESSION_S
+                    ):
+                        line += " REGRESSED"
+                print(line)
+            previous = entry
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = subparsers.add_parser("start", help="Start recording a build")
+    start_parser.add_argument("build")
+
+    run_parser = subparsers.add_parser("run", help="Run and record a build step")
+    run_parser.add_argument("build")
+    run_parser.add_argument("--stage", help="Stage name, derived from the command")
+    run_parser.add_argument(
+        "--watch", type=Path, help="Directory of the files written by the build"
+    )
+    run_parser.add_argument("step", nargs="+", metavar="COMMAND", help="after --")
+
+    report_parser = subparsers.add_parser("report", help="Write the build reports")
+    report_parser.add_argument("build")
+
+    history_parser = subparsers.add_parser("history", help="Compare builds over time")
+    history_parser.add_argument("builds", nargs="*", metavar="build")
+    history_parser.add_argument(
+        "-n", "--count", type=int, default=5, help="Number of entries per build"
+    )
+    history_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Slowdown of a stage flagged as a regression, e.g. 0.25 for 25%%",
+    )
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if options.command == "start":
+        path = events_path(options.build)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+    elif options.command == "run":
+        command = options.step
+        before = snapshot(options.watch)
+        try:
+            returncode, usage = run_step(command)
+        except OSError as e:
+            logger.error("Can't run '%s': %s", command[0], e)
+            sys.exit(127)
+        after = snapshot(options.watch)
+        written = sum(
+            size
+            for path, (mtime, size) in after.items()
+            if before.get(path) != (mtime, size)
+        )
+        event = {
+            "stage": options.stage or stage_name(command),
+            "command": command,
+            "returncode": returncode,
+            **usage,
+            "bytes": written,
+        }
+        path = events_path(options.build)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(event) + "\n")
+        logger.info(
+            "%s: %.2f s, CPU %.2f s, peak RSS %.0f MiB, %d bytes",
+            event["stage"],
+            event["wall_s"],
+            event["cpu_s"],
+            event["peak_rss_mib"],
+            written,
+        )
+        sys.exit(returncode)
+    elif options.command == "report":
+        report(options.build)
+    else:
+        history(options.builds, options.count, options.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ from pathlib import Path
 
 from PIL import Image
 
+from reftests import COMPOSITED_PREFIX, STORE_DIR, TESTS_DIR, screenshot_files
+
 
 def generate_composite(
     parent_dir: Path, base_test_name: str, files: list[Path], root_dir: Path
@@ -23,26 +25,27 @@ def generate_composite(
     for i, image in enumerate(images[1:], start=2):
         composite = Image.blend(composite, image, alpha=1.0 / i)
 
-    output_path = parent_dir / f"composited.{base_test_name}"
+    output_path = parent_dir / f"{COMPOSITED_PREFIX}{base_test_name}"
     composite.save(output_path)
     print(output_path.relative_to(root_dir))
 
 
 def main() -> None:
-    root_dir = Path(__file__).resolve().parent.parent / "tests" / "static"
+    root_dir = TESTS_DIR
 
     if not root_dir.exists():
         print(f"error: directory not found: {root_dir}", file=sys.stderr)
         sys.exit(1)
 
+    # packed screenshots are read from their blob in tests/screenshots
     groups: defaultdict[tuple[Path, str], list[Path]] = defaultdict(list)
-    for png in root_dir.rglob("*.png"):
-        if png.name.startswith("composited."):
+    for png, file in screenshot_files(root_dir, STORE_DIR).items():
+        if png.name.startswith(COMPOSITED_PREFIX):
             continue
         parts = png.name.split(".")
         if len(parts) >= 4:
             base_test_name = ".".join(parts[2:])
-            groups[png.parent, base_test_name].append(png)
+            groups[png.parent, base_test_name].append(file)
 
     with concurrent.futures.ProcessPoolExecutor() as executor:
         futures = [
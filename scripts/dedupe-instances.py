@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+"""Script to find and avoid duplicate static instances of the variable fonts.
+
+Fences and avar2 mappings can send different design locations to the same
+normalized location, and fonts built from the same sources with different
+`avar` tables share their outlines, so several static instances can end up
+with the same glyph data under different names.
+
+`instance` is a drop-in replacement for `fonttools varLib.instancer` used by
+the build tasks:
+
+    ./scripts/dedupe-instances.py instance \\
+      "fonts/test-font/variable/TestFontFencesAvar2[opsz,wdth,wght].ttf" \\
+      wght=900 wdth=75 opsz=16 -o fonts/test-font/TestFontFencesBlackCondensed.ttf
+
+Before instancing, it maps the location through `fvar` and `avar` and hashes
+it with the tables the outlines and advances come from (`glyf`, `gvar`,
+`hmtx`, `HVAR`...). When an instance with the same hash was made before, in
+this build or a previous one, its outlines and advances are copied from
+`out/instance-dedupe` instead of applying `gvar` and `HVAR` again, and only
+the cheap, location-dependent rest of the font (`OS/2`, `STAT`, layout...)
+is instantiated. Partial instances and options the cache doesn't cover are
+passed to `fonttools varLib.instancer` unchanged.
+
+`report` hashes the glyph-bearing tables (`glyf`, `loca`, `hmtx`, `GSUB` and
+`GPOS` by default) of the built instances and lists the groups of fonts that
+only differ in the other tables, such as `name`:
+
+    ./scripts/dedupe-instances.py report --report out/instance-groups.json
+
+`./scripts/package-webfonts.py --dedupe out/instance-groups.json` then
+serves a single WOFF2 file for each group.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import fontTools
+from fontTools.misc.cliTools import makeOutputFileName
+from fontTools.misc.fixedTools import floatToFixed
+from fontTools.varLib import instancer
+from fontTools.varLib.models import normalizeLocation
+
+from fontfiles import open_font, save_font
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+REPORT_VERSION = 1
+# tables of the variable font that the instantiated outlines and advances
+# depend on, besides the normalized location
+SOURCE_TABLES = ["glyf", "loca", "gvar", "hmtx", "HVAR", "vmtx", "VVAR", "maxp", "post"]
+# tables of the instance copied from the cache, and variations they replace
+REUSED_TABLES = ["glyf", "loca", "hmtx", "vmtx"]
+REPLACED_TABLES = ["gvar", "HVAR", "VVAR"]
+REPORT_TABLES = ["glyf", "loca", "hmtx", "GSUB", "GPOS"]
+# tables whose compiled data depends on the packing order, see table_digest
+RECOMPILED_TABLES = {"GSUB", "GPOS", "GDEF", "BASE", "JSTF", "MATH"}
+
+
+def font_key(path):
+    # fonts/ may be a symbolic link, keep its path
+    path = Path(path).absolute()
+    if path.is_relative_to(ROOT_DIR):
+        return path.relative_to(ROOT_DIR).as_posix()
+    return path.as_posix()
+
+
+def table_digest(font, tag):
+    """Return the hash of a table, or None when the font doesn't have it."""
+    if tag not in font.reader:
+        return None
+    if tag in RECOMPILED_TABLES:
+        # the same layout table can be serialized in different orders
+        data = font[tag].compile(font)
+    else:
+        data = font.reader[tag]
+    return hashlib.sha256(data).hexdigest()
+
+
+def pinned_location(font, limits, options):
+    """Return the design location of a static instance, or None.
+
+    None means the cache can't make the instance: it is a partial instance, or
+    it needs options or tables that `instance` doesn't handle.
+    """
+    if (
+        "glyf" not in font
+        or "CFF2" in font
+        or "VARC" in font
+        or options.update_name_table
+        or options.downgrade_cff2
+    ):
+        return None
+    limits = instancer.AxisLimits(limits).limitAxesAndPopulateDefaults(font)
+    location = {}
+    for axis in font["fvar"].axes:
+        triple = limits.get(axis.axisTag)
+        if triple is None and options.static:
+            location[axis.axisTag] = axis.defaultValue
+        elif triple is None or triple.minimum != triple.maximum:
+            return None
+        else:
+            location[axis.axisTag] = triple.default
+    return location
+
+
+def mapped_location(font, location):
+    """Return the normalized location of a design location, after `avar`."""
+    triples = {
+        axis.axisTag: (axis.minValue, axis.defaultValue, axis.maxValue)
+        for axis in font["fvar"].axes
+    }
+    normalized = normalizeLocation(location, triples)
+    if "avar" in font:
+        normalized = font["avar"].renormalizeLocation(normalized, font)
+    # instancers work with F2Dot14 coordinates
+    return {tag: floatToFixed(normalized.get(tag, 0), 14) for tag in triples}
+
+
+def outline_key(font, location, options):
+    """Return the cache key of the outlines and advances of an instance."""
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            [
+                fontTools.version,
+                options.optimize,
+                int(options.overlap),
+                sorted(mapped_location(font, location).items()),
+            ]
+        ).encode()
+    )
+    for tag in SOURCE_TABLES:
+        digest.update(f"\0{tag}\0{table_digest(font, tag)}".encode())
+    return digest.hexdigest()
+
+
+def instance(instancer_args, cache_dir):
+    input_name, limits, options = instancer.parseArgs(instancer_args)
+    font = open_font(
+        input_name,
+        cache=False,
+        recalcTimestamp=options.recalc_timestamp,
+        recalcBBoxes=options.recalc_bounds,
+    )
+    location = pinned_location(font, limits, options)
+    if location is None:
+        logger.info("Not cacheable, running fonttools varLib.instancer")
+        font.close()
+        instancer.main(instancer_args)
+        return
+
+    key = outline_key(font, location, options)
+    cache_path = cache_dir / key[:2] / f"{key}.ttf"
+    if cache_path.exists():
+        logger.info("Reusing outlines: '%s'", cache_path)
+        cached = open_font(cache_path, cache=False)
+        for tag in REUSED_TABLES:
+            if tag in cached:
+                font[tag] = cached[tag]
+        for tag in REPLACED_TABLES:
+            if tag in font:
+                del font[tag]
+        font = instancer.instantiateVariableFont(
+            font, location, inplace=True, overlap=options.overlap
+        )
+    else:
+        font = instancer.instantiateVariableFont(
+            font,
+            location,
+            inplace=True,
+            optimize=options.optimize,
+            overlap=options.overlap,
+        )
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        save_font(font, cache_path)
+        logger.info("Cached outlines: '%s'", cache_path)
+
+    output_name = options.output or makeOutputFileName(
+        input_name, overWrite=True, suffix="-instance"
+    )
+    save_font(font, output_name)
+    logger.info("Saved instance: '%s'", output_name)
+
+
+def report(paths, tags):
+    """Return the groups of fonts with identical tables, largest first."""
+    by_digest = {}
+    for path in paths:
+        font = open_font(path, cache=False)
+        digests = [table_digest(font, tag) for tag in tags]
+        font.close()
+        by_digest.setdefault(tuple(digests), []).append(path)
+    groups = [
+        {
+            "fonts": [font_key(path) for path in group],
+            "bytes": [path.stat().st_size for path in group],
+        }
+        for group in by_digest.values()
+        if len(group) > 1
+    ]
+    return sorted(groups, key=lambda group: -sum(group["bytes"][1:]))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=ROOT_DIR / "out" / "instance-dedupe",
+        help="Directory of the cached instance outlines",
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    instance_parser = subparsers.add_parser(
+        "instance", help="Make a static instance, reusing cached outlines"
+    )
+    instance_parser.add_argument(
+        "instancer_args",
+        nargs=argparse.REMAINDER,
+        help="Arguments of fonttools varLib.instancer",
+    )
+
+    report_parser = subparsers.add_parser(
+        "report", help="List the built instances with identical glyph data"
+    )
+    report_parser.add_argument(
+        "input_fonts",
+        metavar="FONTFILE",
+        nargs="*",
+        type=Path,
+        help="Fonts to compare (default: the static fonts in fonts/)",
+    )
+    report_parser.add_argument(
+        "--tables",
+        nargs="+",
+        default=REPORT_TABLES,
+        help="Tables that must be identical",
+    )
+    report_parser.add_argument("--report", help="Write the groups as JSON to this file")
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.command == "instance":
+        if not options.instancer_args:
+            instance_parser.error("missing arguments of fonttools varLib.instancer")
+        instance(options.instancer_args, options.cache_dir)
+        return
+
+    paths = options.input_fonts or sorted((ROOT_DIR / "fonts").glob("*/*.ttf"))
+    groups = report(paths, options.tables)
+    for group in groups:
+        print(
+            f"{len(group['fonts'])} fonts, {sum(group['bytes'][1:])} bytes duplicated:"
+        )
+        for name in group["fonts"]:
+            print(f"  {name}")
+    print(
+        f"{len(paths)} fonts, {sum(len(group['fonts']) - 1 for group in groups)} "
+        f"duplicates of {' '.join(options.tables)}"
+    )
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": REPORT_VERSION, "tables": options.tables, "groups": groups},
+                file,
+                indent=2,
+            )
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+
+if __name__ == "__main__":
+    main()
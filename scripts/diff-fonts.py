@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+"""Script to show which tables differ between fonts, and how.
+
+The table directories of the two fonts are compared first: tables with the
+same checksum and length are unchanged and never read. Only the tables that
+differ are decompiled and summarized:
+
+- `avar`: the segment maps of each axis, and for avar2 the delta of each
+  axis in each region of the mapping,
+- `fvar`: the range and name of each axis, and the coordinates of each named
+  instance,
+- `name`: every name record,
+- other tables: their TTX dump, shown as a unified diff.
+
+For example, to see what `varLib.avar.build` added to a font:
+
+    ./scripts/diff-fonts.py "fonts/test-font/variable/TestFont[opsz,wdth,wght].ttf" \\
+      "fonts/test-font/variable/TestFontAvar2[opsz,wdth,wght].ttf"
+
+Directories are compared font by font, matching the relative paths of their
+fonts, e.g. a copy of `fonts/` from a previous build with the current one:
+
+    ./scripts/diff-fonts.py /tmp/fonts-before fonts
+
+Like `diff`, the script exits with 1 when the fonts differ.
+"""
+
+import argparse
+import difflib
+import io
+import json
+import logging
+import sys
+from pathlib import Path
+
+from fontTools.misc.xmlWriter import XMLWriter
+
+from fontfiles import open_font
+from variations import NO_VARIATION, avar_var_indices, item_deltas
+
+logger = logging.getLogger()
+
+FONT_PATTERNS = ["*.ttf", "*.otf", "*.woff", "*.woff2"]
+MAX_LINES = 40
+
+
+def table_entries(font):
+    """Return the checksum and length of every table, from the directory."""
+    return {
+        tag: (getattr(entry, "checkSum", None), entry.length)
+        for tag, entry in font.reader.tables.items()
+    }
+
+
+def is_unchanged(old_font, new_font, old_entry, new_entry, tag):
+    if old_entry[0] is not None and new_entry[0] is not None:
+        return old_entry == new_entry
+    # WOFF2 directories have no checksums
+    return old_font.reader[tag] == new_font.reader[tag]
+
+
+def region_name(font, region):
+    """Return e.g. 'wght=0:1:1 wdth=-1:-1:0' for the axes of a region."""
+    tags = [axis.axisTag for axis in font["fvar"].axes]
+    return " ".join(
+        f"{tag}={axis.StartCoord:g}:{axis.PeakCoord:g}:{axis.EndCoord:g}"
+        for tag, axis in zip(tags, region.VarRegionAxis)
+        if axis.PeakCoord
+    )
+
+
+def summarize_avar(font):
+    avar = font["avar"]
+    summary = {"version": str(avar.majorVersion)}
+    for tag, segments in avar.segments.items():
+        summary[f"segments {tag}"] = " ".join(
+            f"{key:g}:{value:g}" for key, value in sorted(segments.items())
+        )
+    table = getattr(avar, "table", None)
+    if avar.majorVersion < 2 or table is None or table.VarStore is None:
+        return summary
+
+    tags = [axis.axisTag for axis in font["fvar"].axes]
+    store = table.VarStore
+    regions = store.VarRegionList.Region
+    for tag, var_index in zip(tags, avar_var_indices(table, len(tags))):
+        if var_index == NO_VARIATION:
+            continue
+        for region_index, delta in zip(*item_deltas(store, var_index)):
+            if delta:
+                name = region_name(font, regions[region_index])
+                summary[f"delta {tag} @ {name}"] = f"{delta / (1 << 14):+.5f}"
+    return summary
+
+
+def summarize_fvar(font):
+    fvar = font["fvar"]
+    name = font["name"] if "name" in font else None
+
+    def debug_name(name_id):
+        value = name.getDebugName(name_id) if name is not None else None
+        return value if value is not None else f"name ID {name_id}"
+
+    summary = {}
+    for axis in fvar.axes:
+        summary[f"axis {axis.axisTag}"] = (
+            f"{axis.minValue:g} {axis.defaultValue:g} {axis.maxValue:g} "
+            f"'{debug_name(axis.axisNameID)}' flags {axis.flags}"
+        )
+    for instance in fvar.instances:
+        summary[f"instance '{debug_name(instance.subfamilyNameID)}'"] = " ".join(
+            f"{tag}={value:g}" for tag, value in instance.coordinates.items()
+        )
+    return summary
+
+
+def summarize_name(font):
+    return {
+        f"{record.nameID} {record.platformID}/{record.platEncID}/"
+        f"0x{record.langID:X}": repr(record.toUnicode())
+        for record in font["name"].names
+    }
+
+
+SUMMARIES = {"avar": summarize_avar, "fvar": summarize_fvar, "name": summarize_name}
+
+
+def table_xml(font, tag):
+    output = io.StringIO()
+    writer = XMLWriter(output, newlinestr="\n")
+    font[tag].toXML(writer, font)
+    return output.getvalue().splitlines()
+
+
+def summarize(font, tag):
+    return SUMMARIES[tag](font) if tag in font.reader else {}
+
+
+def diff_table(old_font, new_font, tag, max_lines):
+    """Return the differences of a table as a list of lines."""
+    if tag in SUMMARIES:
+        old = summarize(old_font, tag)
+        new = summarize(new_font, tag)
+        lines = []
+        for key in old.keys() | new.keys():
+            if key not in new:
+                lines.append(f"- {key}: {old[key]}")
+            elif key not in old:
+                lines.append(f"+ {key}: {new[key]}")
+            elif old[key] != new[key]:
+                lines.append(f"~ {key}: {old[key]} -> {new[key]}")
+        return sorted(lines, key=lambda line: (line[2:], line[0]))
+
+    lines = [
+        line.rstrip("\n")
+        for line in difflib.unified_diff(
+            table_xml(old_font, tag), table_xml(new_font, tag), n=1, lineterm=""
+        )
+    ][2:]
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... {len(lines) - max_lines} more lines"]
+    return lines
+
+
+def diff_fonts(old_path, new_path, max_lines):
+    """Return the unchanged, removed, added and changed tables of two fonts."""
+    old_font = open_font(old_path, cache=False)
+    new_font = open_font(new_path, cache=False)
+    old_entries = table_entries(old_font)
+    new_entries = table_entries(new_font)
+    old_tags = set(old_entries)
+    new_tags = set(new_entries)
+    result = {
+        "unchanged": [],
+        "removed": sorted(old_tags - new_tags),
+        "added": sorted(new_tags - old_tags),
+        "changed": {},
+    }
+    # show the content of the added and removed tables that have a summary
+    for tag in result["removed"] + result["added"]:
+        if tag in SUMMARIES:
+            result["changed"][tag] = diff_table(old_font, new_font, tag, max_lines)
+    for tag in sorted(old_tags & new_tags):
+        if is_unchanged(old_font, new_font, old_entries[tag], new_entries[tag], tag):
+            result["unchanged"].append(tag)
+        else:
+            result["changed"][tag] = diff_table(old_font, new_font, tag, max_lines)
+    result["changed"] = dict(sorted(result["changed"].items()))
+    old_font.close()
+    new_font.close()
+    return result
+
+
+def font_pairs(old_dir, new_dir):
+    """Return the fonts of two directories by relative path."""
+
+    def fonts(directory):
+        return {
+            path.relative_to(directory).as_posix(): path
+            for pattern in FONT_PATTERNS
+            for path in directory.rglob(pattern)
+        }
+
+    old_fonts = fonts(old_dir)
+    new_fonts = fonts(new_dir)
+    return [
+        (name, old_fonts.get(name), new_fonts.get(name))
+        for name in sorted(old_fonts.keys() | new_fonts.keys())
+    ]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("old", type=Path, help="Font or directory of fonts")
+    parser.add_argument("new", type=Path, help="Font or directory of fonts")
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        default=MAX_LINES,
+        help="Lines of TTX diff shown for each table",
+    )
+    parser.add_argument("--report", help="Write the differences as JSON to this file")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.old.is_dir() != options.new.is_dir():
+        parser.error("arguments must both be fonts or both be directories")
+    if options.old.is_dir():
+        pairs = font_pairs(options.old, options.new)
+    else:
+        pairs = [(f"{options.old} -> {options.new}", options.old, options.new)]
+
+    report = {}
+    differ = False
+    for name, old_path, new_path in pairs:
+        if old_path is None or new_path is None:
+            differ = True
+            report[name] = "added" if old_path is None else "removed"
+            print(f"{name}: {report[name]}")
+            continue
+        result = report[name] = diff_fonts(old_path, new_path, options.max_lines)
+        if not (result["removed"] or result["added"] or result["changed"]):
+            logger.info("%s: identical", name)
+            continue
+        differ = True
+        print(f"{name}:")
+        print(f"  = {len(result['unchanged'])} tables unchanged")
+        for tag in result["removed"]:
+            if tag not in result["changed"]:
+                print(f"  - {tag}")
+        for tag in result["added"]:
+            if tag not in result["changed"]:
+                print(f"  + {tag}")
+        for tag, lines in result["changed"].items():
+            if tag in result["removed"]:
+                print(f"  - {tag}")
+            elif tag in result["added"]:
+                print(f"  + {tag}")
+            else:
+                print(f"  ~ {tag}")
+            for line in lines:
+                print(f"      {line}")
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+    if differ:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Shared evaluation of the `numpy` expressions given on the command line.
+
+Curves and paths, such as `--curve` of `scripts/fit-mappings.py` and `--angle`
+of `scripts/hoi-designspace.py`, are arithmetic expressions of the arrays of
+an axis. They are parsed first and may only use numbers, arithmetic
+operators, comparisons, the given variables and the element-wise functions
+of `FUNCTIONS`, and are evaluated without builtins, so an expression can't
+reach anything else. `**` and the bitwise operators are rejected, as they
+can hang on large Python integers: use `power()`, which works on floats.
+"""
+
+import ast
+import math
+
+import numpy as np
+
+FUNCTIONS = {
+    name: getattr(np, name)
+    for name in [
+        "abs",
+        "arccos",
+        "arcsin",
+        "arctan",
+        "arctan2",
+        "ceil",
+        "clip",
+        "cos",
+        "cosh",
+        "degrees",
+        "exp",
+        "floor",
+        "hypot",
+        "log",
+        "log10",
+        "log2",
+        "maximum",
+        "minimum",
+        "power",
+        "radians",
+        "round",
+        "sign",
+        "sin",
+        "sinh",
+        "sqrt",
+        "tan",
+        "tanh",
+        "where",
+    ]
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.UAdd,
+    ast.USub,
+    ast.cmpop,
+)
+
+
+def evaluate_expression(expression, variables):
+    """Evaluate an expression of named arrays, broadcast to their shape."""
+    namespace = {**FUNCTIONS, **CONSTANTS, **variables}
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as error:
+        raise ValueError(f"invalid expression {expression!r}: {error.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(
+                f"unsupported {type(node).__name__} in expression {expression!r}"
+            )
+        if isinstance(node, ast.Name) and node.id not in namespace:
+            raise ValueError(f"unknown name {node.id!r} in expression {expression!r}")
+        if isinstance(node, ast.Constant) and type(node.value) not in (int, float):
+            raise ValueError(
+                f"unsupported constant {node.value!r} in expression {expression!r}"
+            )
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name)
+            or node.func.id not in FUNCTIONS
+            or node.keywords
+        ):
+            raise ValueError(f"unsupported call in expression {expression!r}")
+    shape = np.broadcast_shapes(*(np.shape(value) for value in variables.values()))
+    values = eval(
+        compile(tree, "<expression>", "eval"), {"__builtins__": {}}, namespace
+    )
+    return np.broadcast_to(np.asarray(values, dtype=float), shape)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+
+"""Script to fit avar2 `<mapping>` elements to a curve driven by one axis.
+
+The target is sampled densely over the driver axis, either from a CSV file
+whose first column is the driver axis tag and the others are output axis tags,
+or from `--curve` expressions of the driver axis tag, with the functions of
+`scripts/expressions.py`, e.g.
+
+    ./scripts/fit-mappings.py sources/designspaces/avar2OpticalSize.designspace \\
+      --driver opsz \\
+      --curve "wght = 400 - 200 * log(opsz / 16) / log(where(opsz < 16, 16 / 6, 144 / 16))" \\
+      --curve "wdth = 100 - 25 * log(opsz / 16) / log(where(opsz < 16, 16 / 6, 144 / 16))" \\
+      -o out/avar2OpticalSizeFitted.designspace
+
+Along the driver axis, avar2 interpolates mappings linearly between their
+input locations, so the mappings are the knots of a piecewise linear curve.
+Knots are inserted greedily where the error is the largest until every sample
+is within `--tolerance`, then interior knots are removed as long as a least
+squares fit of the remaining knots stays within the tolerance.
+
+The axes of the output designspace are copied from the input designspace,
+whose mappings are replaced. The fitted mappings are checked by building the
+`avar` table with fontTools and evaluating it at every sample.
+"""
+
+import argparse
+import csv
+import logging
+import sys
+
+import numpy as np
+from fontTools.designspaceLib import AxisMappingDescriptor, DesignSpaceDocument
+from fontTools.ttLib import TTFont
+from fontTools.varLib.avar.build import build as build_avar
+from fontTools.varLib.models import normalizeValue
+
+from expressions import evaluate_expression
+
+logger = logging.getLogger()
+
+DEFAULT_SAMPLES = 1001
+
+
+def read_samples(path):
+    """Return the driver tag, driver values and output values by tag of a CSV."""
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    header, values = rows[0], np.array(rows[1:], dtype=float)
+    order = np.argsort(values[:, 0], kind="stable")
+    values = values[order]
+    return header[0], values[:, 0], dict(zip(header[1:], values[:, 1:].T))
+
+
+def eval_curves(driver, xs, curves):
+    targets = {}
+    for curve in curves:
+        tag, _, expression = curve.partition("=")
+        tag = tag.strip()
+        if not expression:
+            raise ValueError(f"invalid curve {curve!r}, expected 'TAG = EXPRESSION'")
+        targets[tag] = evaluate_expression(expression, {driver: xs})
+    return targets
+
+
+def evaluate(knot_xs, knot_ys, xs):
+    """Evaluate the piecewise linear curves through the knots at xs."""
+    return np.stack([np.interp(xs, knot_xs, ys) for ys in knot_ys])
+
+
+def errors(knot_xs, knot_ys, xs, targets):
+    return np.abs(evaluate(knot_xs, knot_ys, xs) - targets).max(axis=0)
+
+
+def least_squares(knot_xs, fixed, xs, targets, decimals):
+    """Fit the knot values of the curves, keeping the `fixed` knots as given.
+
+    `fixed` maps knot indices to the values (per output axis) they must keep.
+    """
+    basis = np.stack(
+        [np.interp(xs, knot_xs, np.eye(len(knot_xs))[i]) for i in range(len(knot_xs))],
+        axis=1,
+    )
+    free = [i for i in range(len(knot_xs)) if i not in fixed]
+    knot_ys = np.empty((len(targets), len(knot_xs)))
+    residuals = targets.copy()
+    for i, values in fixed.items():
+        knot_ys[:, i] = values
+        residuals -= np.outer(values, basis[:, i])
+    if free:
+        solution, *_ = np.linalg.lstsq(basis[:, free], residuals.T, rcond=None)
+        knot_ys[:, free] = solution.T
+    return np.round(knot_ys, decimals)
+
+
+def fit(xs, targets, default, default_ys, tolerance, decimals):
+    """Return the knot positions and values approximating the targets.
+
+    The default location is always a knot mapping to itself, as avar2 drops
+    the deltas of the base master.
+    """
+
+    def target_at(x):
+        return np.array([np.interp(x, xs, target) for target in targets])
+
+    knots = {round(xs[0], decimals), default, round(xs[-1], decimals)}
+
+    def knot_values(knot_xs):
+        return np.stack(
+            [
+                default_ys if x == default else np.round(target_at(x), decimals)
+                for x in knot_xs
+            ],
+            axis=1,
+        )
+
+    # greedy insertion of the worst sample
+    while True:
+        knot_xs = np.array(sorted(knots))
+        knot_ys = knot_values(knot_xs)
+        error = errors(knot_xs, knot_ys, xs, targets)
+        worst = int(np.argmax(error))
+        if error[worst] <= tolerance:
+            break
+        x = round(xs[worst], decimals)
+        if x in knots:
+            logger.warning(
+                "Can't reach tolerance %g with %d decimals: %g at %s",
+                tolerance,
+                decimals,
+                error[worst],
+                xs[worst],
+            )
+            break
+        knots.add(x)
+    logger.info("Greedy insertion: %d knots", len(knot_xs))
+
+    # removal of interior knots while a least squares fit stays in tolerance
+    removable = True
+    while removable:
+        removable = False
+        ends = {knot_xs[0], knot_xs[-1]}
+        for x in sorted(set(knot_xs) - ends - {default}):
+            trial_xs = knot_xs[knot_xs != x]
+            fixed = {int(np.flatnonzero(trial_xs == default)[0]): default_ys}
+            trial_ys = least_squares(trial_xs, fixed, xs, targets, decimals)
+            if errors(trial_xs, trial_ys, xs, targets).max() <= tolerance:
+                knot_xs, knot_ys = trial_xs, trial_ys
+                removable = True
+                break
+    logger.info("Least squares removal: %d knots", len(knot_xs))
+
+    return knot_xs, knot_ys
+
+
+def check_avar(designspace, driver, xs, tags, targets):
+    """Return the max error of the built avar table per output axis, and its size."""
+    font = TTFont()
+    build_avar(font, designspace)
+    avar = font["avar"]
+    axes = {axis.tag: axis for axis in designspace.axes}
+    driver_axis = axes[driver]
+    outputs = np.empty_like(targets)
+    for i, x in enumerate(xs):
+        location = {
+            driver: normalizeValue(
+                x, (driver_axis.minimum, driver_axis.default, driver_axis.maximum)
+            )
+        }
+        mapped = avar.renormalizeLocation(location, font, dropZeroes=False)
+        for j, tag in enumerate(tags):
+            axis = axes[tag]
+            v = mapped[tag]
+            outputs[j, i] = axis.default + v * (
+                axis.default - axis.minimum if v < 0 else axis.maximum - axis.default
+            )
+    return np.abs(outputs - targets).max(axis=1), len(avar.compile(font))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "designspace", metavar="DESIGNSPACE", help="Designspace to take axes from"
+    )
+    parser.add_argument("--driver", help="Tag of the axis driving the curves")
+    parser.add_argument(
+        "--curve",
+        dest="curves",
+        action="append",
+        default=[],
+        help="'TAG = EXPRESSION' of the driver tag, using the functions "
+        "whitelisted in scripts/expressions.py",
+    )
+    parser.add_argument("--samples", help="CSV file of target samples")
+    parser.add_argument(
+        "--sample-count",
+        type=int,
+        default=DEFAULT_SAMPLES,
+        help="Number of samples over the driver axis for --curve",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Maximum error in axis units",
+    )
+    parser.add_argument(
+        "--decimals", type=int, default=2, help="Decimals of the mapping values"
+    )
+    parser.add_argument("-o", "--output-file", help="Output designspace")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if bool(options.samples) == bool(options.curves):
+        parser.error("exactly one of --samples or --curve is required")
+
+    designspace = DesignSpaceDocument.fromfile(options.designspace)
+    axes = {axis.tag: axis for axis in designspace.axes}
+    if any(axis.map for axis in designspace.axes):
+        parser.error("axes with avar1 <map> elements are not supported")
+
+    if options.samples:
+        driver, xs, targets = read_samples(options.samples)
+        if options.driver and options.driver != driver:
+            parser.error(f"--driver {options.driver} but samples are of {driver}")
+    else:
+        driver = options.driver
+        if driver not in axes:
+            parser.error(f"--driver must be one of {', '.join(axes)}")
+        axis = axes[driver]
+        xs = np.linspace(axis.minimum, axis.maximum, options.sample_count)
+        try:
+            targets = eval_curves(driver, xs, options.curves)
+        except ValueError as error:
+            parser.error(str(error))
+
+    for tag, values in targets.items():
+        if tag not in axes:
+            parser.error(f"unknown output axis {tag!r}")
+        axis = axes[tag]
+        if values.min() < axis.minimum or values.max() > axis.maximum:
+            parser.error(f"{tag} curve leaves [{axis.minimum}, {axis.maximum}]")
+
+    tags = list(targets)
+    target_array = np.stack([targets[tag] for tag in tags])
+    default = axes[driver].default
+    default_ys = np.array(
+        [default if tag == driver else axes[tag].default for tag in tags]
+    )
+    default_targets = np.array([np.interp(default, xs, t) for t in target_array])
+    if np.abs(default_targets - default_ys).max() > options.tolerance:
+        parser.error(
+            f"the curves must map the default {driver} {default:g} to the defaults "
+            f"of {', '.join(tags)}: avar2 doesn't move the default location"
+        )
+    knot_xs, knot_ys = fit(
+        xs, target_array, default, default_ys, options.tolerance, options.decimals
+    )
+
+    designspace.axisMappings = []
+    for i, x in enumerate(knot_xs):
+        outputs = {axes[tag].name: float(knot_ys[j, i]) for j, tag in enumerate(tags)}
+        if x == default:
+            continue  # the implicit base mapping
+        designspace.axisMappings.append(
+            AxisMappingDescriptor(
+                inputLocation={axes[driver].name: float(x)},
+                outputLocation=outputs,
+            )
+        )
+
+    avar_errors, avar_size = check_avar(designspace, driver, xs, tags, target_array)
+    print(
+        f"{len(designspace.axisMappings)} mappings, avar {avar_size} bytes, "
+        + ", ".join(
+            f"{tag} max error {error:.3g}" for tag, error in zip(tags, avar_errors)
+        )
+    )
+
+    if options.output_file:
+        designspace.write(options.output_file)
+        logger.info("Saved designspace: '%s'", options.output_file)
+
+    if avar_errors.max() > options.tolerance:
+        logger.error(
+            "avar error %g exceeds tolerance %g", avar_errors.max(), options.tolerance
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
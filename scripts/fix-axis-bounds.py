@@ -11,7 +11,8 @@ import argparse
 import logging
 
 from fontTools.misc.cliTools import makeOutputFileName
-from fontTools.ttLib import TTFont
+
+from fontfiles import open_font, save_font
 
 logger = logging.getLogger()
 
@@ -117,7 +118,7 @@ def main(args=None):
         logger.info("Processing font: '%s'", input_name)
 
         try:
-            font = TTFont(input_name)
+            font = open_font(input_name, cache=False)
 
             modified = update_axis_bounds(
                 font, options.axis, options.min, options.max, options.default
@@ -131,7 +132,7 @@ def main(args=None):
                 else:
                     output_name = makeOutputFileName(input_name, options.output_dir)
 
-                font.save(output_name)
+                save_font(font, output_name)
                 logger.info("  Saved font: '%s'", output_name)
             else:
                 logger.info("  No changes made to '%s'", input_name)
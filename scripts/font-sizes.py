@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""Script to report the size of every table of the built fonts.
+
+Only the table directory of each font is read, no table is decompiled, so the
+whole `fonts` directory is reported in a fraction of a second. Sizes are the
+table lengths from the directory, and the file size, per font:
+
+    ./scripts/font-sizes.py --report out/font-sizes.json
+
+With `--baseline`, tables (and files) that grew by more than `--threshold`
+and at least `--min-bytes` since the baseline are reported as regressions and
+the script exits with an error. `--update-baseline` saves the current sizes
+as the new baseline, as does the first run when the baseline doesn't exist:
+
+    ./scripts/font-sizes.py --baseline out/font-sizes-baseline.json --threshold 0.05
+"""
+
+import argparse
+import json
+import logging
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from fontTools.ttLib.sfnt import SFNTReader
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONT_PATTERNS = ["*.ttf", "*.otf", "*.woff", "*.woff2"]
+REPORT_VERSION = 1
+THRESHOLD = 0.05
+MIN_BYTES = 64
+
+
+def font_key(path):
+    # fonts/ may be a symbolic link, keep its path
+    path = path.absolute()
+    if path.is_relative_to(ROOT_DIR):
+        return path.relative_to(ROOT_DIR).as_posix()
+    return path.as_posix()
+
+
+def table_sizes(path):
+    """Return the file size and the length of each table of a font."""
+    with open(path, "rb") as file:
+        reader = SFNTReader(file, checkChecksums=0)
+        tables = {tag: entry.length for tag, entry in sorted(reader.tables.items())}
+        file.seek(0, 2)
+        return {"bytes": file.tell(), "tables": tables}
+
+
+def compare(report, baseline, threshold, min_bytes):
+    """Return the (font, table, old, new) sizes that grew too much."""
+    regressions = []
+    for name, font in report["fonts"].items():
+        old_font = baseline["fonts"].get(name)
+        if old_font is None:
+            continue
+        sizes = [(None, old_font["bytes"], font["bytes"])]
+        sizes += [
+            (tag, old_font["tables"].get(tag, 0), size)
+            for tag, size in font["tables"].items()
+        ]
+        for tag, old, new in sizes:
+            if new - old >= min_bytes and new > old * (1 + threshold):
+                regressions.append((name, tag, old, new))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input_fonts",
+        metavar="FONTFILE",
+        nargs="*",
+        type=Path,
+        help="Fonts to report (default: every font in fonts/)",
+    )
+    parser.add_argument("--report", help="Write the sizes as JSON to this file")
+    parser.add_argument("--baseline", help="JSON report to compare the sizes with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Growth over the baseline reported as a regression, e.g. 0.05 for 5%%",
+    )
+    parser.add_argument(
+        "--min-bytes",
+        type=int,
+        default=MIN_BYTES,
+        help="Smallest growth in bytes reported as a regression",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the sizes to the --baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--by-font", action="store_true", help="Print the tables of each font"
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if options.update_baseline and not options.baseline:
+        parser.error("argument --update-baseline requires --baseline")
+
+    paths = options.input_fonts or sorted(
+        path
+        for pattern in FONT_PATTERNS
+        for path in (ROOT_DIR / "fonts").rglob(pattern)
+    )
+
+    report = {"version": REPORT_VERSION, "fonts": {}}
+    for path in paths:
+        try:
+            report["fonts"][font_key(path)] = table_sizes(path)
+        except Exception as e:
+            logger.warning("Skipping '%s': %s: %s", path, type(e).__name__, e)
+
+    totals = defaultdict(int)
+    for name, font in report["fonts"].items():
+        for tag, size in font["tables"].items():
+            totals[tag] += size
+        if options.by_font:
+            print(
+                f"{name}: {font['bytes']} bytes, "
+                + ", ".join(f"{tag} {size}" for tag, size in font["tables"].items())
+            )
+    total_bytes = sum(font["bytes"] for font in report["fonts"].values())
+    print(f"{len(report['fonts'])} fonts, {total_bytes} bytes")
+    for tag, size in sorted(totals.items(), key=lambda item: -item[1]):
+        print(f"  {tag:4} {size:10d} bytes {100 * size / total_bytes:5.1f}%")
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+    update_baseline = options.update_baseline
+    if options.baseline and not Path(options.baseline).exists():
+        logger.warning("No baseline at '%s', saving the sizes", options.baseline)
+        update_baseline = True
+    if update_baseline:
+        with open(options.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logger.info("Saved baseline: '%s'", options.baseline)
+    elif options.baseline:
+        with open(options.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, options.threshold, options.min_bytes)
+        for name, tag, old, new in regressions:
+            logger.error(
+                "Size regression: %s%s %d -> %d bytes (%s)",
+                name,
+                f" {tag}" if tag else "",
+                old,
+                new,
+                f"{new / old - 1:+.1%}" if old else "new table",
+            )
+        if regressions:
+            sys.exit(1)
+
+    logger.info("Done!")
+
+
+if __name__ == "__main__":
+    main()
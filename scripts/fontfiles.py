@@ -0,0 +1,85 @@
+"""Shared helpers to open and save the fonts in the Python scripts.
+
+`open_font` memory-maps the font file and opens it with `lazy=True`, so only
+the table directory is read up front, and each table is read and decompiled
+on first access. Scripts that only look at a few tables, e.g. `fvar` or `name`,
+touch a few pages of the file instead of reading and parsing all of it.
+
+Fonts opened with `cache=True` are shared by the whole process, keyed by path,
+modification time and size, so several steps of a script can open the same
+font without parsing its tables again. They must be treated as read-only and
+not closed; open the fonts to modify with `cache=False`.
+
+`save_font` writes a font through a temporary file that replaces the output,
+which is safe when the output is the memory-mapped file the font was opened
+from, including with `-i/--inplace`.
+"""
+
+import io
+import mmap
+import os
+import threading
+from pathlib import Path
+
+from fontTools.ttLib import TTFont
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_key(path, kwargs):
+    stat = os.stat(path)
+    return (
+        os.path.abspath(path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(sorted(kwargs.items())),
+    )
+
+
+def open_font(path, *, cache=True, **kwargs) -> TTFont:
+    """Return a lazily loaded font backed by a memory map of its file.
+
+    Keyword arguments are passed to `TTFont`, e.g. `fontNumber`.
+    """
+    if not cache:
+        return _open_mapped(path, kwargs)
+    key = _cache_key(path, kwargs)
+    with _cache_lock:
+        font = _cache.get(key)
+        if font is None:
+            font = _cache[key] = _open_mapped(path, kwargs)
+    return font
+
+
+def _open_mapped(path, kwargs):
+    with open(path, "rb") as file:
+        # the map stays valid after the file is closed
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return TTFont(data, lazy=True, **kwargs)
+
+
+def clear_cache():
+    """Close the cached fonts and release their memory maps."""
+    with _cache_lock:
+        for font in _cache.values():
+            font.close()
+        _cache.clear()
+
+
+def save_font(font: TTFont, path, **kwargs):
+    """Save a font, atomically replacing the file at `path`.
+
+    Keyword arguments are passed to `TTFont.save`, e.g. `reorderTables`.
+    """
+    path = Path(path)
+    output = io.BytesIO()
+    # the font may read its untouched tables from the file being replaced
+    font.save(output, **kwargs)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        temporary.write_bytes(output.getvalue())
+        temporary.replace(path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+
+"""Script to generate avar2 designspaces that drive hidden axes along a path.
+
+`sources/quadratic-rotation/avar2QuadraticRotation.designspace` maps `ZROT`
+to the hidden axes `AAAA` and `BBBB` together, and the masters at the corners
+of the hidden axes hold the H rotated by 0, 45 and 90 degrees. Along that
+diagonal, the interpolation of N hidden axes is a Bézier curve of degree N in
+the hidden axis value t, whose control points are the averages of the
+masters with the same number of hidden axes at their maximum, so the masters
+can follow paths that linear interpolation between two masters can't, such
+as rotations.
+
+This script solves for both, for any path given as expressions of u, with the
+functions of `scripts/expressions.py`, from 0 at the minimum of the driver
+axis to 1 at its maximum:
+
+- `--angle` rotates the outlines by degrees around the center of each glyph,
+- `--dx` and `--dy` move them, e.g. along an arc or a spline,
+- `--scale` scales them around the center of each glyph.
+
+The outlines of the glyphs at each u are sampled, and alternately the
+control points are fitted by least squares and the t of each sample is moved
+to the nearest point of the curve, with t a piecewise linear function of u
+through `--mappings` evenly spaced interior knots: the avar2 mappings of the
+driver axis. For each number of hidden axes and mappings, the maximum and
+mean distance in font units between the outlines of the rounded masters and
+the path are printed, so configurations can be compared in one run:
+
+    ./scripts/hoi-designspace.py \\
+      "fonts/quadratic-rotation/variable/QuadraticRotation[AAAA,BBBB,ZROT].ttf" \\
+      --glyph H --angle "90 * u" --hidden-axes 1 2 3 --mappings 0 1 2 \\
+      -o out/hoi/QuadraticRotationHOI.designspace
+
+The configuration with the smallest error is written to the output
+designspace, with a UFO master for each corner of the hidden axes next to it.
+The outlines are taken from the default location of the font.
+"""
+
+import argparse
+import itertools
+import logging
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import ufoLib2
+from fontTools.designspaceLib import (
+    AxisDescriptor,
+    AxisMappingDescriptor,
+    DesignSpaceDocument,
+    SourceDescriptor,
+)
+from fontTools.pens.pointPen import ReverseContourPointPen
+
+from expressions import evaluate_expression
+from fontfiles import open_font
+
+logger = logging.getLogger()
+
+DRIVER = "ZROT"
+DRIVER_RANGE = (0, 90)
+SAMPLES = 201
+ITERATIONS = 50
+NEWTON_STEPS = 3
+DECIMALS = 2
+
+
+def read_glyphs(font, names):
+    """Return the coordinates, flags and contour ends of simple glyphs."""
+    glyf = font["glyf"]
+    names = names or [
+        name
+        for name in font.getGlyphOrder()
+        if glyf[name].numberOfContours > 0 and not glyf[name].isComposite()
+    ]
+    glyphs = {}
+    for name in names:
+        glyph = glyf[name]
+        if glyph.isComposite() or glyph.numberOfContours <= 0:
+            raise ValueError(f"glyph {name!r} has no outline of its own")
+        coordinates, end_points, flags = glyph.getCoordinates(glyf)
+        glyphs[name] = (
+            np.array(coordinates, dtype=float).reshape(-1, 2),
+            list(flags),
+            list(end_points),
+        )
+    return glyphs
+
+
+def target_outlines(glyphs, u, angle, dx, dy, scale):
+    """Return the outlines of all glyphs at each u, of shape (u, points, 2)."""
+    radians = np.radians(evaluate_expression(angle, {"u": u}))
+    offset = np.stack(
+        [evaluate_expression(dx, {"u": u}), evaluate_expression(dy, {"u": u})], axis=-1
+    )
+    factor = evaluate_expression(scale, {"u": u})[:, None, None]
+    rotation = np.stack(
+        [
+            np.stack([np.cos(radians), -np.sin(radians)], axis=-1),
+            np.stack([np.sin(radians), np.cos(radians)], axis=-1),
+        ],
+        axis=-2,
+    )
+    outlines = []
+    for coordinates, _, _ in glyphs.values():
+        center = (coordinates.min(axis=0) + coordinates.max(axis=0)) / 2
+        relative = coordinates - center
+        # (u, 2, 2) @ (2, points) -> (u, points, 2)
+        rotated = np.swapaxes(rotation @ relative.T, -1, -2) * factor
+        outlines.append(rotated + center + offset[:, None, :])
+    return np.concatenate(outlines, axis=1)
+
+
+def bernstein(t, degree, derivative=0):
+    """Return the Bernstein basis of a degree (or of its derivative) at t."""
+    if derivative:
+        if degree == 0:
+            return np.zeros((len(t), 1))
+        lower = bernstein(t, degree - 1, derivative - 1)
+        basis = np.zeros((len(t), degree + 1))
+        basis[:, :-1] -= degree * lower
+        basis[:, 1:] += degree * lower
+        return basis
+    k = np.arange(degree + 1)
+    return (
+        np.array([math.comb(degree, i) for i in k])
+        * t[:, None] ** k
+        * (1 - t[:, None]) ** (degree - k)
+    )
+
+
+def hat_basis(u, knots):
+    return np.stack(
+        [np.interp(u, knots, np.eye(len(knots))[i]) for i in range(len(knots))],
+        axis=1,
+    )
+
+
+def solve(targets, u, degree, mappings, iterations):
+    """Return the control points and the knots of t(u) approximating targets.
+
+    The first and last control points are the outlines at u = 0 and 1, and
+    t(0) = 0 and t(1) = 1, so the default master and the ends are exact.
+    """
+    samples, points, _ = targets.shape
+    flat = targets.reshape(samples, -1)
+    knot_u = np.linspace(0, 1, mappings + 2)
+    knot_t = knot_u.copy()
+    hats = hat_basis(u, knot_u)
+    control = np.empty((degree + 1, flat.shape[1]))
+    control[0], control[-1] = flat[0], flat[-1]
+    for _ in range(iterations if mappings else 1):
+        t = hats @ knot_t
+        if degree > 1:
+            basis = bernstein(t, degree)
+            residual = flat - np.outer(basis[:, 0], control[0])
+            residual -= np.outer(basis[:, -1], control[-1])
+            control[1:-1], *_ = np.linalg.lstsq(basis[:, 1:-1], residual, rcond=None)
+        if not mappings:
+            break
+        # move each sample to the nearest point of the curve
+        for _ in range(NEWTON_STEPS):
+            error = bernstein(t, degree) @ control - flat
+            first = bernstein(t, degree, 1) @ control
+            second = bernstein(t, degree, 2) @ control
+            gradient = (error * first).sum(axis=1)
+            hessian = (first * first + error * second).sum(axis=1)
+            step = np.where(hessian > 0, gradient / np.maximum(hessian, 1e-12), 0)
+            t = np.clip(t - step, 0, 1)
+        # the interior knots of t(u), by least squares
+        residual = t - hats[:, 0] * knot_t[0] - hats[:, -1] * knot_t[-1]
+        interior, *_ = np.linalg.lstsq(hats[:, 1:-1], residual, rcond=None)
+        knot_t[1:-1] = np.clip(np.maximum.accumulate(interior), 0, 1)
+    return control.reshape(degree + 1, points, 2), knot_u, knot_t
+
+
+def distances(control, knot_u, knot_t, u, targets):
+    """Return the distance of each point of the curve to the targets."""
+    t = np.interp(u, knot_u, knot_t)
+    degree = len(control) - 1
+    outlines = np.einsum("sk,kpc->spc", bernstein(t, degree), control)
+    return np.linalg.norm(outlines - targets, axis=-1)
+
+
+def fit(targets, u, degree, mappings, iterations, driver_range):
+    """Return the rounded solution of a configuration and its errors."""
+    start = time.perf_counter()
+    control, knot_u, knot_t = solve(targets, u, degree, mappings, iterations)
+    # the values stored in the sources and the designspace
+    control = np.floor(control + 0.5)
+    span = driver_range[1] - driver_range[0]
+    knot_t = np.round(knot_t * span, DECIMALS) / span
+    error = distances(control, knot_u, knot_t, u, targets)
+    return {
+        "hidden_axes": degree,
+        "mappings": mappings,
+        "control": control,
+        "knot_u": knot_u,
+        "knot_t": knot_t,
+        "max_error": float(error.max()),
+        "mean_error": float(error.mean()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def hidden_tags(count):
+    return [chr(ord("A") + i) * 4 for i in range(count)]
+
+
+def write_master(path, font, glyphs, outlines):
+    """Write a UFO with the glyphs of the font, with the given outlines."""
+    ufo = ufoLib2.Font()
+    ufo.info.unitsPerEm = font["head"].unitsPerEm
+    if "hhea" in font:
+        ufo.info.ascender = font["hhea"].ascent
+        ufo.info.descender = font["hhea"].descent
+    unicodes = {}
+    for code, name in font.getBestCmap().items():
+        unicodes.setdefault(name, []).append(code)
+    offset = 0
+    for name, (coordinates, flags, end_points) in glyphs.items():
+        points = outlines[offset : offset + len(coordinates)]
+        offset += len(coordinates)
+        glyph = ufo.newGlyph(name)
+        glyph.width = font["hmtx"][name][0]
+        glyph.unicodes = unicodes.get(name, [])
+        # UFOs have PostScript contour directions, compilers reverse them
+        pen = ReverseContourPointPen(glyph.getPointPen())
+        start = 0
+        for end in end_points:
+            on_curve = [flag & 1 for flag in flags[start : end + 1]]
+            pen.beginPath()
+            for index in range(start, end + 1):
+                if not on_curve[index - start]:
+                    segment = None
+                elif on_curve[index - start - 1]:
+                    segment = "line"
+                else:
+                    segment = "qcurve"
+                x, y = points[index]
+                pen.addPoint((float(x), float(y)), segment)
+            pen.endPath()
+            start = end + 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ufo.save(path, overwrite=True)
+
+
+def write_designspace(path, font, glyphs, solution, driver, driver_range):
+    degree = solution["hidden_axes"]
+    tags = hidden_tags(degree)
+    document = DesignSpaceDocument()
+    document.addAxis(
+        AxisDescriptor(
+            tag=driver,
+            name=driver,
+            minimum=driver_range[0],
+            default=driver_range[0],
+            maximum=driver_range[1],
+        )
+    )
+    for tag in tags:
+        document.addAxis(
+            AxisDescriptor(
+                tag=tag,
+                name=tag,
+                minimum=driver_range[0],
+                default=driver_range[0],
+                maximum=driver_range[1],
+                hidden=True,
+            )
+        )
+    span = driver_range[1] - driver_range[0]
+    for u, t in zip(solution["knot_u"][1:], solution["knot_t"][1:]):
+        # the default location maps to itself
+        document.axisMappings.append(
+            AxisMappingDescriptor(
+                inputLocation={driver: round(driver_range[0] + u * span, DECIMALS)},
+                outputLocation={
+                    tag: round(driver_range[0] + t * span, DECIMALS) for tag in tags
+                },
+            )
+        )
+    for corner in itertools.product([0, 1], repeat=degree):
+        suffix = "".join(map(str, corner))
+        master_path = path.with_name(f"{path.stem}-{suffix}.ufo")
+        write_master(master_path, font, glyphs, solution["control"][sum(corner)])
+        location = {driver: driver_range[0]}
+        location.update({tag: driver_range[bit] for tag, bit in zip(tags, corner)})
+        document.addSource(
+            SourceDescriptor(
+                filename=master_path.name,
+                name=f"master-{suffix}",
+                location=location,
+            )
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document.write(path)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input_font", metavar="FONTFILE", type=Path)
+    parser.add_argument(
+        "--glyph",
+        dest="glyphs",
+        action="append",
+        help="Glyph to move along the path (default: every glyph with outlines)",
+    )
+    parser.add_argument("--angle", default="90 * u", help="Rotation in degrees")
+    parser.add_argument("--dx", default="0", help="Horizontal offset")
+    parser.add_argument("--dy", default="0", help="Vertical offset")
+    parser.add_argument("--scale", default="1", help="Scale factor")
+    parser.add_argument("--driver", default=DRIVER, help="Tag of the driver axis")
+    parser.add_argument(
+        "--driver-range",
+        nargs=2,
+        type=float,
+        default=DRIVER_RANGE,
+        metavar=("MIN", "MAX"),
+        help="Range of the driver and hidden axes, the minimum is the default",
+    )
+    parser.add_argument(
+        "--hidden-axes",
+        nargs="+",
+        type=int,
+        default=[2],
+        help="Numbers of hidden axes to try",
+    )
+    parser.add_argument(
+        "--mappings",
+        nargs="+",
+        type=int,
+        default=[0],
+        help="Numbers of interior mappings of the driver axis to try",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=SAMPLES, help="Samples along the path"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=ITERATIONS,
+        help="Iterations of the fit of the mappings",
+    )
+    parser.add_argument("-o", "--output-file", type=Path, help="Output designspace")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if min(options.hidden_axes) < 1 or min(options.mappings) < 0:
+        parser.error("at least 1 hidden axis and 0 mappings are required")
+
+    font = open_font(options.input_font)
+    try:
+        glyphs = read_glyphs(font, options.glyphs)
+    except (KeyError, ValueError) as error:
+        parser.error(str(error))
+    u = np.linspace(0, 1, options.samples)
+    try:
+        targets = target_outlines(
+            glyphs, u, options.angle, options.dx, options.dy, options.scale
+        )
+    except ValueError as error:
+        parser.error(str(error))
+
+    solutions = []
+    for degree in options.hidden_axes:
+        for mappings in options.mappings:
+            solution = fit(
+                targets,
+                u,
+                degree,
+                mappings,
+                options.iterations,
+                options.driver_range,
+            )
+            solutions.append(solution)
+            print(
+                f"{degree} hidden axes, {mappings} mappings: "
+                f"max error {solution['max_error']:.2f}, "
+                f"mean error {solution['mean_error']:.2f} units "
+                f"({solution['seconds'] * 1000:.0f} ms)"
+            )
+
+    if options.output_file:
+        # the simplest of the most accurate configurations
+        best = min(
+            solutions,
+            key=lambda s: (round(s["max_error"], 2), s["hidden_axes"], s["mappings"]),
+        )
+        write_designspace(
+            options.output_file,
+            font,
+            glyphs,
+            best,
+            options.driver,
+            options.driver_range,
+        )
+        print(
+            f"Saved {best['hidden_axes']} hidden axes, {best['mappings']} mappings: "
+            f"'{options.output_file}'"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+
+"""Local HTTP server of static instances of the variable fonts.
+
+Browsers without avar2 support can't show the avar2 fonts as intended, but
+static instances made by fontTools, which applies `avar`, look the same in
+every browser. The server instantiates the variable fonts of `fonts/` on
+demand, e.g.
+
+    ./scripts/instance-server.py --port 8001
+    curl "http://localhost:8001/font/TestFontAvar2?wght=900&wdth=75&opsz=16"
+
+- `/font/<name>?<axis>=<value>...` returns the instance of the font whose
+  file name is `<name>[<axes>].ttf` (or `<name>.ttf` when several fonts
+  share a name), at the given design location. Missing axes are at their
+  default, values are clamped to the axis range and rounded to `--quantum`,
+  so that nearby locations share instances. `format=woff2` returns a WOFF2
+  file instead of a TTF file.
+- `/fonts` lists the fonts and their axes as JSON.
+
+The variable fonts are parsed once and kept in memory. Instances are cached in
+memory, and on disk in `out/instances`, with least recently used instances
+evicted beyond `--memory-cache-mb` and `--disk-cache-mb`. Responses have an
+`ETag`, so browsers revalidate them without downloading them again.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from fontTools.ttLib import TTFont
+from fontTools.varLib.instancer import OverlapMode, instantiateVariableFont
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT_DIR / "fonts"
+CONTENT_TYPES = {"ttf": "font/ttf", "woff2": "font/woff2"}
+
+
+class MemoryCache:
+    """Least recently used cache of bytes, bounded by their total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            data = self.items.get(key)
+            if data is not None:
+                self.items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self.lock:
+            if key in self.items:
+                return
+            self.items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self.items) > 1:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DiskCache:
+    """Least recently used cache of files, using their modification time."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def path(self, key):
+        return self.directory / key[:2] / key
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key, data):
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        temporary.replace(path)
+        self.prune()
+
+    def prune(self):
+        with self.lock:
+            files = []
+            for path in self.directory.glob("*/*"):
+                if path.suffix == ".tmp":
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, path))
+            size = sum(file_size for _, file_size, _ in files)
+            for _, file_size, path in sorted(files):
+                if size <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                size -= file_size
+
+
+class VariableFont:
+    """A parsed variable font and the lock serializing its instancing."""
+
+    def __init__(self, path):
+        self.path = path
+        data = path.read_bytes()
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.font = TTFont(io.BytesIO(data))
+        self.axes = {
+            axis.axisTag: (axis.minValue, axis.defaultValue, axis.maxValue)
+            for axis in self.font["fvar"].axes
+        }
+        self.lock = threading.Lock()
+
+    def location(self, query, quantum):
+        """Return the quantized design location of the query parameters."""
+        location = {}
+        for tag, (minimum, default, maximum) in self.axes.items():
+            value = float(query.get(tag, default))
+            value = min(max(value, minimum), maximum)
+            location[tag] = round(round(value / quantum) * quantum, 6)
+        return location
+
+    def instantiate(self, location, flavor):
+        with self.lock:
+            # the instancer copies the font, which stays untouched
+            instance = instantiateVariableFont(
+                self.font,
+                location,
+                optimize=True,
+                overlap=OverlapMode.KEEP_AND_SET_FLAGS,
+            )
+        instance.flavor = flavor
+        output = io.BytesIO()
+        instance.save(output)
+        return output.getvalue()
+
+
+class InstanceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fonts, quantum, memory_cache, disk_cache):
+        super().__init__(address, InstanceRequestHandler)
+        self.font_paths = fonts
+        self.fonts = {}
+        self.fonts_lock = threading.Lock()
+        self.quantum = quantum
+        self.memory_cache = memory_cache
+        self.disk_cache = disk_cache
+
+    def variable_font(self, name):
+        """Return the parsed variable font, parsing it on first use."""
+        with self.fonts_lock:
+            if name not in self.fonts:
+                self.fonts[name] = VariableFont(self.font_paths[name])
+            return self.fonts[name]
+
+    def instance(self, name, query):
+        """Return the cache key and data of an instance."""
+        font = self.variable_font(name)
+        location = font.location(query, self.quantum)
+        flavor = query.get("format", "ttf")
+        if flavor not in CONTENT_TYPES:
+            raise ValueError(f"unknown format {flavor!r}")
+        key = hashlib.sha256(
+            json.dumps([font.digest, sorted(location.items()), flavor]).encode()
+        ).hexdigest()
+
+        data = self.memory_cache.get(key)
+        if data is not None:
+            logger.debug("Memory cache hit: %s %s", name, location)
+            return key, data
+        data = self.disk_cache.get(key)
+        if data is not None:
+            logger.debug("Disk cache hit: %s %s", name, location)
+        else:
+            logger.info("Instantiating %s at %s", name, location)
+            data = font.instantiate(location, None if flavor == "ttf" else flavor)
+            self.disk_cache.put(key, data)
+        self.memory_cache.put(key, data)
+        return key, data
+
+
+class InstanceRequestHandler(BaseHTTPRequestHandler):
+    server_version = "how2avar2-instances"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        if url.path == "/fonts":
+            self.send_json(self.list_fonts())
+        elif url.path.startswith("/font/"):
+            self.send_instance(unquote(url.path.removeprefix("/font/")), query)
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def list_fonts(self):
+        fonts = {}
+        for name, path in sorted(self.server.font_paths.items()):
+            font = self.server.variable_font(name)
+            fonts[name] = {
+                "path": path.relative_to(ROOT_DIR).as_posix(),
+                "axes": {
+                    tag: dict(zip(["min", "default", "max"], triple))
+                    for tag, triple in font.axes.items()
+                },
+            }
+        return fonts
+
+    def send_instance(self, name, query):
+        if name not in self.server.font_paths:
+            self.send_error(HTTPStatus.NOT_FOUND, f"unknown font {name!r}")
+            return
+        try:
+            key, data = self.server.instance(name, query)
+        except ValueError as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        etag = f'"{key[:32]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES[query.get("format", "ttf")])
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, value):
+        data = (json.dumps(value, indent=2) + "\n").encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def find_fonts(fonts_dir):
+    """Return the variable fonts by file name, without the axes part if unique."""
+    paths = sorted(fonts_dir.glob("*/variable/*.ttf"))
+    names = [path.name.split("[")[0] for path in paths]
+    return {
+        name if names.count(name) == 1 else path.stem: path
+        for name, path in zip(names, paths)
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on")
+    parser.add_argument(
+        "--quantum",
+        type=float,
+        default=1,
+        help="Step, in design units, that locations are rounded to",
+    )
+    parser.add_argument(
+        "--memory-cache-mb",
+        type=float,
+        default=64,
+        help="Size of the in-memory instance cache",
+    )
+    parser.add_argument(
+        "--disk-cache-mb",
+        type=float,
+        default=512,
+        help="Size of the on-disk instance cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=ROOT_DIR / "out" / "instances",
+        help="Directory of the on-disk instance cache",
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.quantum <= 0:
+        parser.error("argument --quantum must be positive")
+
+    fonts = find_fonts(FONTS_DIR)
+    server = InstanceServer(
+        (options.host, options.port),
+        fonts,
+        options.quantum,
+        MemoryCache(options.memory_cache_mb * (1 << 20)),
+        DiskCache(options.cache_dir, options.disk_cache_mb * (1 << 20)),
+    )
+    print(
+        f"Serving instances of {len(fonts)} fonts on "
+        f"http://{options.host}:{server.server_port}/fonts"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
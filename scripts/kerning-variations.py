@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+
+"""Script to evaluate the variable kerning of fonts across the design space.
+
+The `2.1-kerning` and `2.2-kerning-fences` reftests check that the `L T`
+kerning of the test fonts varies with the axes, and stops at the fences,
+by looking at screenshots. This script reads the kerning of the `kern`
+feature instead: the `XAdvance` of the first glyph of each `GPOS` pair, and
+its `VariationIndex` delta in the `GDEF` variation store.
+
+For each font, a grid of user-space locations (`--steps` per axis) is mapped
+through `avar` and the kerning of every pair is evaluated at all locations
+at once, as a matrix product of region scalars and deltas. Between
+neighbouring grid locations, the steepest change is zoomed in on until the
+locations are `--tolerance` user units apart; a change that remains larger
+than `--jump` units there is a discontinuity, like the ones a font with
+broken fences would have.
+
+    ./scripts/kerning-variations.py --csv out/kerning.csv --plots out/kerning
+
+prints the range and discontinuities of each pair (and with `--instances`,
+its value at the named instances), and writes the kerning at every grid
+location to the CSV file and a plot of the kerning along each axis to the
+plot directory. By default, the fonts of `fonts/test-font/variable` are
+evaluated.
+"""
+
+import argparse
+import csv
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from fontfiles import open_font
+from variations import NO_VARIATION, AxisMapping, VarStoreEvaluator, user_grid
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT_DIR / "fonts" / "test-font" / "variable"
+VARIATION_INDEX_FORMAT = 0x8000
+STEPS = 21
+TOLERANCE = 1e-3
+JUMP = 0.5
+SUBDIVISIONS = 8
+PLOT_SIZE = (480, 240)
+PLOT_MARGIN = 40
+
+
+def kern_lookups(gpos):
+    """Return the pair positioning subtables of the `kern` feature."""
+    indices = sorted(
+        {
+            index
+            for record in gpos.FeatureList.FeatureRecord
+            if record.FeatureTag == "kern"
+            for index in record.Feature.LookupListIndex
+        }
+    )
+    subtables = []
+    for index in indices:
+        for subtable in gpos.LookupList.Lookup[index].SubTable:
+            if subtable.LookupType == 9:
+                subtable = subtable.ExtSubTable
+            if subtable.LookupType == 2:
+                subtables.append(subtable)
+    return subtables
+
+
+def value_kerning(value):
+    """Return the default kerning and variation index of a value record."""
+    if value is None:
+        return 0, NO_VARIATION
+    device = getattr(value, "XAdvDevice", None)
+    var_index = NO_VARIATION
+    if device is not None and device.DeltaFormat == VARIATION_INDEX_FORMAT:
+        var_index = (device.StartSize << 16) | device.EndSize
+    return getattr(value, "XAdvance", 0), var_index
+
+
+def kerning_pairs(font):
+    """Return the default kerning and variation index of each glyph pair.
+
+    The first subtable with a pair wins, like in shaping.
+    """
+    if "GPOS" not in font:
+        return {}
+    pairs = {}
+    for subtable in kern_lookups(font["GPOS"].table):
+        if subtable.Format == 1:
+            for first, pair_set in zip(subtable.Coverage.glyphs, subtable.PairSet):
+                for record in pair_set.PairValueRecord:
+                    pairs.setdefault(
+                        (first, record.SecondGlyph), value_kerning(record.Value1)
+                    )
+        elif subtable.Format == 2:
+            classes1 = subtable.ClassDef1.classDefs
+            classes2 = subtable.ClassDef2.classDefs
+            second_glyphs = {}
+            for glyph in font.getGlyphOrder():
+                second_glyphs.setdefault(classes2.get(glyph, 0), []).append(glyph)
+            for first in subtable.Coverage.glyphs:
+                class1 = subtable.Class1Record[classes1.get(first, 0)]
+                for class2, record in enumerate(class1.Class2Record):
+                    kerning = value_kerning(record.Value1)
+                    if kerning == (0, NO_VARIATION):
+                        continue
+                    for second in second_glyphs.get(class2, []):
+                        pairs.setdefault((first, second), kerning)
+    return pairs
+
+
+class KerningEvaluator:
+    """Evaluates the kerning of glyph pairs at arrays of user locations."""
+
+    def __init__(self, font, pairs):
+        self.mapping = AxisMapping(font)
+        gdef = font["GDEF"].table if "GDEF" in font else None
+        self.store = getattr(gdef, "VarStore", None)
+        self.pairs = list(pairs.values())
+
+    def __call__(self, user, index=None):
+        """Return the unrounded kerning of shape (locations, pairs).
+
+        With `index`, return the kerning of that pair only, of shape (locations,).
+        """
+        coords = self.mapping.normalize(user)
+        deltas = VarStoreEvaluator(self.store, coords) if self.store else None
+        pairs = self.pairs if index is None else [self.pairs[index]]
+        kerning = np.empty((len(user), len(pairs)))
+        for column, (default, var_index) in enumerate(pairs):
+            kerning[:, column] = default
+            if deltas is not None and var_index != NO_VARIATION:
+                kerning[:, column] += deltas[var_index]
+        return kerning if index is None else kerning[:, 0]
+
+
+def find_jumps(evaluate, low, high, axis_index, tolerance):
+    """Return the location and size of the steepest change between locations.
+
+    Each interval along the axis is cut in `SUBDIVISIONS` and the piece with
+    the largest change is kept, until the pieces are `tolerance` units long.
+    """
+    low, high = low.copy(), high.copy()
+    steps = np.linspace(0, 1, SUBDIVISIONS + 1)
+    rows = np.arange(len(low))
+    while np.max(high[:, axis_index] - low[:, axis_index], initial=0) > tolerance:
+        points = np.repeat(low[:, None, :], len(steps), axis=1)
+        points[..., axis_index] += (
+            steps * (high[:, axis_index] - low[:, axis_index])[:, None]
+        )
+        values = evaluate(points.reshape(-1, low.shape[1])).reshape(len(low), -1)
+        piece = np.abs(np.diff(values, axis=1)).argmax(axis=1)
+        low[:, axis_index] = points[rows, piece, axis_index]
+        high[:, axis_index] = points[rows, piece + 1, axis_index]
+    return (low[:, axis_index] + high[:, axis_index]) / 2, evaluate(high) - evaluate(
+        low
+    )
+
+
+def named_locations(font):
+    """Return the default location and the named instances of a font."""
+    axes = font["fvar"].axes
+    locations = {"default": {axis.axisTag: axis.defaultValue for axis in axes}}
+    name = font["name"] if "name" in font else None
+    for instance in font["fvar"].instances:
+        label = name.getDebugName(instance.subfamilyNameID) if name else None
+        locations[label or f"instance {len(locations)}"] = dict(instance.coordinates)
+    return locations
+
+
+def evaluate_font(path, selected, steps, tolerance, jump):
+    """Return the kerning of the pairs of a font over a grid of locations."""
+    font = open_font(path, cache=False)
+    pairs = kerning_pairs(font)
+    if selected:
+        for pair in selected:
+            if pair not in pairs:
+                logger.warning("%s: %s %s is not kerned", path.name, *pair)
+        pairs = {pair: pairs[pair] for pair in selected if pair in pairs}
+    evaluator = KerningEvaluator(font, pairs)
+    tags = evaluator.mapping.tags
+    axis_values, grid = user_grid(evaluator.mapping.axes, steps)
+    shape = tuple(len(values) for values in axis_values)
+    kerning = np.floor(evaluator(grid) + 0.5)
+    locations = named_locations(font)
+    at_locations = np.floor(
+        evaluator(
+            np.array(
+                [
+                    [location.get(tag, 0) for tag in tags]
+                    for location in locations.values()
+                ]
+            )
+        )
+        + 0.5
+    )
+
+    results = {}
+    points = grid.reshape(*shape, len(tags))
+    for index, pair in enumerate(pairs):
+        values = kerning[:, index].reshape(shape)
+        result = results[" ".join(pair)] = {
+            "range": [float(values.min()), float(values.max())],
+            "locations": dict(zip(locations, at_locations[:, index].tolist())),
+            "jumps": [],
+        }
+        for axis_index, tag in enumerate(tags):
+            # neighbours along the axis whose kerning differs
+            before = [slice(None)] * len(shape)
+            after = [slice(None)] * len(shape)
+            before[axis_index] = slice(None, -1)
+            after[axis_index] = slice(1, None)
+            before, after = tuple(before), tuple(after)
+            changed = values[before] != values[after]
+            if not changed.any():
+                continue
+            low = points[before][changed]
+            positions, sizes = find_jumps(
+                lambda user: evaluator(user, index),
+                low,
+                points[after][changed],
+                axis_index,
+                tolerance,
+            )
+            for location, position, size in zip(low, positions, sizes):
+                if abs(size) > jump:
+                    location = dict(zip(tags, location.tolist()))
+                    location[tag] = round(float(position), 4)
+                    result["jumps"].append(
+                        {"axis": tag, "location": location, "size": float(size)}
+                    )
+    defaults = [axis.defaultValue for axis in evaluator.mapping.axes]
+    font.close()
+    return {
+        "tags": tags,
+        "defaults": defaults,
+        "axis_values": axis_values,
+        "grid": grid,
+        "kerning": kerning,
+        "pairs": results,
+    }
+
+
+def plot_pair(path, title, tags, axis_values, values, defaults):
+    """Plot the kerning of a pair along each axis.
+
+    The line is the kerning with the other axes at their defaults, and the band
+    its range over the other axes.
+    """
+    width, height = PLOT_SIZE
+    image = Image.new("RGB", (width, height * len(tags)), "white")
+    draw = ImageDraw.Draw(image)
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        low, high = low - 1, high + 1
+    shape = tuple(len(v) for v in axis_values)
+    values = values.reshape(shape)
+    for axis_index, tag in enumerate(tags):
+        top = axis_index * height
+        x_values = axis_values[axis_index]
+        other_axes = tuple(i for i in range(len(tags)) if i != axis_index)
+        band_low = values.min(axis=other_axes)
+        band_high = values.max(axis=other_axes)
+        at_default = tuple(
+            (
+                slice(None)
+                if i == axis_index
+                else int(np.abs(axis_values[i] - defaults[i]).argmin())
+            )
+            for i in range(len(tags))
+        )
+        line = values[at_default]
+
+        def x(value):
+            span = x_values[-1] - x_values[0] or 1
+            return PLOT_MARGIN + (value - x_values[0]) / span * (
+                width - 2 * PLOT_MARGIN
+            )
+
+        def y(value):
+            return (
+                top
+                + height
+                - PLOT_MARGIN
+                - (value - low) / (high - low) * (height - 2 * PLOT_MARGIN)
+            )
+
+        draw.polygon(
+            [(x(v), y(k)) for v, k in zip(x_values, band_high)]
+            + [(x(v), y(k)) for v, k in reversed(list(zip(x_values, band_low)))],
+            fill=(210, 225, 245),
+        )
+        if low < 0 < high:
+            draw.line([(x(x_values[0]), y(0)), (x(x_values[-1]), y(0))], fill="gray")
+        draw.line([(x(v), y(k)) for v, k in zip(x_values, line)], fill="black", width=2)
+        draw.rectangle(
+            [
+                (PLOT_MARGIN, top + PLOT_MARGIN),
+                (width - PLOT_MARGIN, top + height - PLOT_MARGIN),
+            ],
+            outline="gray",
+        )
+        draw.text((PLOT_MARGIN, top + 10), f"{title} ({tag})", fill="black")
+        draw.text((4, y(high) - 6), f"{high:g}", fill="black")
+        draw.text((4, y(low) - 6), f"{low:g}", fill="black")
+        draw.text((x(x_values[0]), y(low) + 8), f"{x_values[0]:g}", fill="black")
+        draw.text((x(x_values[-1]) - 24, y(low) + 8), f"{x_values[-1]:g}", fill="black")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input_fonts",
+        metavar="FONTFILE",
+        nargs="*",
+        type=Path,
+        help="Variable fonts (default: fonts/test-font/variable/*.ttf)",
+    )
+    parser.add_argument(
+        "--pair",
+        nargs=2,
+        action="append",
+        metavar=("FIRST", "SECOND"),
+        help="Glyph pair to evaluate (default: every kerned pair)",
+    )
+    parser.add_argument(
+        "--steps", type=int, default=STEPS, help="Grid locations along each axis"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=TOLERANCE,
+        help="Distance in user units at which changes count as jumps",
+    )
+    parser.add_argument(
+        "--jump",
+        type=float,
+        default=JUMP,
+        help="Smallest change in font units reported as a discontinuity",
+    )
+    parser.add_argument(
+        "--instances",
+        action="store_true",
+        help="Print the kerning at the named instances",
+    )
+    parser.add_argument(
+        "--csv", help="Write the kerning at every location to this file"
+    )
+    parser.add_argument("--plots", type=Path, help="Write PNG plots to this directory")
+    parser.add_argument("--report", help="Write the results as JSON to this file")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.steps < 2:
+        parser.error("--steps must be at least 2")
+    paths = options.input_fonts or sorted(FONTS_DIR.glob("*.ttf"))
+    selected = [tuple(pair) for pair in options.pair or []]
+
+    report = {}
+    csv_rows = []
+    for path in paths:
+        result = evaluate_font(
+            path, selected, options.steps, options.tolerance, options.jump
+        )
+        report[path.name] = result["pairs"]
+        print(f"{path.name}:")
+        if not result["pairs"]:
+            print("  no variable kerning")
+        for pair, pair_result in result["pairs"].items():
+            low, high = pair_result["range"]
+            print(f"  {pair}: {low:g} to {high:g}")
+            width = max(map(len, pair_result["locations"]))
+            if options.instances:
+                for label, value in pair_result["locations"].items():
+                    print(f"    {label.ljust(width)} {value:6g}")
+            for tag in result["tags"]:
+                jumps = [jump for jump in pair_result["jumps"] if jump["axis"] == tag]
+                if not jumps:
+                    continue
+                positions = [jump["location"][tag] for jump in jumps]
+                sizes = sorted((jump["size"] for jump in jumps), key=abs)
+                print(
+                    f"    {len(jumps)} jumps along {tag} at {tag}="
+                    f"{min(positions):g}:{max(positions):g}, "
+                    f"{sizes[0]:+.2f} to {sizes[-1]:+.2f} units"
+                )
+
+        pairs = list(result["pairs"])
+        for location, values in zip(result["grid"], result["kerning"]):
+            location = " ".join(
+                f"{tag}={value:g}" for tag, value in zip(result["tags"], location)
+            )
+            csv_rows.extend(
+                [path.name, location, pair, f"{value:g}"]
+                for pair, value in zip(pairs, values)
+            )
+        if options.plots:
+            for index, pair in enumerate(pairs):
+                plot_path = options.plots / f"{path.stem}-{pair.replace(' ', '_')}.png"
+                plot_pair(
+                    plot_path,
+                    f"{path.name} {pair}",
+                    result["tags"],
+                    result["axis_values"],
+                    result["kerning"][:, index],
+                    result["defaults"],
+                )
+                logger.info("Saved plot: '%s'", plot_path)
+
+    if options.csv:
+        with open(options.csv, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["font", "location", "pair", "kerning"])
+            writer.writerows(csv_rows)
+        logger.info("Saved table: '%s'", options.csv)
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+"""Script to shrink the avar2 `ItemVariationStore` of the input fonts.
+
+On top of the `VarStore.optimize()` pass already run by
+`fonttools varLib.avar.build`, the delta sets are rebuilt so that:
+
+- regions with the same effective axis ranges are merged and their deltas
+  added up (axes ignored by a region, e.g. with a zero peak, compare equal),
+- zero deltas are dropped, and delta sets without any delta no longer get a
+  row in the store,
+- rows are regrouped into the smallest word/byte encoding by
+  `VarStore.optimize()`, and unused regions are pruned,
+- the `VarIdxMap` is omitted when it's the implicit identity mapping.
+
+The optimized table is only kept if it's smaller and maps every location of a
+dense grid of normalized coordinates, plus every region start, peak and end,
+to the same F2Dot14 values as before.
+
+With `--benchmark`, the `avar` table size and the average time of a lookup
+with fontTools (`avar.renormalizeLocation`) and HarfBuzz (setting design
+coordinates) are measured over the same grid before and after.
+"""
+
+import argparse
+import copy
+import io
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+
+from fontTools.misc.cliTools import makeOutputFileName
+from fontTools.ttLib.tables.otTables import NO_VARIATION_INDEX
+from fontTools.varLib.builder import (
+    buildDeltaSetIndexMap,
+    buildVarData,
+    buildVarRegionList,
+    buildVarStore,
+)
+
+from fontfiles import open_font, save_font
+
+logger = logging.getLogger()
+
+GRID_STEPS = 17
+BENCHMARK_REPEATS = 5
+
+
+def canonical_region(region):
+    """Return the (start, peak, end) of each axis, with ignored axes zeroed."""
+    axes = []
+    for axis in region.VarRegionAxis:
+        start, peak, end = axis.StartCoord, axis.PeakCoord, axis.EndCoord
+        # same conditions as VarStoreInstancer: the axis doesn't scale deltas
+        if peak == 0 or start > peak or peak > end or start < 0 < end:
+            start = peak = end = 0.0
+        axes.append((start, peak, end))
+    return tuple(axes)
+
+
+def read_delta_sets(store):
+    """Return the non-zero deltas by canonical region of each VarIdx."""
+    regions = [canonical_region(region) for region in store.VarRegionList.Region]
+    delta_sets = {}
+    for outer, data in enumerate(store.VarData):
+        for inner, item in enumerate(data.Item):
+            deltas = defaultdict(int)
+            for region_index, delta in zip(data.VarRegionIndex, item):
+                deltas[regions[region_index]] += delta
+            delta_sets[(outer << 16) | inner] = {
+                region: delta for region, delta in deltas.items() if delta
+            }
+    return delta_sets
+
+
+def optimize_avar(font):
+    """Return an optimized copy of the avar2 table, or None if not avar2."""
+    avar = font["avar"]
+    if getattr(avar, "majorVersion", 1) < 2 or avar.table.VarStore is None:
+        return None
+
+    axis_tags = [axis.axisTag for axis in font["fvar"].axes]
+    old_map = avar.table.VarIdxMap
+    old_var_idxes = [
+        old_map.mapping[i] if old_map is not None else i for i in range(len(axis_tags))
+    ]
+
+    delta_sets = read_delta_sets(avar.table.VarStore)
+    used_var_idxes = sorted(
+        {idx for idx in old_var_idxes if delta_sets.get(idx)},
+    )
+    regions = sorted(
+        {region for idx in used_var_idxes for region in delta_sets[idx]},
+    )
+
+    supports = [
+        {tag: triple for tag, triple in zip(axis_tags, region) if any(triple)}
+        for region in regions
+    ]
+    rows = [
+        [delta_sets[idx].get(region, 0) for region in regions] for idx in used_var_idxes
+    ]
+    store = buildVarStore(
+        buildVarRegionList(supports, axis_tags),
+        [buildVarData(list(range(len(regions))), rows, optimize=False)],
+    )
+    back_mapping = store.optimize()
+
+    new_var_idxes = []
+    for idx in old_var_idxes:
+        if idx in used_var_idxes:
+            new_var_idxes.append(back_mapping[used_var_idxes.index(idx)])
+        else:
+            new_var_idxes.append(NO_VARIATION_INDEX)
+
+    new_avar = copy.deepcopy(avar)
+    new_avar.table.VarStore = store
+    # None for the identity mapping
+    new_avar.table.VarIdxMap = buildDeltaSetIndexMap(new_var_idxes)
+    return new_avar
+
+
+def sample_grid(font, avar, steps):
+    """Return normalized locations covering the axes and the region corners."""
+    tags = [axis.axisTag for axis in font["fvar"].axes]
+    values = {tag: {-1 + 2 * i / (steps - 1) for i in range(steps)} for tag in tags}
+    for region in avar.table.VarStore.VarRegionList.Region:
+        for tag, axis in zip(tags, region.VarRegionAxis):
+            values[tag].update([axis.StartCoord, axis.PeakCoord, axis.EndCoord])
+    return [
+        dict(zip(tags, location))
+        for location in itertools.product(*(sorted(values[tag]) for tag in tags))
+    ]
+
+
+def verify(font, old_avar, new_avar, locations):
+    for location in locations:
+        old = old_avar.renormalizeLocation(location, font, dropZeroes=False)
+        new = new_avar.renormalizeLocation(location, font, dropZeroes=False)
+        if old != new:
+            logger.warning("  Mismatch at %s: %s != %s", location, old, new)
+            return False
+    return True
+
+
+def benchmark(font, avar, locations):
+    """Return the table size and the fastest average lookup time in ns."""
+    import uharfbuzz as hb
+
+    old_avar = font["avar"]
+    font["avar"] = avar
+    data = io.BytesIO()
+    font.save(data)
+    font["avar"] = old_avar
+
+    axes = font["fvar"].axes
+    design_locations = [
+        [
+            axis.defaultValue
+            + location.get(axis.axisTag, 0)
+            * (
+                axis.defaultValue - axis.minValue
+                if location.get(axis.axisTag, 0) < 0
+                else axis.maxValue - axis.defaultValue
+            )
+            for axis in axes
+        ]
+        for location in locations
+    ]
+    hb_font = hb.Font(hb.Face(data.getvalue()))
+
+    def fonttools_lookups():
+        for location in locations:
+            avar.renormalizeLocation(location, font)
+
+    def harfbuzz_lookups():
+        for coords in design_locations:
+            hb_font.set_var_coords_design(coords)
+
+    result = {"bytes": len(avar.compile(font))}
+    for name, lookups in [
+        ("fonttools_ns", fonttools_lookups),
+        ("harfbuzz_ns", harfbuzz_lookups),
+    ]:
+        timings = []
+        for _ in range(BENCHMARK_REPEATS):
+            start = time.perf_counter_ns()
+            lookups()
+            timings.append(time.perf_counter_ns() - start)
+        result[name] = round(min(timings) / len(locations))
+    return result
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=GRID_STEPS,
+        help="Grid steps per axis for verification and benchmarks",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Measure table size and lookup time before and after",
+    )
+    parser.add_argument("--report", help="Write the results as JSON to this file")
+
+    # file args
+    parser.add_argument("input_fonts", metavar="FONTFILE", nargs="+")
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument(
+        "-i", "--inplace", action="store_true", help="Overwrite input file"
+    )
+    output_group.add_argument(
+        "-d", "--output-dir", help="Write output to this directory"
+    )
+    output_group.add_argument(
+        "-o", "--output-file", help="Write output to this specific filename"
+    )
+
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if options.output_file and len(options.input_fonts) > 1:
+        parser.error("argument -o/--output-file can't be used with multiple inputs")
+
+    report = {}
+    for input_name in options.input_fonts:
+        logger.info("Processing font: '%s'", input_name)
+
+        font = open_font(input_name, cache=False)
+        old_avar = font["avar"] if "avar" in font else None
+        new_avar = optimize_avar(font) if old_avar is not None else None
+        if new_avar is None:
+            logger.info("  Skipping: no avar2 table")
+            font.close()
+            continue
+
+        locations = sample_grid(font, old_avar, options.steps)
+        old_size = len(old_avar.compile(font))
+        new_size = len(new_avar.compile(font))
+        verified = verify(font, old_avar, new_avar, locations)
+        improved = verified and new_size < old_size
+        logger.info(
+            "  avar: %d -> %d bytes, %d locations %s",
+            old_size,
+            new_size,
+            len(locations),
+            "verified" if verified else "NOT verified",
+        )
+
+        result = {
+            "locations": len(locations),
+            "verified": verified,
+            "before": {"bytes": old_size},
+            "after": {"bytes": new_size if improved else old_size},
+        }
+        if options.benchmark:
+            result["before"] = benchmark(font, old_avar, locations)
+            result["after"] = benchmark(
+                font, new_avar if improved else old_avar, locations
+            )
+            print(
+                f"{input_name}: {result['before']['bytes']} -> "
+                f"{result['after']['bytes']} bytes, fontTools "
+                f"{result['before']['fonttools_ns']} -> "
+                f"{result['after']['fonttools_ns']} ns, HarfBuzz "
+                f"{result['before']['harfbuzz_ns']} -> "
+                f"{result['after']['harfbuzz_ns']} ns per lookup"
+            )
+        report[input_name] = result
+
+        if improved and (options.inplace or options.output_file or options.output_dir):
+            font["avar"] = new_avar
+            if options.inplace:
+                output_name = input_name
+            elif options.output_file:
+                output_name = options.output_file
+            else:
+                output_name = makeOutputFileName(input_name, options.output_dir)
+            save_font(font, output_name)
+            logger.info("  Saved font: '%s'", output_name)
+        elif not improved:
+            logger.info("  No changes made to '%s'", input_name)
+
+        font.close()
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+    logger.info("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+
+"""Script to snapshot the outlines of the built fonts and check them later.
+
+`update` evaluates the outlines and advance widths of every glyph of the
+fonts in `fonts/` at a fixed set of locations, and saves them as a
+compressed `.npz` file per font in `tests/outline-snapshots`, which is
+committed with the sources. Snapshots whose contents didn't change are left
+untouched. The locations of a variable font are its default location, its
+named instances, the minimum and maximum of each axis, the
+`font-variation-settings` of the reftests in `tests/static` that use it, and
+the cells of the specimens of `documentation/specimens.toml` that draw it.
+
+`check` evaluates the fonts again at the locations of their snapshots, all
+at once with the `avar`, `gvar` and `HVAR` evaluation of
+`scripts/variations.py`, and lists every glyph whose points or advance moved
+by more than `--tolerance` units, and every glyph that was added, removed or
+has a different number of points. It exits with an error when a font
+differs or a snapshotted font is missing:
+
+    # change the sources or the build, and rebuild
+    ./scripts/outline-snapshots.py check --report out/outline-snapshots.json
+    # if the changes are intended, update and commit the snapshots
+    ./scripts/outline-snapshots.py update
+"""
+
+import argparse
+import json
+import logging
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from fontfiles import open_font
+from reftests import TESTS_DIR, parse_reftest
+from specimens import load_specimens, specimen_locations
+from variations import AxisMapping, evaluate_advances, evaluate_glyphs
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT_DIR / "fonts"
+SNAPSHOT_DIR = ROOT_DIR / "tests" / "outline-snapshots"
+SNAPSHOT_VERSION = 1
+TOLERANCE = 0.5
+
+
+def reftest_locations(tests_dir):
+    """Return the variation settings of the reftests, by resolved font path."""
+    locations = {}
+    for html_path in sorted(tests_dir.rglob("*.html")):
+        for _, style in parse_reftest(html_path).runs:
+            if style.font is not None and style.variations:
+                locations.setdefault(style.font, []).append(style.variations)
+    return locations
+
+
+def open_snapshot_font(path):
+    """Return a font whose duplicate axis tags are made unique in memory.
+
+    `QuadraticRotation[ZROT].ttf` has two `ZROT` axes, which `gvar` can only
+    be decompiled with if their tags differ. Locations still set all the
+    axes with the same tag.
+    """
+    font = open_font(path, cache=False)
+    tags = []
+    if "fvar" in font:
+        seen = Counter()
+        for axis in font["fvar"].axes:
+            tags.append(axis.axisTag)
+            seen[axis.axisTag] += 1
+            if seen[axis.axisTag] > 1:
+                axis.axisTag = f"{axis.axisTag[:3]}{seen[axis.axisTag] - 1}"
+    return font, tags
+
+
+def snapshot_locations(font, tags, extra_locations):
+    """Return the user locations to snapshot a font at, of shape (N, axes)."""
+    if not tags:
+        return np.zeros((1, 0))
+    axes = font["fvar"].axes
+    defaults = {tag: axis.defaultValue for tag, axis in zip(tags, axes)}
+    locations = [{}]
+    locations.extend(instance.coordinates for instance in font["fvar"].instances)
+    for tag, axis in zip(tags, axes):
+        locations.append({tag: axis.minValue})
+        locations.append({tag: axis.maxValue})
+    locations.extend(extra_locations)
+    rows = {
+        tuple(
+            float(
+                np.clip(location.get(tag, defaults[tag]), axis.minValue, axis.maxValue)
+            )
+            for tag, axis in zip(tags, axes)
+        )
+        for location in locations
+    }
+    return np.array(sorted(rows), dtype=np.float64)
+
+
+def evaluate(font, locations):
+    """Return the outlines and advances of every glyph at user locations.
+
+    The outlines are concatenated in glyph order, in an array of shape
+    (locations, points, 2), with the index of the first point of each glyph.
+    """
+    if "fvar" in font:
+        coords = AxisMapping(font).normalize(locations)
+    else:
+        coords = np.zeros((1, 0), dtype=np.int32)
+    coordinates = evaluate_glyphs(font, coords)
+    advances = evaluate_advances(font, coords, coordinates)
+    names = font.getGlyphOrder()
+    # without the phantom points
+    outlines = [coordinates[name][:, :-4] for name in names]
+    offsets = np.cumsum([0] + [outline.shape[1] for outline in outlines])
+    return {
+        "glyphs": np.array(names),
+        "offsets": offsets,
+        "coordinates": np.concatenate(outlines, axis=1).astype(np.float32),
+        "advances": np.stack([advances[name] for name in names], axis=1).astype(
+            np.float32
+        ),
+    }
+
+
+def snapshot_path(snapshot_dir, font_path):
+    relative = Path(font_path).absolute().relative_to(FONTS_DIR)
+    return snapshot_dir / relative.with_suffix(".npz")
+
+
+def update(font_path, snapshot_dir, extra_locations):
+    font, tags = open_snapshot_font(font_path)
+    locations = snapshot_locations(
+        font, tags, extra_locations.get(Path(font_path).resolve(), [])
+    )
+    snapshot = evaluate(font, locations)
+    font.close()
+    arrays = {
+        "version": np.array(SNAPSHOT_VERSION),
+        "tags": np.array(tags, dtype=str),
+        "locations": locations,
+        **snapshot,
+    }
+    path = snapshot_path(snapshot_dir, font_path)
+    if path.exists():
+        # the archive has timestamps, only rewrite it when its contents change
+        with np.load(path) as data:
+            unchanged = set(data.files) == set(arrays) and all(
+                np.array_equal(data[key], value) for key, value in arrays.items()
+            )
+        if unchanged:
+            logger.info("Unchanged snapshot: '%s'", path)
+            return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, **arrays)
+    logger.info("Saved snapshot: '%s' (%d locations)", path, len(locations))
+
+
+def location_name(tags, location):
+    return " ".join(f"{tag}={value:g}" for tag, value in zip(tags, location))
+
+
+def check(font_path, path, tolerance):
+    """Return the differences between a font and its snapshot."""
+    with np.load(path) as data:
+        snapshot = {key: data[key] for key in data.files}
+    if int(snapshot["version"]) != SNAPSHOT_VERSION:
+        return {"error": "snapshot version differs, run update"}
+    font, tags = open_snapshot_font(font_path)
+    if tags != snapshot["tags"].tolist():
+        font.close()
+        return {
+            "error": f"axes {' '.join(tags)} instead of {' '.join(snapshot['tags'])}"
+        }
+    current = evaluate(font, snapshot["locations"])
+    font.close()
+
+    old_glyphs = snapshot["glyphs"].tolist()
+    new_glyphs = current["glyphs"].tolist()
+    old_index = {name: i for i, name in enumerate(old_glyphs)}
+    new_index = {name: i for i, name in enumerate(new_glyphs)}
+    result = {
+        "locations": len(snapshot["locations"]),
+        "removed": [name for name in old_glyphs if name not in new_index],
+        "added": [name for name in new_glyphs if name not in old_index],
+        "deviations": [],
+    }
+    for name in old_glyphs:
+        if name not in new_index:
+            continue
+        i, j = old_index[name], new_index[name]
+        old = snapshot["coordinates"][
+            :, snapshot["offsets"][i] : snapshot["offsets"][i + 1]
+        ]
+        new = current["coordinates"][
+            :, current["offsets"][j] : current["offsets"][j + 1]
+        ]
+        advance = np.abs(snapshot["advances"][:, i] - current["advances"][:, j])
+        if old.shape != new.shape:
+            result["deviations"].append(
+                {
+                    "glyph": name,
+                    "error": f"{new.shape[1]} points instead of {old.shape[1]}",
+                }
+            )
+            continue
+        # (locations, points)
+        distance = np.abs(old - new).max(axis=2, initial=0)
+        worst = distance.max(axis=1, initial=0)
+        if worst.max(initial=0) > tolerance or advance.max() > tolerance:
+            location = int(np.maximum(worst, advance).argmax())
+            result["deviations"].append(
+                {
+                    "glyph": name,
+                    "max_deviation": float(worst.max(initial=0)),
+                    "max_advance_deviation": float(advance.max()),
+                    "locations": int(
+                        np.count_nonzero((worst > tolerance) | (advance > tolerance))
+                    ),
+                    "worst_location": location_name(
+                        tags, snapshot["locations"][location]
+                    ),
+                }
+            )
+    return result
+
+
+def font_paths(input_fonts):
+    return input_fonts or sorted(FONTS_DIR.rglob("*.ttf"))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        default=SNAPSHOT_DIR,
+        help="Directory of the snapshots",
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command, help in [
+        ("update", "Snapshot the outlines of the fonts"),
+        ("check", "Compare the fonts with their snapshots"),
+    ]:
+        subparser = subparsers.add_parser(command, help=help)
+        subparser.add_argument(
+            "input_fonts",
+            metavar="FONTFILE",
+            nargs="*",
+            type=Path,
+            help="Fonts in fonts/ (default: all of them)",
+        )
+        if command == "check":
+            subparser.add_argument(
+                "--tolerance",
+                type=float,
+                default=TOLERANCE,
+                help="Largest allowed change in font units",
+            )
+            subparser.add_argument(
+                "--report", help="Write the differences as JSON to this file"
+            )
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    paths = font_paths(options.input_fonts)
+    if options.command == "update":
+        extra_locations = reftest_locations(TESTS_DIR)
+        for font, locations in specimen_locations(load_specimens()).items():
+            extra_locations.setdefault(font, []).extend(locations)
+        for path in paths:
+            update(path, options.snapshot_dir, extra_locations)
+        print(f"Saved {len(paths)} snapshots to '{options.snapshot_dir}'")
+        return
+
+    results = {}
+    for path in paths:
+        name = Path(path).absolute().relative_to(FONTS_DIR).as_posix()
+        snapshot = snapshot_path(options.snapshot_dir, path)
+        if not snapshot.exists():
+            logger.warning("%s: no snapshot, run update", name)
+            continue
+        results[name] = check(path, snapshot, options.tolerance)
+    if not options.input_fonts:
+        for snapshot in sorted(options.snapshot_dir.rglob("*.npz")):
+            name = snapshot.relative_to(options.snapshot_dir).with_suffix(".ttf")
+            if not (FONTS_DIR / name).exists():
+                results[name.as_posix()] = {"error": "missing font"}
+
+    failed = 0
+    for name, result in sorted(results.items()):
+        if "error" in result:
+            failed += 1
+            print(f"{name}: {result['error']}")
+            continue
+        if not (result["removed"] or result["added"] or result["deviations"]):
+            logger.info("%s: %d locations match", name, result["locations"])
+            continue
+        failed += 1
+        print(f"{name}:")
+        for glyph in result["removed"]:
+            print(f"  - {glyph}")
+        for glyph in result["added"]:
+            print(f"  + {glyph}")
+        for deviation in result["deviations"]:
+            if "error" in deviation:
+                print(f"  {deviation['glyph']}: {deviation['error']}")
+                continue
+            print(
+                f"  {deviation['glyph']}: points off by up to "
+                f"{deviation['max_deviation']:g}, advance by "
+                f"{deviation['max_advance_deviation']:g} units at "
+                f"{deviation['locations']} of {result['locations']} locations, "
+                f"worst at {deviation['worst_location'] or 'default'}"
+            )
+    print(f"{len(results)} fonts, {failed} with differences")
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(dict(sorted(results.items())), file, indent=2)
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+"""Script to package the built fonts as WOFF2 for the web pages.
+
+Every font of `fonts/` is compressed to WOFF2 in a process pool, optionally
+subset to the characters used by `--subset-pages`. The output files keep the
+directory and name of their font, followed by a hash of their content, e.g.
+`test-font/variable/TestFont[opsz,wdth,wght].<hash>.woff2`, so they can be
+cached forever by browsers. A `manifest.json` maps the fonts to their WOFF2
+files, which pages can look up:
+
+    {
+      "fonts/test-font/variable/TestFont[opsz,wdth,wght].ttf": {
+        "url": "test-font/variable/TestFont[opsz,wdth,wght].<hash>.woff2",
+        "bytes": 1234,
+        "source_bytes": 5678,
+        "key": "<hash of the font and the packaging options>"
+      }
+    }
+
+Fonts whose content and packaging options are unchanged since the previous
+run are skipped, and the WOFF2 files of previous versions are removed.
+
+With `--dedupe`, the static instances that `./scripts/dedupe-instances.py
+report` found identical apart from their names share the WOFF2 file of the
+first font of their group, and their manifest entries have a `duplicate_of`
+key.
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import json
+import logging
+from html.parser import HTMLParser
+from pathlib import Path
+
+import fontTools
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT_DIR / "fonts"
+FONT_PATTERNS = ["*.ttf", "*.otf"]
+HASH_LENGTH = 12
+
+
+class TextParser(HTMLParser):
+    """Collect the text of an HTML page, outside of scripts and styles."""
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self.skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.text.append(data)
+
+
+def page_text(paths: list[Path]) -> str:
+    characters = set()
+    for path in paths:
+        parser = TextParser()
+        parser.feed(path.read_text(encoding="utf-8"))
+        characters.update("".join(parser.text))
+    return "".join(sorted(characters))
+
+
+def package_key(data: bytes, text: str | None) -> str:
+    """Return a hash of the font data and of everything the output depends on."""
+    digest = hashlib.sha256(data)
+    digest.update(f"\0{fontTools.version}\0".encode())
+    if text is not None:
+        digest.update(text.encode())
+    return digest.hexdigest()
+
+
+def compress(data: bytes, text: str | None) -> bytes:
+    font = TTFont(io.BytesIO(data))
+    if text is not None:
+        options = subset.Options()
+        # keep every feature and name, only drop the unused glyphs
+        options.layout_features = ["*"]
+        options.name_IDs = ["*"]
+        options.name_languages = ["*"]
+        options.notdef_outline = True
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+    font.flavor = "woff2"
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+def read_duplicates(path: Path) -> dict[str, str]:
+    """Return the first font of its group for every duplicate in the report."""
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        name: group["fonts"][0]
+        for group in report["groups"]
+        for name in group["fonts"][1:]
+    }
+
+
+def package(
+    font_path: Path, name: str, out_dir: Path, text: str | None, cached: dict | None
+) -> tuple[str, dict, bool]:
+    """Save the WOFF2 file of a font, unless cached, and return its entry."""
+    data = font_path.read_bytes()
+    key = package_key(data, text)
+    if (
+        cached is not None
+        and cached.get("key") == key
+        and (out_dir / cached["path"]).exists()
+    ):
+        return name, cached, False
+
+    woff2 = compress(data, text)
+    digest = hashlib.sha256(woff2).hexdigest()[:HASH_LENGTH]
+    relative = Path(name).relative_to(FONTS_DIR.name)
+    output_path = out_dir / relative.parent / f"{relative.stem}.{digest}.woff2"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(woff2)
+    return (
+        name,
+        {
+            "path": output_path.relative_to(out_dir).as_posix(),
+            "bytes": len(woff2),
+            "source_bytes": len(data),
+            "subset": text is not None,
+            "key": key,
+        },
+        True,
+    )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=ROOT_DIR / "out" / "webfonts",
+        help="Where to write the WOFF2 files and manifest.json",
+    )
+    parser.add_argument(
+        "--subset-pages",
+        type=Path,
+        nargs="+",
+        metavar="HTML",
+        help="Subset the fonts to the characters of these pages",
+    )
+    parser.add_argument(
+        "--url-prefix",
+        default="",
+        help="Prefix of the WOFF2 URLs in the manifest",
+    )
+    parser.add_argument(
+        "--dedupe",
+        type=Path,
+        metavar="REPORT",
+        help="Share the WOFF2 files of the duplicate fonts of this "
+        "dedupe-instances.py report",
+    )
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    text = page_text(options.subset_pages) if options.subset_pages else None
+    out_dir = options.out_dir.resolve()
+    manifest_path = out_dir / "manifest.json"
+    previous = {}
+    if manifest_path.exists():
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    # fonts/ may be a symbolic link, keep its path in the names
+    font_paths = sorted(
+        path for pattern in FONT_PATTERNS for path in FONTS_DIR.rglob(pattern)
+    )
+    names = {path.relative_to(ROOT_DIR).as_posix() for path in font_paths}
+    duplicates = {}
+    if options.dedupe:
+        duplicates = {
+            name: first
+            for name, first in read_duplicates(options.dedupe).items()
+            if name in names and first in names
+        }
+
+    manifest = {}
+    with concurrent.futures.ProcessPoolExecutor(options.jobs) as executor:
+        futures = [
+            executor.submit(
+                package,
+                font_path,
+                font_path.relative_to(ROOT_DIR).as_posix(),
+                out_dir,
+                text,
+                previous.get(font_path.relative_to(ROOT_DIR).as_posix()),
+            )
+            for font_path in font_paths
+            if font_path.relative_to(ROOT_DIR).as_posix() not in duplicates
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            name, entry, packaged = future.result()
+            manifest[name] = {**entry, "url": options.url_prefix + entry["path"]}
+            if packaged:
+                logger.info(
+                    "Packaged font: '%s', %d -> %d bytes",
+                    name,
+                    entry["source_bytes"],
+                    entry["bytes"],
+                )
+
+    for name, first in duplicates.items():
+        manifest[name] = {
+            **manifest[first],
+            "source_bytes": (ROOT_DIR / name).stat().st_size,
+            "duplicate_of": first,
+        }
+        logger.info("Shared font: '%s' with '%s'", name, first)
+
+    # remove the WOFF2 files of previous versions of the fonts
+    current = {out_dir / entry["path"] for entry in manifest.values()}
+    for stale in sorted(set(out_dir.rglob("*.woff2")) - current):
+        stale.unlink()
+        logger.debug("Removed stale font: '%s'", stale)
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps(dict(sorted(manifest.items())), indent=2) + "\n", encoding="utf-8"
+    )
+    logger.info("Saved manifest: '%s'", manifest_path)
+
+    source_bytes = sum(entry["source_bytes"] for entry in manifest.values())
+    woff2_bytes = sum(
+        entry["bytes"] for entry in manifest.values() if "duplicate_of" not in entry
+    )
+    print(f"{len(manifest)} fonts, {source_bytes} -> {woff2_bytes} bytes")
+
+
+if __name__ == "__main__":
+    main()
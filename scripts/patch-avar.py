@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""Script to replace the `avar` table of built variable fonts from a designspace.
+
+When only the axis mappings of a designspace change, the `avar` table is the
+only table of the derived fonts that needs to change. The new table is
+compiled from the designspace and spliced into the existing font, whose other
+tables are copied as raw bytes without being decompiled. Fonts whose `avar`
+table is already up to date are left untouched.
+
+Static instances of the patched font given with `--instance` are instantiated
+again at their location, keeping the `name` table of the existing instance.
+
+The patch is refused when the designspace axes no longer match the `fvar`
+table of the font, as that needs a full build (e.g. `mise run fonts.build`).
+"""
+
+import argparse
+import io
+import logging
+import sys
+
+from fontTools.designspaceLib import DesignSpaceDocument
+from fontTools.ttLib import TTFont
+from fontTools.varLib.avar.build import build as build_avar
+from fontTools.varLib.instancer import (
+    OverlapMode,
+    instantiateVariableFont,
+    parseLimits,
+)
+
+logger = logging.getLogger()
+
+
+class AxesChangedError(Exception):
+    pass
+
+
+def check_axes(font, designspace):
+    """Raise AxesChangedError unless the designspace axes match the `fvar` axes."""
+    fvar_axes = [
+        (axis.axisTag, axis.minValue, axis.defaultValue, axis.maxValue)
+        for axis in font["fvar"].axes
+    ]
+    designspace_axes = [
+        (axis.tag, axis.minimum, axis.default, axis.maximum)
+        for axis in designspace.axes
+    ]
+    if sorted(fvar_axes) != sorted(designspace_axes):
+        raise AxesChangedError(
+            f"designspace axes {designspace_axes} don't match fvar axes {fvar_axes}"
+        )
+
+
+def patch_avar(font_path, designspace_path):
+    """Return the patched font data, or None if its `avar` table is up to date."""
+    designspace = DesignSpaceDocument.fromfile(designspace_path)
+
+    with open(font_path, "rb") as file:
+        font = TTFont(io.BytesIO(file.read()), lazy=True)
+    check_axes(font, designspace)
+
+    old_data = font.reader["avar"] if "avar" in font.reader else None
+    if "avar" in font:
+        del font["avar"]
+    build_avar(font, designspace_path)
+    new_data = font["avar"].compile(font) if "avar" in font else None
+
+    if new_data == old_data:
+        return None
+
+    logger.info(
+        "  avar: %s -> %s bytes",
+        len(old_data) if old_data is not None else "none",
+        len(new_data) if new_data is not None else "none",
+    )
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+def refresh_instance(varfont_data, instance_path, limits):
+    """Instantiate the variable font again like `fonttools varLib.instancer`."""
+    with open(instance_path, "rb") as file:
+        old_instance = TTFont(io.BytesIO(file.read()), lazy=True)
+
+    varfont = TTFont(io.BytesIO(varfont_data), recalcTimestamp=True)
+    instance = instantiateVariableFont(
+        varfont,
+        limits,
+        inplace=True,
+        optimize=True,
+        overlap=OverlapMode.KEEP_AND_SET_FLAGS,
+    )
+    # keep the names given by scripts/rename-fonts.py
+    instance["name"] = old_instance["name"]
+    instance.save(instance_path)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("designspace", metavar="DESIGNSPACE")
+    parser.add_argument("input_font", metavar="FONTFILE", help="Font to patch in place")
+    parser.add_argument(
+        "--instance",
+        dest="instances",
+        metavar=("FONTFILE", "AXIS=LOC"),
+        nargs="+",
+        action="append",
+        default=[],
+        help="Static instance to refresh and its location, e.g. "
+        "'--instance Font-Black.ttf wght=900 wdth=75 opsz=16'",
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    instances = []
+    for instance_path, *locargs in options.instances:
+        try:
+            instances.append((instance_path, parseLimits(locargs)))
+        except ValueError as e:
+            parser.error(f"argument --instance: {e}")
+
+    logger.info("Patching font: '%s'", options.input_font)
+    try:
+        data = patch_avar(options.input_font, options.designspace)
+    except AxesChangedError as e:
+        logger.error("Can't patch '%s': %s", options.input_font, e)
+        sys.exit(1)
+
+    if data is None:
+        logger.info("  avar is up to date")
+        return
+
+    with open(options.input_font, "wb") as file:
+        file.write(data)
+    logger.info("  Saved font: '%s'", options.input_font)
+
+    for instance_path, limits in instances:
+        refresh_instance(data, instance_path, limits)
+        logger.info("  Saved instance: '%s'", instance_path)
+
+    logger.info("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+
+"""Opt-in profiling of the Python scripts, and a report aggregating the profiles.
+
+With `HOW2AVAR2_PROFILE` set, every Python process of a task run through
+`mise run profile` (which puts `scripts/startup` on `PYTHONPATH`) is profiled
+from startup to exit, including the `documentation/image*.py` renders, the
+`scripts/*.py` tools and the `fonttools`/`gftools` commands run by the build
+tasks:
+
+    HOW2AVAR2_PROFILE=cprofile mise run profile fonts.images
+    HOW2AVAR2_PROFILE=tracemalloc ./scripts/patch-avar.py ...
+
+- `cprofile` writes a `cProfile` profile of the process,
+- `tracemalloc` writes a `tracemalloc` snapshot of the memory still allocated
+  at exit, and records the peak of the traced memory.
+
+Each invocation writes `<script>.<time>-<pid>.prof` or `.tracemalloc`, with a
+`.json` file of its command line, wall time and peak memory, to
+`HOW2AVAR2_PROFILE_DIR` (`out/profiles` by default). Outside of mise, set
+`PYTHONPATH=scripts/startup` too. Forked processes, such as the workers of the
+process pools, are profiled on their own from the fork and write their own
+profile, marked with the pid of their parent.
+
+`report` aggregates all the profiles of the directory into a single list of
+the hottest functions (or allocation sites), e.g. after a batch of renders:
+
+    ./scripts/profiling.py report --sort tottime --top 30
+
+Delete the directory to start a new batch. `check` runs a pool script with
+profiling and checks that every worker wrote a profile:
+
+    ./scripts/profiling.py check --jobs 4
+"""
+
+import argparse
+import atexit
+import cProfile
+import json
+import logging
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+STARTUP_DIR = ROOT_DIR / "scripts" / "startup"
+PROFILE_ENV = "HOW2AVAR2_PROFILE"
+PROFILE_DIR_ENV = "HOW2AVAR2_PROFILE_DIR"
+MODES = {"cprofile": ".prof", "tracemalloc": ".tracemalloc"}
+TRACEMALLOC_FRAMES = 1
+
+
+def profile_dir():
+    return Path(os.environ.get(PROFILE_DIR_ENV) or ROOT_DIR / "out" / "profiles")
+
+
+class Session:
+    """The profile of the current process, written to profile_dir() by stop()."""
+
+    def __init__(self, mode, forked_from=None):
+        self.mode = mode
+        self.forked_from = forked_from
+        self.start_time = time.time()
+        self.start_counter = time.perf_counter()
+        self.stopped = False
+        if mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        wall_s = time.perf_counter() - self.start_counter
+        # sys.argv isn't set yet when the hook starts, and `fonttools <tool>`
+        # sets it to e.g. "fonttools ttx"
+        script = Path(sys.argv[0] if sys.argv and sys.argv[0] else "python").stem
+        script = script.replace(" ", "-")
+        timestamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.start_time))
+        stem = f"{script}.{timestamp}-{os.getpid()}"
+        out_dir = profile_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        info = {
+            "script": script,
+            "argv": sys.argv,
+            "mode": self.mode,
+            "wall_s": wall_s,
+            "pid": os.getpid(),
+            "forked_from": self.forked_from,
+        }
+        if self.mode == "cprofile":
+            self.profiler.disable()
+            self.profiler.dump_stats(out_dir / (stem + MODES[self.mode]))
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            info["peak_mib"] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+            tracemalloc.stop()
+            snapshot.dump(str(out_dir / (stem + MODES[self.mode])))
+        with open(out_dir / (stem + ".json"), "w", encoding="utf-8") as file:
+            json.dump(info, file, indent=2)
+            file.write("\n")
+
+
+_session = None
+
+
+def _stop():
+    _session.stop()
+
+
+def _restart_in_child():
+    """Profile a forked child on its own, from the fork to its exit.
+
+    The workers of `multiprocessing` and `concurrent.futures` pools leave with
+    `os._exit()`, which skips `atexit`, so their profile is written by a
+    `multiprocessing` finalizer instead, which the worker runs before leaving.
+    The finalizers inherited from the parent are cleared when the worker
+    starts, so it is registered from an after-fork hook of `multiprocessing`.
+    """
+    global _session
+    parent = _session
+    if parent.mode == "cprofile":
+        parent.profiler.disable()
+    else:
+        tracemalloc.stop()
+    _session = Session(parent.mode, forked_from=os.getppid())
+    if "multiprocessing" in sys.modules:
+        import multiprocessing.util
+
+        multiprocessing.util.register_after_fork(_session, _finalize_in_worker)
+
+
+def _finalize_in_worker(session):
+    import multiprocessing.util
+
+    # after the other finalizers, e.g. those joining the queue threads
+    multiprocessing.util.Finalize(None, session.stop, exitpriority=-100)
+
+
+def start(mode):
+    """Profile the current process and its forks until they exit."""
+    global _session
+    if mode not in MODES:
+        print(
+            f"{PROFILE_ENV}={mode} isn't one of {', '.join(MODES)}, not profiling",
+            file=sys.stderr,
+        )
+        return
+
+    _session = Session(mode)
+    atexit.register(_stop)
+    os.register_at_fork(after_in_child=_restart_in_child)
+
+
+def start_from_environment():
+    mode = os.environ.get(PROFILE_ENV)
+    if mode:
+        start(mode)
+
+
+def read_invocations(directory):
+    invocations = []
+    for path in sorted(directory.glob("*.json")):
+        with open(path, encoding="utf-8") as file:
+            info = json.load(file)
+        info["profile"] = path.with_suffix(MODES[info["mode"]])
+        if info["profile"].exists():
+            invocations.append(info)
+    return invocations
+
+
+def report_cprofile(invocations, sort, top):
+    stats = pstats.Stats(*(str(info["profile"]) for info in invocations))
+    # the invocations are already listed, don't print every file name
+    stats.files = []
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+
+def report_tracemalloc(invocations, top):
+    """Print the allocation sites with the most memory, summed over snapshots."""
+    sizes = defaultdict(int)
+    counts = defaultdict(int)
+    for info in invocations:
+        snapshot = tracemalloc.Snapshot.load(str(info["profile"]))
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        for statistic in snapshot.statistics("lineno"):
+            frame = statistic.traceback[0]
+            sizes[(frame.filename, frame.lineno)] += statistic.size
+            counts[(frame.filename, frame.lineno)] += statistic.count
+    for site in sorted(sizes, key=sizes.get, reverse=True)[:top]:
+        filename, lineno = site
+        print(
+            f"{sizes[site] / 1024:10.1f} KiB {counts[site]:8d} blocks  "
+            f"{filename}:{lineno}"
+        )
+
+
+def check(mode, jobs):
+    """Profile a pool script and check that each of its workers wrote a profile.
+
+    Returns the number of problems found.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        out_dir = Path(temp_dir) / "profiles"
+        env = {
+            **os.environ,
+            PROFILE_ENV: mode,
+            PROFILE_DIR_ENV: str(out_dir),
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(STARTUP_DIR), os.environ.get("PYTHONPATH")])
+            ),
+        }
+        command = [
+            sys.executable,
+            str(ROOT_DIR / "scripts" / "reftest-index.py"),
+            "--db",
+            str(Path(temp_dir) / "index.sqlite"),
+            "update",
+            "--jobs",
+            str(jobs),
+        ]
+        logger.info("Running: %s", " ".join(command))
+        subprocess.run(command, env=env, check=True)
+        invocations = read_invocations(out_dir)
+
+    parents = [info for info in invocations if info.get("forked_from") is None]
+    if len(parents) != 1:
+        logger.error("%d profiles of the parent process instead of 1", len(parents))
+        return 1
+    workers = [
+        info for info in invocations if info.get("forked_from") == parents[0]["pid"]
+    ]
+    print(f"{parents[0]['script']}: 1 parent and {len(workers)} worker profiles")
+    if len(workers) != jobs:
+        logger.error("%d worker profiles instead of %d", len(workers), jobs)
+        return 1
+    return 0
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser(
+        "report", help="Aggregate the profiles of a batch"
+    )
+    report_parser.add_argument(
+        "directory",
+        nargs="?",
+        type=Path,
+        default=profile_dir(),
+        help="Directory of the profiles",
+    )
+    report_parser.add_argument(
+        "--mode", choices=list(MODES), default="cprofile", help="Profiles to report"
+    )
+    report_parser.add_argument(
+        "--script", action="append", help="Only report the profiles of this script"
+    )
+    report_parser.add_argument(
+        "--sort",
+        default="cumulative",
+        choices=["cumulative", "tottime", "ncalls"],
+        help="Sort order of the cProfile report",
+    )
+    report_parser.add_argument(
+        "--top", type=int, default=40, help="Number of functions or sites to list"
+    )
+
+    check_parser = subparsers.add_parser(
+        "check", help="Check that a pool script writes one profile per worker"
+    )
+    check_parser.add_argument(
+        "--mode", choices=list(MODES), default="cprofile", help="Profiles to write"
+    )
+    check_parser.add_argument(
+        "-j", "--jobs", type=int, default=2, help="Number of worker processes"
+    )
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if options.command == "check":
+        if check(options.mode, options.jobs):
+            sys.exit(1)
+        return
+
+    invocations = [
+        info
+        for info in read_invocations(options.directory)
+        if info["mode"] == options.mode
+        and (not options.script or info["script"] in options.script)
+    ]
+    if not invocations:
+        logger.error("No %s profiles in '%s'", options.mode, options.directory)
+        sys.exit(1)
+
+    by_script = defaultdict(list)
+    for info in invocations:
+        by_script[info["script"]].append(info)
+    for script, infos in sorted(by_script.items()):
+        runs = [info for info in infos if info.get("forked_from") is None]
+        line = (
+            f"{script}: {len(runs)} runs, {len(infos) - len(runs)} workers, "
+            f"{sum(info['wall_s'] for info in runs):.2f} s"
+        )
+        if options.mode == "tracemalloc":
+            line += f", peak {max(info['peak_mib'] for info in infos):.1f} MiB"
+        print(line)
+    print()
+
+    if options.mode == "cprofile":
+        report_cprofile(invocations, options.sort, options.top)
+    else:
+        report_tracemalloc(invocations, options.top)
+
+
+if __name__ == "__main__":
+    main()
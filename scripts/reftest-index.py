@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+
+"""Script to index the reftests in `tests/static` into a SQLite database.
+
+`update` records the reftest pages and their references, the screenshots with
+their pixel hash, the `.fail.md` notes and, when `scripts/reftest-verdicts.py`
+has been run, its diff scores. Packed screenshots are read from their blob in
+`tests/screenshots`. Only files whose size or modification time changed since
+the last update are read again.
+
+`query` lists screenshots with their status, filtered by platform, browser,
+group, test or status, and `sql` runs any statement on the database, e.g.
+
+    ./scripts/reftest-index.py query --platform win --browser firefox --status failed
+    ./scripts/reftest-index.py sql "SELECT test, count(*) FROM results GROUP BY test"
+
+Tables: `tests`, `links`, `screenshots`, `notes`, `comparisons`, and the
+`results` view joining screenshots with their notes and diff scores.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+
+from reftests import (
+    COMPOSITED_PREFIX,
+    FAIL_SUFFIX,
+    GENERATED_MARKER,
+    ROOT_DIR,
+    TESTS_DIR,
+    default_store,
+    parse_reftest,
+    parse_screenshot,
+    pixel_hash,
+    relative_path,
+    screenshot_files,
+)
+
+logger = logging.getLogger()
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE tests (
+    path TEXT PRIMARY KEY,
+    grp TEXT NOT NULL,
+    test TEXT NOT NULL
+);
+CREATE TABLE links (
+    path TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    test TEXT NOT NULL,
+    rel TEXT NOT NULL,
+    reference TEXT NOT NULL
+);
+CREATE TABLE screenshots (
+    path TEXT PRIMARY KEY,
+    grp TEXT NOT NULL,
+    platform TEXT,
+    browser TEXT,
+    test TEXT NOT NULL,
+    pixel_hash TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL
+);
+CREATE TABLE notes (
+    path TEXT PRIMARY KEY,
+    grp TEXT NOT NULL,
+    key TEXT NOT NULL,
+    generated INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE TABLE comparisons (
+    path TEXT NOT NULL,
+    screenshot TEXT NOT NULL,
+    rel TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    different_pixels INTEGER NOT NULL,
+    antialiased_pixels INTEGER NOT NULL,
+    total_pixels INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    diff_image TEXT
+);
+CREATE INDEX links_test ON links (grp, test);
+CREATE INDEX screenshots_key ON screenshots (grp, platform, browser, test);
+CREATE INDEX notes_key ON notes (grp, key);
+CREATE INDEX comparisons_screenshot ON comparisons (screenshot);
+CREATE VIEW results AS
+SELECT
+    s.path,
+    s.grp,
+    s.platform,
+    s.browser,
+    s.test,
+    CASE
+        WHEN n.path IS NOT NULL THEN 'failed'
+        WHEN s.platform IS NULL THEN 'composited'
+        WHEN s.test LIKE '%expected-mismatch' THEN 'expected-mismatch'
+        WHEN s.test LIKE '%expected' THEN 'expected'
+        ELSE 'passed'
+    END AS status,
+    s.pixel_hash,
+    max(CASE WHEN c.rel = 'match' THEN c.different_pixels END) AS different_pixels,
+    min(c.passed) AS diff_passed,
+    n.path AS note
+FROM screenshots AS s
+LEFT JOIN notes AS n
+    ON n.grp = s.grp AND n.key = s.platform || '.' || s.browser || '.' || s.test
+LEFT JOIN comparisons AS c ON c.screenshot = s.path
+GROUP BY s.path;
+"""
+
+# tables whose rows are replaced when the file in their `path` column changes
+FILE_TABLES = ["tests", "links", "screenshots", "notes", "comparisons"]
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        if version:
+            logger.warning("Rebuilding index with schema version %d", SCHEMA_VERSION)
+            connection.close()
+            db_path.unlink()
+            connection = sqlite3.connect(db_path)
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+
+def index_html(connection: sqlite3.Connection, path: str, html_path: Path) -> None:
+    group, test = html_path.parent.name, html_path.stem
+    connection.execute("INSERT INTO tests VALUES (?, ?, ?)", (path, group, test))
+    for rel, references in parse_reftest(html_path).links.items():
+        connection.executemany(
+            "INSERT INTO links VALUES (?, ?, ?, ?, ?)",
+            [(path, group, test, rel, reference) for reference in references],
+        )
+
+
+def index_png(
+    connection: sqlite3.Connection,
+    path: str,
+    hashed: tuple[str, tuple[int, int]],
+) -> None:
+    png = Path(path)
+    screenshot = parse_screenshot(png)
+    if screenshot is not None:
+        platform, browser, test = (
+            screenshot.platform,
+            screenshot.browser,
+            screenshot.test,
+        )
+    elif png.name.startswith(COMPOSITED_PREFIX):
+        platform, browser, test = None, None, png.stem[len(COMPOSITED_PREFIX) :]
+    else:
+        logger.warning("Skipping '%s': not a screenshot", path)
+        return
+    blob_hash, (width, height) = hashed
+    connection.execute(
+        "INSERT INTO screenshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (path, png.parent.name, platform, browser, test, blob_hash, width, height),
+    )
+
+
+def index_note(connection: sqlite3.Connection, path: str, fail_md: Path) -> None:
+    body = fail_md.read_text(encoding="utf-8")
+    connection.execute(
+        "INSERT INTO notes VALUES (?, ?, ?, ?, ?)",
+        (
+            path,
+            fail_md.parent.name,
+            fail_md.name[: -len(FAIL_SUFFIX)],
+            body.startswith(GENERATED_MARKER),
+            body,
+        ),
+    )
+
+
+def index_verdicts(connection: sqlite3.Connection, path: str, report: Path) -> None:
+    rows = []
+    for result in json.loads(report.read_text(encoding="utf-8")):
+        for comparison in result["comparisons"]:
+            rows.append(
+                (
+                    path,
+                    result["screenshot"],
+                    comparison["rel"],
+                    comparison["reference"],
+                    comparison["different_pixels"],
+                    comparison["antialiased_pixels"],
+                    comparison["total_pixels"],
+                    comparison["passed"],
+                    comparison["diff_image"],
+                )
+            )
+    connection.executemany(
+        "INSERT INTO comparisons VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+
+
+def update(
+    connection: sqlite3.Connection,
+    tests_dir: Path,
+    store_dir: Path | None,
+    verdicts: Path | None,
+    jobs: int | None,
+) -> None:
+    files = {
+        relative_path(file): file
+        for pattern in ["*/*.html", f"*/*{FAIL_SUFFIX}"]
+        for file in tests_dir.glob(pattern)
+    }
+    # screenshots by their path in tests_dir, stat and hashed from their blob
+    files.update(
+        (relative_path(png), file)
+        for png, file in screenshot_files(tests_dir, store_dir).items()
+        if png.parent.parent == tests_dir
+    )
+    if verdicts is not None and verdicts.exists():
+        files[relative_path(verdicts)] = verdicts
+
+    known = {
+        path: (mtime_ns, size)
+        for path, mtime_ns, size in connection.execute("SELECT * FROM files")
+    }
+    stats = {path: file.stat() for path, file in files.items()}
+    changed = sorted(
+        path
+        for path, stat in stats.items()
+        if known.get(path) != (stat.st_mtime_ns, stat.st_size)
+    )
+    removed = sorted(set(known) - set(files))
+
+    pngs = [path for path in changed if path.endswith(".png")]
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        hashes = dict(zip(pngs, executor.map(pixel_hash, [files[png] for png in pngs])))
+
+    with connection:
+        for path in [*removed, *changed]:
+            for table in FILE_TABLES:
+                connection.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+            connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+        for path in changed:
+            file = files[path]
+            if path.endswith(".html"):
+                index_html(connection, path, file)
+            elif path.endswith(FAIL_SUFFIX):
+                index_note(connection, path, file)
+            elif path.endswith(".png"):
+                index_png(connection, path, hashes[path])
+            else:
+                index_verdicts(connection, path, file)
+            connection.execute(
+                "INSERT INTO files VALUES (?, ?, ?)",
+                (path, stats[path].st_mtime_ns, stats[path].st_size),
+            )
+            logger.debug("Indexed: '%s'", path)
+
+    logger.info(
+        "Indexed %d changed files, removed %d, %d unchanged",
+        len(changed),
+        len(removed),
+        len(files) - len(changed),
+    )
+
+
+def print_rows(cursor: sqlite3.Cursor, as_json: bool) -> None:
+    columns = [column[0] for column in cursor.description or []]
+    rows = cursor.fetchall()
+    if as_json:
+        json.dump([dict(zip(columns, row)) for row in rows], sys.stdout, indent=2)
+        print()
+        return
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=ROOT_DIR / "out" / "reftests" / "index.sqlite",
+        help="Path of the SQLite database",
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = subparsers.add_parser("update", help="Update the index")
+    update_parser.add_argument(
+        "--root",
+        type=Path,
+        default=TESTS_DIR,
+        help="Directory of the reftest groups",
+    )
+    update_parser.add_argument(
+        "--store",
+        type=Path,
+        help="Screenshot store of the reftests (default: tests/screenshots "
+        "for tests/static)",
+    )
+    update_parser.add_argument(
+        "--verdicts",
+        type=Path,
+        default=ROOT_DIR / "out" / "reftests" / "verdicts.json",
+        help="Report of scripts/reftest-verdicts.py to index, if it exists",
+    )
+    update_parser.add_argument(
+        "-j", "--jobs", type=int, help="Number of worker processes"
+    )
+
+    query_parser = subparsers.add_parser("query", help="List screenshot results")
+    query_parser.add_argument("--platform")
+    query_parser.add_argument("--browser")
+    query_parser.add_argument("--group", help="Test group, e.g. 1.1-axis-remapping")
+    query_parser.add_argument("--test", help="SQL LIKE pattern of the test name")
+    query_parser.add_argument(
+        "--status",
+        choices=["passed", "failed", "expected", "expected-mismatch", "composited"],
+    )
+    query_parser.add_argument("--json", action="store_true", help="Output JSON")
+
+    sql_parser = subparsers.add_parser("sql", help="Run an SQL statement")
+    sql_parser.add_argument("statement")
+    sql_parser.add_argument("--json", action="store_true", help="Output JSON")
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    connection = connect(options.db)
+
+    if options.command == "update":
+        root_dir = options.root.resolve()
+        update(
+            connection,
+            root_dir,
+            options.store or default_store(root_dir),
+            options.verdicts,
+            options.jobs,
+        )
+    elif options.command == "query":
+        filters = {
+            "platform = ?": options.platform,
+            "browser = ?": options.browser,
+            "grp = ?": options.group,
+            "test LIKE ?": options.test,
+            "status = ?": options.status,
+        }
+        filters = {clause: value for clause, value in filters.items() if value}
+        where = " AND ".join(filters) or "1"
+        cursor = connection.execute(
+            "SELECT grp, platform, browser, test, status, different_pixels, note"
+            f" FROM results WHERE {where} ORDER BY grp, test, platform, browser",
+            list(filters.values()),
+        )
+        print_rows(cursor, options.json)
+    else:
+        print_rows(connection.execute(options.statement), options.json)
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
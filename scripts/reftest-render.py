@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""Script to render the reftests in `tests/static` without a browser.
+
+Each reftest page is parsed with `scripts/reftests.py`, shaped with HarfBuzz
+and drawn from fontTools outlines at the page's `font-variation-settings`, so
+the avar and avar2 mappings come from fontTools instead of a browser. Pages
+are rendered in parallel at the size of the browser screenshots.
+
+Images are written to `out/reftests/local/<group>/local.fonttools.<test>.png`,
+so that they can be evaluated with
+`./scripts/reftest-verdicts.py --root out/reftests/local`.
+"""
+
+import argparse
+import concurrent.futures
+import functools
+import logging
+from pathlib import Path
+
+import uharfbuzz as hb
+from drawbot_skia.drawbot import (
+    BezierPath,
+    drawPath,
+    fill,
+    newDrawing,
+    newPage,
+    rect,
+    saveImage,
+    savedState,
+    scale,
+    translate,
+)
+from fontTools.ttLib import TTFont
+
+from fontfiles import open_font
+from reftests import ROOT_DIR, TESTS_DIR, TextStyle, parse_reftest
+
+logger = logging.getLogger()
+
+PLATFORM = "local"
+BROWSER = "fonttools"
+
+# tests/screenshot.css page size, captured at 2x
+PAGE_WIDTH, PAGE_HEIGHT, DEVICE_SCALE = 1440, 400, 2
+# default body margin of browsers
+BODY_MARGIN = 8
+
+
+@functools.cache
+def load_font(path: Path) -> tuple[TTFont, hb.Face]:
+    return open_font(path), hb.Face(hb.Blob.from_file_path(path))
+
+
+@functools.cache
+def load_glyph_set(path: Path, location: tuple[tuple[str, float], ...]):
+    font, _ = load_font(path)
+    return font.getGlyphSet(location=dict(location) or None)
+
+
+def font_location(font: TTFont, style: TextStyle) -> dict[str, float]:
+    """Return the user space location browsers would use for the style.
+
+    Like `font-optical-sizing: auto`, `opsz` follows the font size in px
+    unless `font-variation-settings` sets it.
+    """
+    if "fvar" not in font:
+        return {}
+    axes = {axis.axisTag for axis in font["fvar"].axes}
+    location = {tag: value for tag, value in style.variations.items() if tag in axes}
+    if "opsz" in axes and "opsz" not in location:
+        location["opsz"] = style.font_size
+    return location
+
+
+def render(html_path: Path, output_path: Path) -> Path:
+    """Draw the text runs of a reftest page along a single line."""
+    reftest = parse_reftest(html_path)
+
+    newDrawing()
+    newPage(PAGE_WIDTH * DEVICE_SCALE, PAGE_HEIGHT * DEVICE_SCALE)
+    fill(1)
+    rect(0, 0, PAGE_WIDTH * DEVICE_SCALE, PAGE_HEIGHT * DEVICE_SCALE)
+    scale(DEVICE_SCALE)
+    fill(0)
+
+    x, baseline = BODY_MARGIN, None
+    for text, style in reftest.runs:
+        if style.font is None or not style.font.exists():
+            logger.warning("Skipping %r in '%s': font not found", text, html_path.name)
+            continue
+
+        font, face = load_font(style.font)
+        location = font_location(font, style)
+        hb_font = hb.Font(face)
+        if location:
+            hb_font.set_variations(location)
+        buffer = hb.Buffer()
+        buffer.add_str(text)
+        buffer.guess_segment_properties()
+        hb.shape(hb_font, buffer)
+
+        units = style.font_size / face.upem
+        if baseline is None:
+            # the first line box is laid out with the metrics of the first font
+            extents = hb_font.get_font_extents("ltr")
+            ascent = extents.ascender + extents.line_gap / 2
+            baseline = PAGE_HEIGHT - BODY_MARGIN - ascent * units
+
+        glyph_set = load_glyph_set(style.font, tuple(sorted(location.items())))
+        for info, position in zip(buffer.glyph_infos, buffer.glyph_positions):
+            path = BezierPath()
+            glyph_set[font.getGlyphName(info.codepoint)].draw(path)
+            with savedState():
+                translate(
+                    x + position.x_offset * units, baseline + position.y_offset * units
+                )
+                scale(units)
+                drawPath(path)
+            x += position.x_advance * units
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    saveImage(output_path)
+    return output_path
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "reftests",
+        metavar="HTMLFILE",
+        type=Path,
+        nargs="*",
+        help="Reftest pages to render (default: all of tests/static)",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=ROOT_DIR / "out" / "reftests" / "local",
+        help="Where to write the rendered images",
+    )
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    html_paths = options.reftests or sorted(TESTS_DIR.glob("*/*.html"))
+
+    with concurrent.futures.ProcessPoolExecutor(options.jobs) as executor:
+        futures = [
+            executor.submit(
+                render,
+                html_path.resolve(),
+                options.out_dir.resolve()
+                / html_path.parent.name
+                / f"{PLATFORM}.{BROWSER}.{html_path.stem}.png",
+            )
+            for html_path in html_paths
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            output_path = future.result()
+            logger.info("Saved image: '%s'", output_path)
+
+    logger.info("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+
+"""Script to evaluate the reftest screenshots in `tests/static`.
+
+Each `<platform>.<browser>.<test>.png` is compared with the screenshots of the
+`rel="match"` and `rel="mismatch"` references of `<test>.html` taken on the
+same platform and browser. A test passes when it matches every match
+reference and differs from every mismatch reference.
+
+Pixels are compared in YIQ space with the pixelmatch algorithm, including its
+anti-aliasing detection, vectorized with numpy and spread over a process pool.
+Packed screenshots are read from their blob in `tests/screenshots`, see
+`scripts/screenshot-store.py`.
+
+Diff images and a JSON report are written to `out/reftests`. Failing
+screenshots get a generated `.fail.md` note; generated notes are refreshed or
+removed on later runs, while hand-written notes are left alone.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from reftests import (
+    GENERATED_MARKER,
+    ROOT_DIR,
+    TESTS_DIR,
+    Screenshot,
+    default_store,
+    find_reftest_html,
+    find_screenshots,
+    parse_reftest_links,
+    relative_path,
+)
+
+logger = logging.getLogger()
+
+# maximum YIQ color delta between black and white, see pixelmatch
+MAX_YIQ_DELTA = 35215
+
+PLATFORM_NAMES = {"mac": "macOS", "win": "Windows", "lnx": "Linux"}
+
+DIFF_COLOR = (255, 0, 0)
+ANTIALIASED_COLOR = (255, 255, 0)
+
+YIQ = np.array(
+    [
+        [0.29889531, 0.58662247, 0.11448223],
+        [0.59597799, -0.27417610, -0.32180189],
+        [0.21147017, -0.52261711, 0.31114694],
+    ],
+    dtype=np.float32,
+)
+
+# the 8 neighbours of a pixel
+NEIGHBOURS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+
+
+def load_rgba(path: Path) -> np.ndarray:
+    """Decode an image flattened onto white as an opaque RGBA array."""
+    image = Image.open(path).convert("RGBA")
+    if image.getextrema()[3][0] < 255:
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image)
+    return np.asarray(image)
+
+
+def to_yiq(rgba: np.ndarray) -> np.ndarray:
+    return rgba[..., :3].astype(np.float32) @ YIQ.T
+
+
+def to_brightness(rgba: np.ndarray) -> np.ndarray:
+    return rgba[..., :3].astype(np.float32) @ YIQ[0]
+
+
+def color_delta(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    d = a - b
+    return 0.5053 * d[..., 0] ** 2 + 0.299 * d[..., 1] ** 2 + 0.1957 * d[..., 2] ** 2
+
+
+def pad_to(rgba: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Pad with white so that screenshots of different sizes can be compared."""
+    if rgba.shape[:2] == (height, width):
+        return rgba
+    padded = np.full((height, width, 4), 255, dtype=np.uint8)
+    padded[: rgba.shape[0], : rgba.shape[1]] = rgba
+    return padded
+
+
+def neighbours(ys: np.ndarray, xs: np.ndarray, height: int, width: int):
+    """Yield the clipped coordinates of each neighbour and whether it is inside."""
+    for dy, dx in NEIGHBOURS:
+        ny, nx = ys + dy, xs + dx
+        inside = (ny >= 0) & (ny < height) & (nx >= 0) & (nx < width)
+        yield np.clip(ny, 0, height - 1), np.clip(nx, 0, width - 1), inside
+
+
+def on_border(ys: np.ndarray, xs: np.ndarray, height: int, width: int) -> np.ndarray:
+    return (ys == 0) | (ys == height - 1) | (xs == 0) | (xs == width - 1)
+
+
+def has_many_siblings(words: np.ndarray, ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+    """Return whether more than 2 neighbours have exactly the same color."""
+    height, width = words.shape
+    values = words[ys, xs]
+    siblings = on_border(ys, xs, height, width).astype(np.int8)
+    for ny, nx, inside in neighbours(ys, xs, height, width):
+        siblings += inside & (words[ny, nx] == values)
+    return siblings > 2
+
+
+def antialiased(
+    image: np.ndarray, other: np.ndarray, ys: np.ndarray, xs: np.ndarray
+) -> np.ndarray:
+    """Vectorized port of the pixelmatch anti-aliasing detection.
+
+    A pixel is anti-aliased when it has at most 2 neighbours of the same
+    brightness, lies between a darker and a brighter neighbour, and the
+    darkest or the brightest of those neighbours sits in a flat area of both
+    images.
+    """
+    height, width = image.shape[:2]
+    image_words, other_words = (
+        image.view(np.uint32)[..., 0],
+        other.view(np.uint32)[..., 0],
+    )
+    brightness = to_brightness(image[ys, xs])
+
+    zeroes = on_border(ys, xs, height, width).astype(np.int8)
+    min_delta = np.zeros(len(ys), dtype=np.float32)
+    max_delta = np.zeros(len(ys), dtype=np.float32)
+    min_ys, min_xs, max_ys, max_xs = ys, xs, ys, xs
+    for ny, nx, inside in neighbours(ys, xs, height, width):
+        delta = to_brightness(image[ny, nx]) - brightness
+        zeroes += inside & (delta == 0)
+        darker = inside & (delta < min_delta)
+        brighter = inside & (delta > max_delta)
+        min_delta = np.where(darker, delta, min_delta)
+        max_delta = np.where(brighter, delta, max_delta)
+        min_ys, min_xs = np.where(darker, ny, min_ys), np.where(darker, nx, min_xs)
+        max_ys, max_xs = np.where(brighter, ny, max_ys), np.where(brighter, nx, max_xs)
+
+    gradient = (zeroes <= 2) & (min_delta < 0) & (max_delta > 0)
+    flat_darkest = has_many_siblings(image_words, min_ys, min_xs) & has_many_siblings(
+        other_words, min_ys, min_xs
+    )
+    flat_brightest = has_many_siblings(image_words, max_ys, max_xs) & has_many_siblings(
+        other_words, max_ys, max_xs
+    )
+    return gradient & (flat_darkest | flat_brightest)
+
+
+def diff_images(
+    a: np.ndarray, b: np.ndarray, threshold: float, include_aa: bool
+) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]:
+    """Return the (ys, xs) coordinates of the differing and anti-aliased pixels."""
+    height, width = max(a.shape[0], b.shape[0]), max(a.shape[1], b.shape[1])
+    a, b = pad_to(a, height, width), pad_to(b, height, width)
+    max_delta = MAX_YIQ_DELTA * threshold * threshold
+
+    # screenshots are mostly identical, so compare whole pixels as 32-bit words
+    # and only look closer at the changed ones
+    changed = a.view(np.uint32)[..., 0] != b.view(np.uint32)[..., 0]
+    ys, xs = np.nonzero(changed)
+    keep = color_delta(to_yiq(a[ys, xs]), to_yiq(b[ys, xs])) > max_delta
+    ys, xs = ys[keep], xs[keep]
+
+    if include_aa:
+        tolerated = np.zeros(len(ys), dtype=bool)
+    else:
+        tolerated = antialiased(a, b, ys, xs) | antialiased(b, a, ys, xs)
+    return (ys[~tolerated], xs[~tolerated]), (ys[tolerated], xs[tolerated])
+
+
+def save_diff_image(
+    path: Path,
+    base: np.ndarray,
+    different: tuple[np.ndarray, np.ndarray],
+    antialiased: tuple[np.ndarray, np.ndarray],
+    size: tuple[int, int],
+) -> None:
+    """Write a faded grayscale copy of the screenshot with the diff highlighted."""
+    faded = Image.fromarray(base).convert("L").point(lambda v: 255 - (255 - v) // 10)
+    rgb = np.full((*size, 3), 255, dtype=np.uint8)
+    rgb[: base.shape[0], : base.shape[1]] = np.asarray(faded)[..., None]
+    rgb[antialiased] = ANTIALIASED_COLOR
+    rgb[different] = DIFF_COLOR
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(rgb).save(path)
+
+
+def evaluate(
+    screenshot: Screenshot,
+    references: list[tuple[str, str, Path]],
+    out_dir: Path | None,
+    threshold: float,
+    include_aa: bool,
+    max_pixels: int,
+) -> dict:
+    """Compare one test screenshot with the screenshots of its references."""
+    test_rgba = load_rgba(screenshot.file)
+    comparisons = []
+    for rel, reference, reference_file in references:
+        reference_rgba = load_rgba(reference_file)
+        different, antialiased = diff_images(
+            test_rgba, reference_rgba, threshold, include_aa
+        )
+        size = (
+            max(test_rgba.shape[0], reference_rgba.shape[0]),
+            max(test_rgba.shape[1], reference_rgba.shape[1]),
+        )
+        different_pixels = len(different[0])
+        matched = different_pixels <= max_pixels
+
+        diff_image = None
+        if out_dir is not None and different_pixels:
+            group = screenshot.path.parent.name
+            diff_image = out_dir / group / f"{screenshot.key}.{rel}.{reference}.png"
+            save_diff_image(diff_image, test_rgba, different, antialiased, size)
+            diff_image = relative_path(diff_image)
+
+        comparisons.append(
+            {
+                "rel": rel,
+                "reference": reference,
+                "different_pixels": different_pixels,
+                "antialiased_pixels": len(antialiased[0]),
+                "total_pixels": size[0] * size[1],
+                "passed": matched if rel == "match" else not matched,
+                "diff_image": diff_image,
+            }
+        )
+
+    return {
+        "screenshot": relative_path(screenshot.path),
+        "key": screenshot.key,
+        "platform": screenshot.platform,
+        "browser": screenshot.browser,
+        "test": screenshot.test,
+        "passed": all(comparison["passed"] for comparison in comparisons),
+        "comparisons": comparisons,
+    }
+
+
+def describe_failure(result: dict) -> str:
+    platform = PLATFORM_NAMES.get(result["platform"], result["platform"])
+    browser = result["browser"].title()
+    reasons = []
+    for comparison in result["comparisons"]:
+        if comparison["passed"]:
+            continue
+        if comparison["rel"] == "match":
+            reasons.append(
+                f"does not match `{comparison['reference']}` "
+                f"({comparison['different_pixels']:,} pixels differ)"
+            )
+        else:
+            reasons.append(f"matches `{comparison['reference']}`, which it should not")
+    return f"On {platform} {browser}, `{result['test']}` {' and '.join(reasons)}."
+
+
+def is_generated(fail_md: Path) -> bool:
+    return fail_md.read_text(encoding="utf-8").startswith(GENERATED_MARKER)
+
+
+def update_fail_md(screenshot: Screenshot, result: dict, write: bool) -> bool:
+    """Bring the `.fail.md` note in line with the verdict.
+
+    Return False when the recorded verdict disagrees with the new one and the
+    note could not be updated, either because `write` is off or because the
+    note was written by hand.
+    """
+    fail_md = screenshot.fail_md
+    exists = fail_md.exists()
+
+    if result["passed"]:
+        if not exists:
+            return True
+        if write and is_generated(fail_md):
+            fail_md.unlink()
+            logger.info("  Removed '%s'", relative_path(fail_md))
+            return True
+        logger.warning("'%s' passes but has a failure note", relative_path(fail_md))
+        return False
+
+    if exists and not is_generated(fail_md):
+        # hand-written notes explain the failure better than we can
+        return True
+    if not write:
+        if not exists:
+            logger.warning("'%s' fails without a failure note", screenshot.key)
+            return False
+        return True
+    fail_md.write_text(f"{GENERATED_MARKER}\n\n{describe_failure(result)}\n")
+    logger.info("  Wrote '%s'", relative_path(fail_md))
+    return True
+
+
+def plan(
+    root_dir: Path, store_dir: Path | None
+) -> list[tuple[Screenshot, list[tuple[str, str, Path]]]]:
+    """Pair every test screenshot with the files of its references."""
+    links_by_html: dict[Path, dict[str, list[str]]] = {}
+    screenshots = find_screenshots(root_dir, store_dir)
+    by_path = {screenshot.path: screenshot for screenshot in screenshots}
+    tasks = []
+    for screenshot in screenshots:
+        html = find_reftest_html(screenshot)
+        if not html.exists():
+            logger.warning("No reftest for '%s'", relative_path(screenshot.path))
+            continue
+        if html not in links_by_html:
+            links_by_html[html] = parse_reftest_links(html)
+        references = []
+        for rel, stems in links_by_html[html].items():
+            for stem in stems:
+                reference_path = screenshot.path.with_name(
+                    f"{screenshot.platform}.{screenshot.browser}.{stem}.png"
+                )
+                if reference_path not in by_path:
+                    logger.warning(
+                        "Missing %s reference '%s' for '%s'",
+                        rel,
+                        reference_path.name,
+                        relative_path(screenshot.path),
+                    )
+                    continue
+                references.append((rel, stem, by_path[reference_path].file))
+        if references:
+            tasks.append((screenshot, references))
+    return tasks
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--root", type=Path, default=TESTS_DIR, help="Reftest directory"
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        help="Screenshot store of the reftests (default: tests/screenshots "
+        "for tests/static)",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=ROOT_DIR / "out" / "reftests",
+        help="Where to write diff images and verdicts.json",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Color difference threshold between 0 and 1 (default: 0.1)",
+    )
+    parser.add_argument(
+        "--include-aa",
+        action="store_true",
+        help="Count anti-aliased pixels as different",
+    )
+    parser.add_argument(
+        "--max-pixels",
+        type=int,
+        default=0,
+        help="Differing pixels still counted as a match (default: 0)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Write nothing; exit 1 if a verdict disagrees with the .fail.md notes",
+    )
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if not options.root.exists():
+        parser.error(f"directory not found: {options.root}")
+
+    out_dir = None if options.check else options.out_dir.resolve()
+    root_dir = options.root.resolve()
+    tasks = plan(root_dir, options.store or default_store(root_dir))
+
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(options.jobs) as executor:
+        futures = {
+            executor.submit(
+                evaluate,
+                screenshot,
+                references,
+                out_dir,
+                options.threshold,
+                options.include_aa,
+                options.max_pixels,
+            ): screenshot
+            for screenshot, references in tasks
+        }
+        for future in concurrent.futures.as_completed(futures):
+            results.append((futures[future], future.result()))
+    results.sort(key=lambda item: item[1]["screenshot"])
+
+    consistent = True
+    for screenshot, result in results:
+        print(f"{'PASS' if result['passed'] else 'FAIL'} {result['screenshot']}")
+        consistent &= update_fail_md(screenshot, result, write=not options.check)
+
+    failed = sum(not result["passed"] for _, result in results)
+    print(f"{len(results) - failed} passed, {failed} failed")
+
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        report = out_dir / "verdicts.json"
+        report.write_text(json.dumps([result for _, result in results], indent=2))
+        logger.info("Saved report: '%s'", report)
+
+    if options.check and not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
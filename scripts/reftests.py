@@ -0,0 +1,316 @@
+"""Shared helpers for the reftests in `tests/static`.
+
+Screenshots are named `<platform>.<browser>.<test>.png`, where `<test>` is the
+stem of the reftest HTML file in the same directory. Failure notes use the
+same stem with a `.fail.md` extension, and `composited.<test>.png` images are
+generated by `scripts/composited-images.py`.
+
+Screenshots packed by `scripts/screenshot-store.py` are kept once per unique
+image in `tests/screenshots`, whose `manifest.json` maps their paths relative
+to `tests/static` to the blobs. `find_screenshots` resolves them through the
+manifest, next to the PNGs captured since the last pack.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+
+from PIL import Image
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TESTS_DIR = ROOT_DIR / "tests" / "static"
+STORE_DIR = ROOT_DIR / "tests" / "screenshots"
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+BLOBS_DIR = "blobs"
+
+COMPOSITED_PREFIX = "composited."
+FAIL_SUFFIX = ".fail.md"
+# first line of the failure notes written by scripts/reftest-verdicts.py
+GENERATED_MARKER = (
+    "<!-- Generated by scripts/reftest-verdicts.py. "
+    "Delete this line to keep manual edits. -->"
+)
+
+
+@dataclass(frozen=True)
+class Screenshot:
+    """A screenshot at `path` in its reftest group, with its pixels in `file`.
+
+    `file` is the path itself for loose PNGs, and the blob of packed ones.
+    """
+
+    path: Path
+    platform: str
+    browser: str
+    test: str
+    file: Path
+
+    @property
+    def key(self) -> str:
+        """The `<platform>.<browser>.<test>` name shared with `.fail.md` files."""
+        return f"{self.platform}.{self.browser}.{self.test}"
+
+    @property
+    def fail_md(self) -> Path:
+        return self.path.with_name(self.key + FAIL_SUFFIX)
+
+
+def parse_screenshot(path: Path, file: Path | None = None) -> Screenshot | None:
+    """Split a screenshot file name, or return None for composites and strays."""
+    if path.suffix != ".png" or path.name.startswith(COMPOSITED_PREFIX):
+        return None
+    parts = path.stem.split(".")
+    if len(parts) < 3:
+        return None
+    return Screenshot(path, parts[0], parts[1], ".".join(parts[2:]), file or path)
+
+
+def relative_path(path: Path) -> str:
+    """Return a path relative to the repository, or absolute outside of it."""
+    path = path.resolve()
+    if path.is_relative_to(ROOT_DIR):
+        return path.relative_to(ROOT_DIR).as_posix()
+    return path.as_posix()
+
+
+def load_manifest(store_dir: Path) -> dict:
+    manifest_path = store_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"version": MANIFEST_VERSION, "blobs": {}, "screenshots": {}}
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(
+            f"Unsupported manifest version {manifest.get('version')!r} "
+            f"in '{manifest_path}'"
+        )
+    return manifest
+
+
+def blob_path(store_dir: Path, blob_hash: str) -> Path:
+    return store_dir / BLOBS_DIR / f"{blob_hash}.png"
+
+
+def default_store(root_dir: Path) -> Path | None:
+    """Return the screenshot store of a reftest directory, if it has one."""
+    return STORE_DIR if root_dir.resolve() == TESTS_DIR else None
+
+
+def screenshot_files(root_dir: Path, store_dir: Path | None) -> dict[Path, Path]:
+    """Return the file holding the pixels of each PNG, by its path in `root_dir`.
+
+    Packed screenshots resolve to their blob in `store_dir`, and PNGs still in
+    `root_dir` to themselves, as they were captured after the last pack.
+    """
+    files = {}
+    if store_dir is not None:
+        for name, blob_hash in load_manifest(store_dir)["screenshots"].items():
+            files[root_dir / name] = blob_path(store_dir, blob_hash)
+    for png in root_dir.rglob("*.png"):
+        files[png] = png
+    return dict(sorted(files.items()))
+
+
+def find_screenshots(
+    root_dir: Path = TESTS_DIR, store_dir: Path | None = STORE_DIR
+) -> list[Screenshot]:
+    screenshots = (
+        parse_screenshot(path, file)
+        for path, file in screenshot_files(root_dir, store_dir).items()
+    )
+    return [screenshot for screenshot in screenshots if screenshot is not None]
+
+
+def pixel_hash(path: Path) -> tuple[str, tuple[int, int]]:
+    """Return the SHA-256 of the decoded RGBA pixels and the image size."""
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+        digest = hashlib.sha256()
+        digest.update(b"%dx%d:" % image.size)
+        digest.update(image.tobytes())
+        return digest.hexdigest(), image.size
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    """The computed font properties of a run of text."""
+
+    font: Path | None
+    font_size: float
+    variations: dict[str, float]
+
+
+@dataclass(frozen=True)
+class Reftest:
+    path: Path
+    links: dict[str, list[str]]
+    runs: list[tuple[str, TextStyle]]
+
+
+# browser defaults for pages without a font-size
+DEFAULT_FONT_SIZE = 16.0
+
+_VOID_TAGS = {"br", "img", "link", "meta"}
+_SKIPPED_TAGS = {"script", "style", "title"}
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_CSS_URL_RE = re.compile(r"url\(\s*(['\"]?)(.*?)\1\s*\)")
+_CSS_ESCAPE_RE = re.compile(r"\\(.)")
+_CSS_VARIATION_RE = re.compile(r"[\"'](.{4})[\"']\s+(-?[\d.]+)")
+
+
+class _ReftestParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links: dict[str, list[str]] = {"match": [], "mismatch": []}
+        self.css: list[str] = []
+        self.runs: list[tuple[str, tuple[str, ...]]] = []
+        self._stack: list[tuple[str, list[str]]] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        if tag == "link":
+            rel = (attributes.get("rel") or "").lower()
+            href = attributes.get("href")
+            if rel in self.links and href:
+                self.links[rel].append(href)
+        if tag not in _VOID_TAGS:
+            self._stack.append((tag, (attributes.get("class") or "").split()))
+
+    def handle_endtag(self, tag):
+        # pop up to and including the matching start tag
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                del self._stack[index:]
+                break
+
+    def handle_data(self, data):
+        tags = [tag for tag, _ in self._stack]
+        if "style" in tags:
+            self.css.append(data)
+        elif not _SKIPPED_TAGS.intersection(tags):
+            classes = tuple(cls for _, classes in self._stack for cls in classes)
+            self.runs.append((data, classes))
+
+
+def _parse_declarations(block: str) -> dict[str, str]:
+    declarations = {}
+    for declaration in block.split(";"):
+        name, _, value = declaration.partition(":")
+        if value.strip():
+            declarations[name.strip().lower()] = value.strip()
+    return declarations
+
+
+def _parse_css(css: str, base_dir: Path):
+    """Return the `@font-face` sources by family and the declarations by selector."""
+    font_faces: dict[str, Path] = {}
+    rules: dict[str, dict[str, str]] = {}
+    for selector, block in _CSS_RULE_RE.findall(_CSS_COMMENT_RE.sub("", css)):
+        selector = selector.strip()
+        declarations = _parse_declarations(block)
+        if selector == "@font-face":
+            family = declarations.get("font-family", "").strip("\"' ")
+            url = _CSS_URL_RE.search(declarations.get("src", ""))
+            if family and url:
+                src = _CSS_ESCAPE_RE.sub(r"\1", url[2])
+                font_faces[family] = (base_dir / src).resolve()
+        else:
+            for name in selector.split(","):
+                rules.setdefault(name.strip(), {}).update(declarations)
+    return font_faces, rules
+
+
+def _compute_style(
+    classes: tuple[str, ...],
+    font_faces: dict[str, Path],
+    rules: dict[str, dict[str, str]],
+) -> TextStyle:
+    declarations = {}
+    for selector in ["html", "body", *(f".{cls}" for cls in classes)]:
+        declarations.update(rules.get(selector, {}))
+
+    font = None
+    for family in declarations.get("font-family", "").split(","):
+        family = family.strip("\"' ")
+        if family in font_faces:
+            font = font_faces[family]
+            break
+
+    font_size = DEFAULT_FONT_SIZE
+    if declarations.get("font-size", "").endswith("px"):
+        font_size = float(declarations["font-size"][:-2])
+
+    variations = {
+        tag: float(value)
+        for tag, value in _CSS_VARIATION_RE.findall(
+            declarations.get("font-variation-settings", "")
+        )
+    }
+    return TextStyle(font, font_size, variations)
+
+
+def _collapse_whitespace(
+    runs: list[tuple[str, tuple[str, ...]]],
+) -> list[tuple[str, tuple[str, ...]]]:
+    collapsed = []
+    previous_space = True  # strips leading whitespace
+    for text, classes in runs:
+        text = re.sub(r"\s+", " ", text)
+        if previous_space:
+            text = text.lstrip(" ")
+        if text:
+            collapsed.append((text, classes))
+            previous_space = text.endswith(" ")
+    # strip trailing whitespace
+    while collapsed and collapsed[-1][0].endswith(" "):
+        text, classes = collapsed.pop()
+        if text.rstrip(" "):
+            collapsed.append((text.rstrip(" "), classes))
+    return collapsed
+
+
+def parse_reftest(html_path: Path) -> Reftest:
+    """Parse the reference links and the styled text runs of a reftest page.
+
+    Only the subset of HTML and CSS used by the reftests is understood:
+    `@font-face` rules, `html`/`body`/`.class` rules with `font-family`,
+    `font-size` in px and `font-variation-settings`, and text in nested spans.
+    """
+    parser = _ReftestParser()
+    parser.feed(html_path.read_text(encoding="utf-8"))
+    parser.close()
+    font_faces, rules = _parse_css("".join(parser.css), html_path.parent)
+    return Reftest(
+        path=html_path,
+        links={
+            rel: [Path(href).stem for href in hrefs]
+            for rel, hrefs in parser.links.items()
+        },
+        runs=[
+            (text, _compute_style(classes, font_faces, rules))
+            for text, classes in _collapse_whitespace(parser.runs)
+        ],
+    )
+
+
+def parse_reftest_links(html_path: Path) -> dict[str, list[str]]:
+    """Return the test stems referenced by `<link rel="match|mismatch">`."""
+    return parse_reftest(html_path).links
+
+
+def find_reftest_html(screenshot: Screenshot) -> Path:
+    """Return the reftest page of a screenshot.
+
+    Screenshots rendered outside `tests/static` fall back to the page in the
+    `tests/static` directory of the same name.
+    """
+    html = screenshot.path.with_name(screenshot.test + ".html")
+    if html.exists():
+        return html
+    return TESTS_DIR / screenshot.path.parent.name / html.name
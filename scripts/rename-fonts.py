@@ -15,7 +15,8 @@ import logging
 import os
 
 from fontTools.misc.cliTools import makeOutputFileName
-from fontTools.ttLib import TTFont
+
+from fontfiles import open_font, save_font
 
 logger = logging.getLogger()
 
@@ -144,7 +145,7 @@ def main(args=None):
     for input_name in options.input_fonts:
         logger.info("Renaming font: '%s'", input_name)
 
-        font = TTFont(input_name)
+        font = open_font(input_name, cache=False)
         family_name = add_family_suffix(font, options.suffix)
 
         if options.inplace:
@@ -156,7 +157,7 @@ def main(args=None):
                 input_name = rename_file(input_name, family_name, options.suffix)
             output_name = makeOutputFileName(input_name, options.output_dir)
 
-        font.save(output_name)
+        save_font(font, output_name)
         logger.info("Saved font: '%s'", output_name)
 
         font.close()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+
+"""Script to draw the specimen images described in `documentation/specimens.toml`.
+
+Each specimen lists fonts, the axis values to sample and a layout. The
+layout is computed once per specimen and shared by all its fonts, and the
+images are rendered per font, in parallel: a worker opens a font once and
+draws every cell of every specimen that uses it in one pass. Adding a font
+or a grid is a change to the spec, not a new script.
+
+With `--format svg`, the specimens are written as SVG instead of PNG. The
+cells are shaped with HarfBuzz and written to the file as they are drawn,
+each distinct glyph outline once, as a path in a `<defs>` block before its
+first use, and the cells as `<use>` references scaled to the font size:
+
+    ./scripts/render-specimens.py            # all specimens
+    ./scripts/render-specimens.py image5     # one specimen
+    ./scripts/render-specimens.py --format svg --out-dir out/specimens
+"""
+
+import argparse
+import concurrent.futures
+import logging
+import subprocess
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+import uharfbuzz as hb
+from drawbot_skia.drawbot import (
+    fill,
+    font,
+    fontSize,
+    fontVariations,
+    line,
+    lineCap,
+    newDrawing,
+    newPage,
+    rect,
+    saveImage,
+    savedState,
+    stroke,
+    strokeWidth,
+    text,
+)
+from fontTools.misc.fixedTools import floatToFixedToStr
+from fontTools.pens.svgPathPen import SVGPathPen
+
+from fontfiles import open_font
+from specimens import ROOT_DIR, SPECIMENS_PATH, Specimen, load_specimens
+
+logger = logging.getLogger()
+
+LABEL_FONT_SIZE = 24
+LABEL_OFFSET = 50
+LABEL_FILL = 0.5
+FORMATS = ("png", "svg")
+
+
+def git_info() -> str:
+    """Return the repository URL and commit of the footer."""
+    try:
+        url = subprocess.check_output(
+            ["git", "remote", "get-url", "origin"],
+            cwd=ROOT_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        url, commit = "Unknown Repo", "Unknown Commit"
+    return (url + "at commit " + commit).replace("\n", " ")
+
+
+def draw_page(specimen: Specimen, font_path: Path, name: str, version: str, footer):
+    width, height, margin = specimen.width, specimen.height, specimen.margin
+    newPage(width, height)
+    fill(0)
+    rect(-2, -2, width + 2, height + 2)
+
+    # all the cells, with the font and size set once
+    fill(1)
+    stroke(None)
+    font(str(font_path))
+    fontSize(specimen.font_size)
+    for cell in specimen.cells:
+        fontVariations(**cell.location)
+        text(specimen.text, (cell.x, cell.y), align="center")
+        if cell.label is not None:
+            with savedState():
+                font(specimen.auxiliary_font)
+                fontSize(LABEL_FONT_SIZE)
+                fill(LABEL_FILL)
+                text(cell.label, (cell.x, cell.y - LABEL_OFFSET), align="center")
+
+    # divider lines
+    stroke(1)
+    strokeWidth(specimen.divider_width)
+    lineCap("round")
+    line((margin, height - margin * 1.5), (width - margin, height - margin * 1.5))
+    line((margin, margin * 1.5), (width - margin, margin * 1.5))
+    stroke(None)
+
+    # font name and version, repository and license
+    font(specimen.auxiliary_font)
+    fontSize(specimen.auxiliary_font_size)
+    text(name, (margin, height - margin * 1.25), align="left")
+    text(version, (width - margin, height - margin * 1.25), align="right")
+    text(footer, (margin, margin), align="left")
+    text(specimen.license, (width - margin * 0.95, margin), align="right")
+
+
+def gray(value: float) -> str:
+    """Return the SVG color of a drawbot gray level."""
+    return "#" + f"{round(value * 255):02x}" * 3
+
+
+class SVGWriter:
+    """Writes an SVG page to a file element by element.
+
+    Glyph outlines are written once each, in font units, and drawn with
+    `<use>` elements that scale and flip them into the page, whose origin is
+    at the bottom left like in drawbot.
+    """
+
+    def __init__(self, path: Path, width: float, height: float):
+        self.file = open(path, "w", encoding="utf-8")
+        self.height = height
+        self.outlines = {}
+        self.file.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{width:g}" height="{height:g}" '
+            f'viewBox="0 0 {width:g} {height:g}">\n'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.write("</svg>\n")
+        self.file.close()
+
+    def rect(self, x, y, width, height, fill):
+        self.file.write(
+            f'<rect x="{x:g}" y="{self.height - y - height:g}" '
+            f'width="{width:g}" height="{height:g}" fill="{fill}"/>\n'
+        )
+
+    def line(self, start, end, stroke, stroke_width):
+        (x1, y1), (x2, y2) = start, end
+        self.file.write(
+            f'<line x1="{x1:g}" y1="{self.height - y1:g}" '
+            f'x2="{x2:g}" y2="{self.height - y2:g}" stroke="{stroke}" '
+            f'stroke-width="{stroke_width:g}" stroke-linecap="round"/>\n'
+        )
+
+    def text(self, string, position, font_family, font_size, fill, align):
+        x, y = position
+        anchor = {"left": "start", "center": "middle", "right": "end"}[align]
+        self.file.write(
+            f'<text x="{x:g}" y="{self.height - y:g}" '
+            f"font-family={quoteattr(font_family)} "
+            f'font-size="{font_size:g}" fill="{fill}" '
+            f'text-anchor="{anchor}">{escape(string)}</text>\n'
+        )
+
+    def glyph(self, commands, x, y, scale, fill):
+        """Draw an outline in font units with its origin at (x, y)."""
+        if commands not in self.outlines:
+            self.outlines[commands] = f"g{len(self.outlines)}"
+            self.file.write(
+                f'<defs><path id="{self.outlines[commands]}" d="{commands}"/></defs>\n'
+            )
+        self.file.write(
+            f'<use xlink:href="#{self.outlines[commands]}" fill="{fill}" '
+            f'transform="matrix({scale:g} 0 0 {-scale:g} '
+            f'{x:g} {self.height - y:g})"/>\n'
+        )
+
+
+def draw_svg_text(svg, hb_font, string, cell, font_size, fill):
+    """Shape the text of a cell at its location and draw it centered."""
+    hb_font.set_variations(cell.location)
+    buffer = hb.Buffer()
+    buffer.add_str(string)
+    buffer.guess_segment_properties()
+    hb.shape(hb_font, buffer)
+
+    scale = font_size / hb_font.face.upem
+    positions = buffer.glyph_positions
+    x = cell.x - sum(position.x_advance for position in positions) * scale / 2
+    for info, position in zip(buffer.glyph_infos, positions):
+        pen = SVGPathPen(None)
+        hb_font.draw_glyph_with_pen(info.codepoint, pen)
+        commands = pen.getCommands()
+        if commands:
+            svg.glyph(
+                commands,
+                x + position.x_offset * scale,
+                cell.y + position.y_offset * scale,
+                scale,
+                fill,
+            )
+        x += position.x_advance * scale
+
+
+def draw_svg_page(svg, specimen, hb_font, name, version, footer):
+    """Draw the same page as `draw_page`, as SVG."""
+    width, height, margin = specimen.width, specimen.height, specimen.margin
+    white = gray(1)
+    svg.rect(-2, -2, width + 4, height + 4, gray(0))
+
+    for cell in specimen.cells:
+        draw_svg_text(svg, hb_font, specimen.text, cell, specimen.font_size, white)
+        if cell.label is not None:
+            svg.text(
+                cell.label,
+                (cell.x, cell.y - LABEL_OFFSET),
+                specimen.auxiliary_font,
+                LABEL_FONT_SIZE,
+                gray(LABEL_FILL),
+                "center",
+            )
+
+    for y in (height - margin * 1.5, margin * 1.5):
+        svg.line((margin, y), (width - margin, y), white, specimen.divider_width)
+
+    for string, position, align in [
+        (name, (margin, height - margin * 1.25), "left"),
+        (version, (width - margin, height - margin * 1.25), "right"),
+        (footer, (margin, margin), "left"),
+        (specimen.license, (width - margin * 0.95, margin), "right"),
+    ]:
+        svg.text(
+            string,
+            position,
+            specimen.auxiliary_font,
+            specimen.auxiliary_font_size,
+            white,
+            align,
+        )
+
+
+def render_font(
+    font_path: Path,
+    specimens: list[Specimen],
+    output_dir: Path,
+    footer: str,
+    format: str = "png",
+) -> list[Path]:
+    """Draw the specimens of one font, each to its own image."""
+    ttfont = open_font(font_path, cache=False)
+    name = ttfont["name"].getDebugName(4)
+    version = "v%s" % floatToFixedToStr(ttfont["head"].fontRevision, 16)
+    ttfont.close()
+    if format == "svg":
+        hb_font = hb.Font(hb.Face(hb.Blob.from_file_path(font_path)))
+
+    output_paths = []
+    for specimen in specimens:
+        output_path = specimen.output_path(font_path, output_dir, f".{format}")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if format == "svg":
+            with SVGWriter(output_path, specimen.width, specimen.height) as svg:
+                draw_svg_page(svg, specimen, hb_font, name, version, footer)
+        else:
+            newDrawing()
+            draw_page(specimen, font_path, name, version, footer)
+            saveImage(output_path)
+        output_paths.append(output_path)
+    return output_paths
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "names",
+        metavar="NAME",
+        nargs="*",
+        help="Specimens to draw, e.g. image5 (default: all of them)",
+    )
+    parser.add_argument(
+        "--spec",
+        type=Path,
+        default=SPECIMENS_PATH,
+        help="Specimen spec (default: documentation/specimens.toml)",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=ROOT_DIR / "documentation",
+        help="Where to write the images",
+    )
+    parser.add_argument("--format", choices=FORMATS, default="png", help="Image format")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    specimens = load_specimens(options.spec)
+    if options.names:
+        unknown = set(options.names) - {specimen.name for specimen in specimens}
+        if unknown:
+            parser.error(f"unknown specimens: {', '.join(sorted(unknown))}")
+        specimens = [
+            specimen for specimen in specimens if specimen.name in options.names
+        ]
+
+    by_font = {}
+    for specimen in specimens:
+        for font_path in specimen.fonts:
+            by_font.setdefault(font_path, []).append(specimen)
+    footer = git_info()
+
+    with concurrent.futures.ProcessPoolExecutor(options.jobs) as executor:
+        futures = [
+            executor.submit(
+                render_font,
+                font_path,
+                font_specimens,
+                options.out_dir,
+                footer,
+                options.format,
+            )
+            for font_path, font_specimens in by_font.items()
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            for output_path in future.result():
+                logger.info("Saved image: '%s'", output_path)
+
+    logger.info("Done!")
+
+
+if __name__ == "__main__":
+    main()
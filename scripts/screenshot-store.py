@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+"""Script to deduplicate the reftest screenshots in `tests/static`.
+
+Screenshots are hashed on their decoded RGBA pixels, so PNGs that only differ
+in encoding or metadata are stored once. Every unique image is kept as a
+`tests/screenshots/blobs/<hash>.png` file next to a `manifest.json` mapping
+the screenshot paths relative to `tests/static` to their blob hash:
+
+    {
+      "version": 1,
+      "blobs": {"<hash>": {"width": 2880, "height": 800, "bytes": 40213}},
+      "screenshots": {"1.1-axis-remapping/mac.chrome.avar2test-avar2.png": "<hash>"}
+    }
+
+The reftest scripts, the compositor and the website read the screenshots
+through the manifest. New screenshots are captured into `tests/static` as
+before: `pack` adds them to the store, replacing the packed entries of the
+same name, and removes them from `tests/static` unless `--keep` is given.
+To drop a screenshot, delete its line from the manifest and pack with
+`--prune`. `unpack` writes copies of the screenshots back to `tests/static`
+for tools that need the files themselves. With `--link`, they are hard links
+to the blobs instead, which are then made read-only, so that a screenshot
+captured again in place can't overwrite a blob shared with other names.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import shutil
+import stat
+from pathlib import Path
+
+from reftests import (
+    BLOBS_DIR,
+    MANIFEST_NAME,
+    STORE_DIR,
+    TESTS_DIR,
+    blob_path,
+    load_manifest,
+    pixel_hash,
+)
+
+logger = logging.getLogger()
+
+WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+
+def pack(
+    tests_dir: Path, store_dir: Path, jobs: int | None, prune: bool, keep: bool
+) -> dict:
+    manifest = load_manifest(store_dir)
+    pngs = sorted(tests_dir.rglob("*.png"))
+
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        hashes = dict(zip(pngs, executor.map(pixel_hash, pngs, chunksize=4)))
+
+    # keep the smallest encoding of each image as its blob
+    sources: dict[str, Path] = {}
+    for png, (blob_hash, _) in hashes.items():
+        source = sources.get(blob_hash)
+        if source is None or png.stat().st_size < source.stat().st_size:
+            sources[blob_hash] = png
+
+    (store_dir / BLOBS_DIR).mkdir(parents=True, exist_ok=True)
+    blobs = manifest["blobs"]
+    for blob_hash, source in sources.items():
+        blob = blob_path(store_dir, blob_hash)
+        if not blob.exists() or source.stat().st_size < blob.stat().st_size:
+            # blobs hard linked by `unpack --link` are read-only
+            blob.unlink(missing_ok=True)
+            shutil.copyfile(source, blob)
+            logger.debug("Stored blob: '%s' from '%s'", blob.name, source)
+        width, height = hashes[source][1]
+        blobs[blob_hash] = {
+            "width": width,
+            "height": height,
+            "bytes": blob.stat().st_size,
+        }
+
+    manifest["screenshots"].update(
+        (png.relative_to(tests_dir).as_posix(), blob_hash)
+        for png, (blob_hash, _) in hashes.items()
+    )
+
+    if prune:
+        used = set(manifest["screenshots"].values())
+        for blob_hash in sorted(set(blobs) - used):
+            blob_path(store_dir, blob_hash).unlink(missing_ok=True)
+            del blobs[blob_hash]
+            logger.debug("Pruned blob: '%s'", blob_hash)
+
+    manifest_path = store_dir / MANIFEST_NAME
+    manifest_path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    logger.info("Saved manifest: '%s'", manifest_path)
+
+    original_bytes = sum(png.stat().st_size for png in pngs)
+    if not keep:
+        for png in pngs:
+            png.unlink()
+            logger.debug("Moved to the store: '%s'", png)
+
+    stored_bytes = sum(blobs[blob_hash]["bytes"] for blob_hash in sources)
+    logger.warning(
+        "Packed %d screenshots as %d unique images: %.1f MB -> %.1f MB",
+        len(pngs),
+        len(sources),
+        original_bytes / 1e6,
+        stored_bytes / 1e6,
+    )
+    return manifest
+
+
+def unpack(store_dir: Path, tests_dir: Path, link: bool) -> None:
+    manifest = load_manifest(store_dir)
+    for name, blob_hash in sorted(manifest["screenshots"].items()):
+        blob = blob_path(store_dir, blob_hash)
+        if not blob.exists():
+            raise FileNotFoundError(f"Missing blob for '{name}': '{blob}'")
+        output_path = tests_dir / name
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.unlink(missing_ok=True)
+        if link:
+            blob.chmod(blob.stat().st_mode & ~WRITE_BITS)
+            try:
+                os.link(blob, output_path)
+            except OSError:
+                shutil.copyfile(blob, output_path)
+        else:
+            shutil.copyfile(blob, output_path)
+        logger.info("Restored screenshot: '%s'", output_path)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=["pack", "unpack"])
+    parser.add_argument(
+        "--tests-dir",
+        type=Path,
+        default=TESTS_DIR,
+        help="Directory of the reftest screenshots",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=STORE_DIR,
+        help="Directory of the blobs and the manifest (default: tests/screenshots)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete blobs that are no longer referenced when packing",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the packed screenshots in the tests directory",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="Hard link the read-only blobs instead of copying them when unpacking",
+    )
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if options.command == "pack":
+        pack(
+            options.tests_dir,
+            options.store,
+            options.jobs,
+            options.prune,
+            options.keep,
+        )
+    else:
+        unpack(options.store, options.tests_dir, options.link)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+"""Script to generate smaller variants of the screenshots in `tests/static`.
+
+Each screenshot and composite is saved at its captured 2x size, at 1x and as a
+thumbnail, in every requested format. Variants are named after a hash of the
+source file, `<group>/<name>.<hash>.<variant>.<format>`, so unchanged
+screenshots are skipped and stale variants are removed. Packed screenshots
+are read from their blob in `tests/screenshots`. Variants are written to
+`tests/thumbnails` by default, which the site syncs with the rest of `tests`
+and reads to serve them in place of the full screenshots. A `manifest.json`
+lists the variants of each screenshot with their dimensions and URL:
+
+    {
+      "1.1-axis-remapping/mac.chrome.avar2test-avar2.png": {
+        "hash": "<hash>",
+        "variants": [
+          {"variant": "2x", "format": "webp", "width": 2880, "height": 800,
+           "url": "/tests/thumbnails/1.1-axis-remapping/mac.chrome.avar2test-avar2.<hash>.2x.webp"},
+          ...
+        ]
+      }
+    }
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from PIL import Image, features
+
+from reftests import ROOT_DIR, TESTS_DIR, default_store, screenshot_files
+
+logger = logging.getLogger()
+
+# variant name and scale relative to the 2x screenshots
+VARIANTS = {"2x": 1, "1x": 1 / 2, "thumb": 1 / 8}
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 85, "method": 6},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+HASH_LENGTH = 12
+THUMBNAILS_DIR = ROOT_DIR / "tests" / "thumbnails"
+# where the site serves `tests/thumbnails`
+URL_PREFIX = "/tests/thumbnails/"
+
+
+def source_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+
+
+def variant_path(out_dir: Path, name: str, digest: str, variant: str, fmt: str):
+    return out_dir / f"{name.removesuffix('.png')}.{digest}.{variant}.{fmt}"
+
+
+def generate(
+    png: Path, name: str, out_dir: Path, formats: list[str], url_prefix: str
+) -> tuple[str, dict]:
+    """Save the missing variants of a screenshot and return its manifest entry."""
+    digest = source_hash(png)
+    entries = []
+    image = None
+    for variant, factor in VARIANTS.items():
+        for fmt in formats:
+            output_path = variant_path(out_dir, name, digest, variant, fmt)
+            if output_path.exists():
+                with Image.open(output_path) as existing:
+                    size = existing.size
+            else:
+                if image is None:
+                    image = Image.open(png)
+                    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+                size = (
+                    max(1, round(image.width * factor)),
+                    max(1, round(image.height * factor)),
+                )
+                resized = image
+                if size != image.size:
+                    resized = image.resize(size, Image.Resampling.LANCZOS)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                resized.save(output_path, **FORMATS[fmt])
+                logger.debug("Saved image: '%s'", output_path)
+            entries.append(
+                {
+                    "variant": variant,
+                    "format": fmt,
+                    "width": size[0],
+                    "height": size[1],
+                    "url": url_prefix + output_path.relative_to(out_dir).as_posix(),
+                }
+            )
+    return name, {"hash": digest, "variants": entries}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=TESTS_DIR,
+        help="Directory of the reftest screenshots",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=THUMBNAILS_DIR,
+        help="Where to write the variants and manifest.json",
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=list(FORMATS),
+        help="Image format to generate, may be repeated (default: all supported)",
+    )
+    parser.add_argument(
+        "--url-prefix",
+        default=URL_PREFIX,
+        help="Prefix of the variant URLs in the manifest (default: %(default)s)",
+    )
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+
+    formats = options.formats or list(FORMATS)
+    for fmt in list(formats):
+        if not features.check(fmt):
+            logger.warning("Skipping %s: not supported by this Pillow build", fmt)
+            formats.remove(fmt)
+    if not formats:
+        parser.error("no supported image format")
+
+    out_dir = options.out_dir.resolve()
+    root_dir = options.root.resolve()
+    pngs = {
+        png: file
+        for png, file in screenshot_files(root_dir, default_store(root_dir)).items()
+        if png.parent.parent == root_dir
+    }
+
+    manifest = {}
+    with concurrent.futures.ProcessPoolExecutor(options.jobs) as executor:
+        futures = [
+            executor.submit(
+                generate,
+                file,
+                png.relative_to(root_dir).as_posix(),
+                out_dir,
+                formats,
+                options.url_prefix,
+            )
+            for png, file in pngs.items()
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            name, entry = future.result()
+            manifest[name] = entry
+            logger.info("Generated variants: '%s'", name)
+
+    # remove the variants of previous versions of the screenshots
+    current = {
+        out_dir / variant["url"].removeprefix(options.url_prefix)
+        for entry in manifest.values()
+        for variant in entry["variants"]
+    }
+    for fmt in formats:
+        for stale in sorted(set(out_dir.glob(f"*/*.{fmt}")) - current):
+            stale.unlink()
+            logger.debug("Removed stale image: '%s'", stale)
+
+    manifest_path = out_dir / "manifest.json"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps(dict(sorted(manifest.items())), indent=2) + "\n", encoding="utf-8"
+    )
+    logger.info("Saved manifest: '%s'", manifest_path)
+
+
+if __name__ == "__main__":
+    main()
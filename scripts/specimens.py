@@ -0,0 +1,154 @@
+"""Shared helpers for the specimen images of `documentation/specimens.toml`.
+
+The layout of a specimen, the position and axis location of each of its
+cells, only depends on the specimen, so it is computed once when the spec is
+loaded and shared by every font the specimen is drawn with.
+"""
+
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SPECIMENS_PATH = ROOT_DIR / "documentation" / "specimens.toml"
+
+LAYOUTS = ("grid", "row")
+
+
+@dataclass(frozen=True)
+class Cell:
+    """A sample of the specimen text, centered on `x` at the baseline `y`."""
+
+    x: float
+    y: float
+    location: dict[str, float]
+    label: str | None = None
+
+
+@dataclass(frozen=True)
+class Specimen:
+    name: str
+    fonts: list[Path]
+    text: str
+    width: float
+    height: float
+    margin: float
+    font_size: float
+    cells: list[Cell]
+    license: str
+    auxiliary_font: str
+    auxiliary_font_size: float
+    divider_width: float
+
+    def output_path(
+        self, font_path: Path, output_dir: Path, suffix: str = ".png"
+    ) -> Path:
+        """Return `<name>.png`, or `<name>-<font>.png` for several fonts.
+
+        `suffix` replaces `.png` for the other output formats.
+        """
+        if len(self.fonts) == 1:
+            return output_dir / f"{self.name}{suffix}"
+        family = Path(font_path).stem.split("[")[0]
+        return output_dir / f"{self.name}-{family}{suffix}"
+
+
+def _grid_layout(spec: dict) -> tuple[float, list[Cell]]:
+    width, height, margin = spec["width"], spec["height"], spec["margin"]
+    columns, rows = spec["columns"], spec["rows"]
+    cell_w = (width - margin * 2) / len(columns["values"])
+    # extra bottom margin to separate the footer
+    cell_h = (height - margin * 3) / len(rows["values"])
+    font_size = min(cell_w / spec["text_width"], cell_h) * spec["fill"]
+    location = dict(spec.get("location", {}))
+    if "optical_sizes" in spec:
+        location["opsz"] = min(
+            spec["optical_sizes"], key=lambda value: abs(value - font_size)
+        )
+
+    cells = []
+    for r, row_value in enumerate(rows["values"]):
+        # top to bottom, below the header
+        y_center = (height - margin * 1.5) - (r * cell_h) - (cell_h / 2)
+        for c, column_value in enumerate(columns["values"]):
+            cells.append(
+                Cell(
+                    x=margin + (c * cell_w) + (cell_w / 2),
+                    y=y_center - font_size * spec["baseline"],
+                    location={
+                        **location,
+                        columns["axis"]: column_value,
+                        rows["axis"]: row_value,
+                    },
+                )
+            )
+    return font_size, cells
+
+
+def _row_layout(spec: dict) -> tuple[float, list[Cell]]:
+    width, height, margin = spec["width"], spec["height"], spec["margin"]
+    columns = spec["columns"]
+    col_w = (width - margin * 2) / len(columns["values"])
+    font_size = spec["font_size"]
+    suffix = columns.get("label_suffix", "")
+    return font_size, [
+        Cell(
+            x=margin + (i * col_w) + (col_w / 2),
+            y=height / 2 - font_size * spec["baseline"],
+            location={**spec.get("location", {}), columns["axis"]: value},
+            label=f"{value}{suffix}",
+        )
+        for i, value in enumerate(columns["values"])
+    ]
+
+
+def load_specimens(path: Path = SPECIMENS_PATH) -> list[Specimen]:
+    """Read a spec and lay out its specimens.
+
+    Font paths are relative to the repository root.
+    """
+    with open(path, "rb") as file:
+        data = tomllib.load(file)
+    defaults = data.get("defaults", {})
+    specimens = []
+    for name, values in data.get("specimens", {}).items():
+        spec = {**defaults, **values}
+        if spec.get("layout") not in LAYOUTS:
+            raise ValueError(
+                f"{path}: specimen {name!r} has layout {spec.get('layout')!r}, "
+                f"expected one of {', '.join(LAYOUTS)}"
+            )
+        if spec["layout"] == "grid":
+            font_size, cells = _grid_layout(spec)
+        else:
+            font_size, cells = _row_layout(spec)
+        specimens.append(
+            Specimen(
+                name=name,
+                fonts=[ROOT_DIR / font for font in spec["fonts"]],
+                text=spec["text"],
+                width=spec["width"],
+                height=spec["height"],
+                margin=spec["margin"],
+                font_size=font_size,
+                cells=cells,
+                license=spec["license"],
+                auxiliary_font=spec["auxiliary_font"],
+                auxiliary_font_size=spec["auxiliary_font_size"],
+                divider_width=spec["divider_width"],
+            )
+        )
+    return specimens
+
+
+def specimen_locations(
+    specimens: list[Specimen],
+) -> dict[Path, list[dict[str, float]]]:
+    """Return the locations each font is drawn at, by resolved font path."""
+    locations = {}
+    for specimen in specimens:
+        for font in specimen.fonts:
+            locations.setdefault(font.resolve(), []).extend(
+                cell.location for cell in specimen.cells
+            )
+    return locations
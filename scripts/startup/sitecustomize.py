@@ -0,0 +1,18 @@
+"""Start the profiling hooks of `scripts/profiling.py` when HOW2AVAR2_PROFILE is set.
+
+Python imports this module at startup of every process that has this directory
+on its `PYTHONPATH`, which the `profile` task of `mise.toml` sets.
+"""
+
+import os
+
+if os.environ.get("HOW2AVAR2_PROFILE"):
+    import importlib.util
+
+    _spec = importlib.util.spec_from_file_location(
+        "how2avar2_profiling",
+        os.path.join(os.path.dirname(__file__), "..", "profiling.py"),
+    )
+    _profiling = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_profiling)
+    _profiling.start_from_environment()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""Script to measure how evenly the weight and width of variable fonts progress.
+
+`sources/designspaces/avar1.designspace` and `avar2.designspace` remap the
+axes so that the weight and width progress evenly across `wght` x `wdth`.
+This script checks it on the built fonts: the outline of `H` is evaluated
+over a dense grid of user-space locations at once, with the `avar` and `gvar`
+evaluation of `scripts/variations.py`, and a horizontal line at a quarter of
+the glyph height is intersected with every outline to measure the thickness
+of the two vertical stems and the width of the counter between them.
+
+Along every line of the grid where only `wght` changes, the stem thickness
+should grow evenly, and along every line where only `wdth` changes, the
+counter width should. For each font and progression, the script prints the
+largest deviation from the straight line between the ends of a grid line, as
+a share of the change along it, the median over the grid lines, and how many
+grid lines don't progress monotonically:
+
+    ./scripts/stem-linearity.py --report out/stem-linearity.json
+
+By default, the fonts of `fonts/*/variable` with `wght` and `wdth` axes are
+measured.
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from fontfiles import open_font
+from variations import AxisMapping, evaluate_glyphs, user_grid
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT_DIR / "fonts"
+STEPS = 17
+SCAN_HEIGHT = 0.25
+# stem thickness along wght, counter width along wdth
+PROGRESSIONS = {"wght": "stem", "wdth": "counter"}
+
+
+def scanline_crossings(coordinates, end_points, height):
+    """Return the sorted x of the outline crossings of a horizontal line.
+
+    `coordinates` are of shape (locations, points, 2), without the phantom
+    points, and the line is at `height` of the outline bounds of each
+    location. Off-curve points are treated as on-curve, which is exact for
+    the straight stems of `H`. Missing crossings are NaN, at the end.
+    """
+    starts = np.concatenate([[0], np.asarray(end_points[:-1]) + 1])
+    following = np.arange(coordinates.shape[1]) + 1
+    # close each contour back to its first point
+    following[end_points] = starts
+    x0, y0 = coordinates[..., 0], coordinates[..., 1]
+    x1, y1 = x0[:, following], y0[:, following]
+
+    ys = coordinates[..., 1]
+    scan = ys.min(axis=1) + height * (ys.max(axis=1) - ys.min(axis=1))
+    scan = scan[:, np.newaxis]
+    # half-open, so that lines through a point cross once
+    crosses = (y0 <= scan) != (y1 <= scan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x0 + (scan - y0) * (x1 - x0) / (y1 - y0)
+    return np.sort(np.where(crosses, x, np.nan), axis=1)
+
+
+def measure(font, glyph_name, locations, height):
+    """Return the stem and counter widths of a glyph at user locations.
+
+    Locations where the line doesn't cross exactly two stems are NaN.
+    """
+    glyph = font["glyf"][glyph_name]
+    if glyph.isComposite():
+        raise ValueError(f"{glyph_name} is a composite glyph")
+    coords = AxisMapping(font).normalize(locations)
+    coordinates = evaluate_glyphs(font, coords, [glyph_name])[glyph_name][:, :-4]
+    crossings = scanline_crossings(coordinates, glyph.endPtsOfContours, height)
+
+    two_stems = np.count_nonzero(~np.isnan(crossings), axis=1) == 4
+    crossings = np.where(two_stems[:, np.newaxis], crossings[:, :4], np.nan)
+    stem = (
+        (crossings[:, 1] - crossings[:, 0]) + (crossings[:, 3] - crossings[:, 2])
+    ) / 2
+    counter = crossings[:, 2] - crossings[:, 1]
+    return {"stem": stem, "counter": counter}
+
+
+def progression(values, axis_values, axis_index):
+    """Rate how linearly values progress along one axis of a grid.
+
+    `values` are of the grid's shape. Returns the deviation of each grid line
+    from the straight line between its ends, as a share of the change along
+    it, and whether each grid line is monotonic.
+    """
+    lines = np.moveaxis(values, axis_index, -1)
+    lines = lines.reshape(-1, lines.shape[-1])
+    t = (axis_values - axis_values[0]) / (axis_values[-1] - axis_values[0])
+    first, last = lines[:, :1], lines[:, -1:]
+    chord = first + (last - first) * t
+    change = np.abs(last - first)[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = np.abs(lines - chord).max(axis=1) / change
+    steps = np.diff(lines, axis=1) * np.sign(last - first)
+    monotonic = (steps >= -1e-6).all(axis=1)
+    measured = ~np.isnan(lines).any(axis=1) & (change > 0)
+    return deviation[measured], monotonic[measured], measured
+
+
+def line_name(tags, grid_values, axis_index, line_index):
+    """Return the fixed axis values of a grid line, e.g. 'wdth=50 opsz=6'."""
+    shape = [len(values) for i, values in enumerate(grid_values) if i != axis_index]
+    indices = np.unravel_index(line_index, shape)
+    others = [i for i in range(len(tags)) if i != axis_index]
+    return " ".join(
+        f"{tags[i]}={grid_values[i][index]:g}" for i, index in zip(others, indices)
+    )
+
+
+def evaluate_font(path, glyph_name, steps, height):
+    font = open_font(path, cache=False)
+    mapping = AxisMapping(font)
+    tags = mapping.tags
+    grid_values, grid = user_grid(mapping.axes, steps)
+    shape = tuple(len(values) for values in grid_values)
+    measurements = measure(font, glyph_name, grid, height)
+    font.close()
+
+    result = {
+        "grid": dict(zip(tags, [len(values) for values in grid_values])),
+        "measured": int(np.count_nonzero(~np.isnan(measurements["stem"]))),
+        "locations": len(grid),
+        "progressions": {},
+    }
+    for tag, quantity in PROGRESSIONS.items():
+        if tag not in tags:
+            continue
+        axis_index = tags.index(tag)
+        deviation, monotonic, measured = progression(
+            measurements[quantity].reshape(shape), grid_values[axis_index], axis_index
+        )
+        if not len(deviation):
+            continue
+        line_indices = np.flatnonzero(measured)
+        worst = int(deviation.argmax())
+        result["progressions"][tag] = {
+            "quantity": quantity,
+            "lines": len(deviation),
+            "max_deviation": float(deviation.max()),
+            "median_deviation": float(np.median(deviation)),
+            "worst_line": line_name(tags, grid_values, axis_index, line_indices[worst]),
+            "non_monotonic": [
+                line_name(tags, grid_values, axis_index, line_indices[i])
+                for i in np.flatnonzero(~monotonic)
+            ],
+        }
+    return result
+
+
+def default_fonts():
+    paths = []
+    for path in sorted(FONTS_DIR.glob("*/variable/*.ttf")):
+        font = open_font(path, cache=False)
+        tags = {axis.axisTag for axis in font["fvar"].axes}
+        font.close()
+        if {"wght", "wdth"} <= tags:
+            paths.append(path)
+    return paths
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input_fonts",
+        metavar="FONTFILE",
+        nargs="*",
+        type=Path,
+        help="Variable fonts (default: fonts/*/variable/*.ttf with wght and wdth)",
+    )
+    parser.add_argument(
+        "--glyph", default="H", help="Glyph with two vertical stems to measure"
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=STEPS,
+        help="Grid locations along each axis",
+    )
+    parser.add_argument(
+        "--height",
+        type=float,
+        default=SCAN_HEIGHT,
+        help="Height of the measuring line, as a share of the glyph height",
+    )
+    parser.add_argument("--report", help="Write the measurements as JSON to this file")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.steps < 3:
+        parser.error("--steps must be at least 3")
+    paths = options.input_fonts or default_fonts()
+
+    report = {}
+    for path in paths:
+        result = report[path.name] = evaluate_font(
+            path, options.glyph, options.steps, options.height
+        )
+        grid = "x".join(f"{count} {tag}" for tag, count in result["grid"].items())
+        print(
+            f"{path.name}: {result['measured']} of {result['locations']} "
+            f"locations measured ({grid})"
+        )
+        if result["measured"] < result["locations"]:
+            logger.warning(
+                "%s: %s doesn't cross two stems at %d locations",
+                path.name,
+                options.glyph,
+                result["locations"] - result["measured"],
+            )
+        for tag, rating in result["progressions"].items():
+            print(
+                f"  {rating['quantity']} along {tag}: "
+                f"max deviation {rating['max_deviation']:.1%} "
+                f"at {rating['worst_line'] or 'default'}, "
+                f"median {rating['median_deviation']:.1%}, "
+                f"{len(rating['non_monotonic'])} of {rating['lines']} "
+                "lines not monotonic"
+            )
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+"""Script to map where the feature variations of fonts apply in user space.
+
+The conditions of `GSUB` feature variations, like the `wdth 50 90.02` of
+`sources/alternate-glyphs/variable-font-substitutions.fea`, are compared with
+normalized coordinates after the `avar` mapping, so the same condition
+switches glyphs at different user-space locations in each font of a family.
+
+For each font, a dense grid of user-space locations is normalized and mapped
+through `avar` (segment maps and avar2 deltas, rounded to F2Dot14 like
+HarfBuzz) as arrays, and the condition sets of every feature variation record
+are evaluated over the whole grid at once. Wherever the record that applies
+changes between neighbouring grid locations, the boundary is refined by
+bisection along that axis, so it is known to within `--tolerance` user units.
+
+For each record, the script prints the substitutions, the share and extent of
+the grid where it applies, and the range of its boundary along each axis:
+
+    ./scripts/substitution-regions.py --report out/substitution-regions.json
+
+By default, the fonts of `fonts/alternate-glyphs/variable` are evaluated.
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from fontfiles import open_font
+from variations import AxisMapping, to_f2dot14, user_grid
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT_DIR / "fonts" / "alternate-glyphs" / "variable"
+NO_RECORD = -1
+STEPS = 33
+TOLERANCE = 1e-4
+
+
+def condition_sets(font):
+    """Return the axis ranges of each feature variation record, in F2Dot14."""
+    if "GSUB" not in font or font["GSUB"].table.FeatureVariations is None:
+        return []
+    records = []
+    for record in font["GSUB"].table.FeatureVariations.FeatureVariationRecord:
+        ranges = []
+        for condition in record.ConditionSet.ConditionTable:
+            if condition.Format != 1:
+                logger.warning(
+                    "Condition format %d is not supported, ignoring the record",
+                    condition.Format,
+                )
+                ranges = None
+                break
+            ranges.append(
+                (
+                    condition.AxisIndex,
+                    int(to_f2dot14(np.float64(condition.FilterRangeMinValue))),
+                    int(to_f2dot14(np.float64(condition.FilterRangeMaxValue))),
+                )
+            )
+        records.append(ranges)
+    return records
+
+
+def substitutions(font, record):
+    """Return the substitutions of a record, e.g. 'rlig: H -> H.condensed'."""
+    gsub = font["GSUB"].table
+    lines = []
+    for substitution in record.FeatureTableSubstitution.SubstitutionRecord:
+        tag = gsub.FeatureList.FeatureRecord[substitution.FeatureIndex].FeatureTag
+        for lookup_index in substitution.Feature.LookupListIndex:
+            lookup = gsub.LookupList.Lookup[lookup_index]
+            pairs = []
+            for subtable in lookup.SubTable:
+                if subtable.LookupType == 7:
+                    subtable = subtable.ExtSubTable
+                mapping = getattr(subtable, "mapping", None)
+                if mapping is None:
+                    pairs.append(f"lookup {lookup_index} type {subtable.LookupType}")
+                else:
+                    pairs.extend(f"{key} -> {value}" for key, value in mapping.items())
+            lines.append(f"{tag}: {', '.join(pairs)}")
+    return lines
+
+
+def matching_records(coords, records):
+    """Return the index of the record that applies at each location, or -1."""
+    matched = np.full(len(coords), NO_RECORD)
+    for index in reversed(range(len(records))):
+        if records[index] is None:
+            continue
+        applies = np.ones(len(coords), dtype=bool)
+        for axis_index, minimum, maximum in records[index]:
+            values = coords[:, axis_index]
+            applies &= (minimum <= values) & (values <= maximum)
+        # the first record whose conditions match is used
+        matched[applies] = index
+    return matched
+
+
+def refine_boundaries(mapping, records, low, high, axis_index, tolerance):
+    """Bisect between locations of shape (N, axes) whose records differ."""
+    low, high = low.copy(), high.copy()
+    low_record = matching_records(mapping.normalize(low), records)
+    while np.max(high[:, axis_index] - low[:, axis_index], initial=0) > tolerance:
+        middle = low.copy()
+        middle[:, axis_index] = (low[:, axis_index] + high[:, axis_index]) / 2
+        same = matching_records(mapping.normalize(middle), records) == low_record
+        low[same, axis_index] = middle[same, axis_index]
+        high[~same, axis_index] = middle[~same, axis_index]
+    return (low[:, axis_index] + high[:, axis_index]) / 2
+
+
+def evaluate_font(path, steps, tolerance):
+    font = open_font(path, cache=False)
+    mapping = AxisMapping(font)
+    records = condition_sets(font)
+    values, grid = user_grid(mapping.axes, steps)
+    matched = matching_records(mapping.normalize(grid), records)
+    shape = tuple(len(axis_values) for axis_values in values)
+    matched_grid = matched.reshape(shape)
+    grid = grid.reshape(*shape, len(mapping.tags))
+
+    results = []
+    if records:
+        feature_records = font["GSUB"].table.FeatureVariations.FeatureVariationRecord
+    for index, ranges in enumerate(records):
+        result = {
+            "substitutions": substitutions(font, feature_records[index]),
+            "conditions": None,
+        }
+        results.append(result)
+        if ranges is None:
+            continue
+        result["conditions"] = {
+            mapping.tags[axis_index]: [minimum / (1 << 14), maximum / (1 << 14)]
+            for axis_index, minimum, maximum in ranges
+        }
+        inside = matched_grid == index
+        result["share"] = float(inside.mean())
+        result["extent"] = {
+            tag: (
+                [float(grid[..., i][inside].min()), float(grid[..., i][inside].max())]
+                if inside.any()
+                else None
+            )
+            for i, tag in enumerate(mapping.tags)
+        }
+        result["boundaries"] = {}
+        for axis_index, tag in enumerate(mapping.tags):
+            # neighbours along the axis where one side uses the record
+            before = [slice(None)] * len(shape)
+            after = [slice(None)] * len(shape)
+            before[axis_index] = slice(None, -1)
+            after[axis_index] = slice(1, None)
+            before, after = tuple(before), tuple(after)
+            crossing = (inside[before] != inside[after]) & (
+                (matched_grid[before] == index) | (matched_grid[after] == index)
+            )
+            if not crossing.any():
+                continue
+            low = grid[before][crossing]
+            high = grid[after][crossing]
+            boundary = refine_boundaries(
+                mapping, records, low, high, axis_index, tolerance
+            )
+            others = [i for i in range(len(mapping.tags)) if i != axis_index]
+            result["boundaries"][tag] = {
+                "range": [float(boundary.min()), float(boundary.max())],
+                "crossings": [
+                    {
+                        **{mapping.tags[i]: float(location[i]) for i in others},
+                        tag: round(float(value), 6),
+                    }
+                    for location, value in zip(low, boundary)
+                ],
+            }
+    font.close()
+    return {"grid": [len(axis_values) for axis_values in values], "records": results}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input_fonts",
+        metavar="FONTFILE",
+        nargs="*",
+        type=Path,
+        help="Variable fonts (default: fonts/alternate-glyphs/variable/*.ttf)",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=STEPS,
+        help="Grid locations along each axis",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=TOLERANCE,
+        help="Precision of the boundaries, in user units",
+    )
+    parser.add_argument("--report", help="Write the regions as JSON to this file")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    if options.steps < 2:
+        parser.error("--steps must be at least 2")
+    paths = options.input_fonts or sorted(FONTS_DIR.glob("*.ttf"))
+
+    report = {}
+    for path in paths:
+        result = report[path.name] = evaluate_font(
+            path, options.steps, options.tolerance
+        )
+        print(f"{path.name}:")
+        if not result["records"]:
+            print("  no feature variations")
+        for index, record in enumerate(result["records"]):
+            print(f"  record {index}: {'; '.join(record['substitutions'])}")
+            if record["conditions"] is None:
+                print("    unsupported conditions")
+                continue
+            conditions = " ".join(
+                f"{tag}={minimum:g}:{maximum:g}"
+                for tag, (minimum, maximum) in record["conditions"].items()
+            )
+            print(f"    conditions (normalized): {conditions}")
+            print(
+                f"    applies at {record['share']:.1%} of "
+                f"{'x'.join(map(str, result['grid']))} locations"
+            )
+            extent = " ".join(
+                f"{tag}={low:g}:{high:g}"
+                for tag, (low, high) in (
+                    (tag, values)
+                    for tag, values in record["extent"].items()
+                    if values is not None
+                )
+            )
+            if extent:
+                print(f"    extent: {extent}")
+            for tag, boundary in record["boundaries"].items():
+                low, high = boundary["range"]
+                print(
+                    f"    boundary along {tag}: {low:.4f} to {high:.4f} "
+                    f"({len(boundary['crossings'])} crossings)"
+                )
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+
+if __name__ == "__main__":
+    main()
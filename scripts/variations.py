@@ -0,0 +1,243 @@
+"""Shared helpers to evaluate font variations at many locations at once.
+
+Locations are arrays of shape (locations, axes), in the order of the `fvar`
+axes. `AxisMapping` normalizes user-space locations and maps them through
+`avar`, rounding to F2Dot14 at each step like HarfBuzz, and
+`VarStoreEvaluator` evaluates the deltas of an item variation store (`avar`,
+`GDEF`, `HVAR`...) at the mapped locations, as matrix products.
+`evaluate_glyphs` and `evaluate_advances` apply the `gvar` and `HVAR` deltas
+of every glyph the same way.
+"""
+
+import numpy as np
+from fontTools.varLib.iup import iup_delta
+
+NO_VARIATION = 0xFFFFFFFF
+
+
+def ot_round(values):
+    """Round halves up like `otRound`, unlike `np.round` which rounds to even."""
+    return np.floor(np.asarray(values) + 0.5)
+
+
+def to_f2dot14(values):
+    return ot_round(np.asarray(values) * (1 << 14)).astype(np.int32)
+
+
+def axis_scalars(values, start, peak, end):
+    """Return the scalars of one axis of a region at normalized values.
+
+    Regions that don't apply to the axis give 1, like `supportScalar`.
+    """
+    if peak == 0 or start > peak or peak > end or (start < 0 < end):
+        return 1.0
+    scalar = np.where(
+        values < peak,
+        (values - start) / (peak - start) if peak != start else 1.0,
+        (end - values) / (end - peak) if end != peak else 1.0,
+    )
+    scalar = np.where((values <= start) | (values >= end), 0.0, scalar)
+    return np.where(values == peak, 1.0, scalar)
+
+
+def avar_var_indices(table, axis_count):
+    """Return the variation index of each axis of an `avar` 2 table."""
+    if table.VarIdxMap is not None:
+        return list(table.VarIdxMap.mapping)
+    return list(range(axis_count))
+
+
+def item_deltas(store, var_index):
+    """Return the region indices and the raw deltas of a variation index."""
+    data = store.VarData[var_index >> 16]
+    return data.VarRegionIndex, data.Item[var_index & 0xFFFF]
+
+
+def user_grid(axes, steps):
+    """Return the axis values and the locations of a grid over the `fvar` axes."""
+    values = [np.linspace(axis.minValue, axis.maxValue, steps) for axis in axes]
+    mesh = np.meshgrid(*values, indexing="ij")
+    return values, np.stack([m.ravel() for m in mesh], axis=-1)
+
+
+class VarStoreEvaluator:
+    """Evaluates the deltas of an item variation store at F2Dot14 locations."""
+
+    def __init__(self, store, coords):
+        self.store = store
+        self.scalars = self.region_scalars(coords)
+
+    def region_scalars(self, coords):
+        """Return the scalars of the regions, of shape (locations, regions)."""
+        location = coords / (1 << 14)
+        regions = self.store.VarRegionList.Region
+        scalars = np.ones((len(coords), len(regions)))
+        for region_index, region in enumerate(regions):
+            for axis_index, axis in enumerate(region.VarRegionAxis):
+                scalars[:, region_index] *= axis_scalars(
+                    location[:, axis_index],
+                    axis.StartCoord,
+                    axis.PeakCoord,
+                    axis.EndCoord,
+                )
+        return scalars
+
+    def data_deltas(self):
+        """Return the unrounded deltas of every item, by VarData.
+
+        The deltas of each VarData are of shape (locations, items).
+        """
+        return [
+            self.scalars[:, data.VarRegionIndex]
+            @ np.array(data.Item, dtype=np.float64)
+            .reshape(data.ItemCount, data.VarRegionCount)
+            .T
+            for data in self.store.VarData
+        ]
+
+    def __getitem__(self, var_index):
+        """Return the unrounded deltas of a variation index at every location."""
+        if var_index == NO_VARIATION:
+            return np.zeros(len(self.scalars))
+        region_indices, row = item_deltas(self.store, var_index)
+        return self.scalars[:, region_indices] @ np.array(row, dtype=np.float64)
+
+
+class AxisMapping:
+    """Maps user-space locations to F2Dot14 normalized coordinates."""
+
+    def __init__(self, font):
+        self.axes = font["fvar"].axes
+        self.tags = [axis.axisTag for axis in self.axes]
+        avar = font["avar"] if "avar" in font else None
+        self.segments = {}
+        self.store = None
+        if avar is None:
+            return
+        for tag, segments in avar.segments.items():
+            if segments:
+                keys, values = zip(*sorted(segments.items()))
+                self.segments[tag] = (np.array(keys), np.array(values))
+        table = getattr(avar, "table", None)
+        if avar.majorVersion >= 2 and table is not None:
+            self.store = table.VarStore
+            self.var_indices = avar_var_indices(table, len(self.tags))
+
+    def normalize(self, user):
+        """Return the F2Dot14 coordinates of user locations, after `avar`."""
+        coords = np.empty(user.shape, dtype=np.int32)
+        for index, axis in enumerate(self.axes):
+            values = np.clip(user[:, index], axis.minValue, axis.maxValue)
+            normalized = np.zeros(len(values))
+            below = values < axis.defaultValue
+            above = values > axis.defaultValue
+            if axis.defaultValue > axis.minValue:
+                normalized[below] = (values[below] - axis.defaultValue) / (
+                    axis.defaultValue - axis.minValue
+                )
+            if axis.maxValue > axis.defaultValue:
+                normalized[above] = (values[above] - axis.defaultValue) / (
+                    axis.maxValue - axis.defaultValue
+                )
+            coords[:, index] = to_f2dot14(normalized)
+            if axis.axisTag in self.segments:
+                keys, mapped = self.segments[axis.axisTag]
+                coords[:, index] = to_f2dot14(
+                    np.interp(coords[:, index] / (1 << 14), keys, mapped)
+                )
+        if self.store is not None:
+            coords = self.apply_deltas(coords)
+        return coords
+
+    def apply_deltas(self, coords):
+        deltas = VarStoreEvaluator(self.store, coords)
+        mapped = coords.copy()
+        for axis_index, var_index in enumerate(self.var_indices):
+            if var_index == NO_VARIATION:
+                continue
+            mapped[:, axis_index] = np.clip(
+                coords[:, axis_index] + ot_round(deltas[var_index]).astype(np.int32),
+                -(1 << 14),
+                1 << 14,
+            )
+        return mapped
+
+
+def glyph_metrics(font):
+    hmtx = font["hmtx"].metrics
+    vmtx = font["vmtx"].metrics if "vmtx" in font else None
+    return hmtx, vmtx
+
+
+def evaluate_glyphs(font, coords, glyph_names=None):
+    """Return the coordinates of glyphs at F2Dot14 locations.
+
+    Coordinates include the four phantom points, in an array of shape
+    (locations, points, 2). All the glyphs are evaluated by default.
+    """
+    glyf = font["glyf"]
+    variations = font["gvar"].variations if "gvar" in font else {}
+    tags = [axis.axisTag for axis in font["fvar"].axes] if "fvar" in font else []
+    location = coords / (1 << 14)
+    hmtx, vmtx = glyph_metrics(font)
+    scalars = {}
+    coordinates = {}
+    for name in glyph_names or font.getGlyphOrder():
+        base, control = glyf._getCoordinatesAndControls(name, hmtx, vmtx)
+        base = np.array(base, dtype=np.float64).reshape(-1, 2)
+        deltas = []
+        supports = []
+        for variation in variations.get(name, []):
+            delta = variation.coordinates
+            if None in delta:
+                end_points = (
+                    control[1] if control[0] >= 1 else list(range(len(control[1])))
+                )
+                delta = iup_delta(delta, base.tolist(), end_points)
+            deltas.append(delta)
+            support = tuple(sorted(variation.axes.items()))
+            if support not in scalars:
+                scalar = np.ones(len(coords))
+                for tag, (start, peak, end) in support:
+                    scalar = scalar * axis_scalars(
+                        location[:, tags.index(tag)], start, peak, end
+                    )
+                scalars[support] = scalar
+            supports.append(scalars[support])
+        if deltas:
+            # (locations, tuples) @ (tuples, points * 2)
+            matrix = np.array(supports, dtype=np.float64).T
+            deltas = np.array(deltas, dtype=np.float64).reshape(len(deltas), -1)
+            coordinates[name] = base + (matrix @ deltas).reshape(
+                len(coords), *base.shape
+            )
+        else:
+            coordinates[name] = np.broadcast_to(base, (len(coords), *base.shape))
+    return coordinates
+
+
+def evaluate_advances(font, coords, coordinates):
+    """Return the rounded advance width of every glyph at F2Dot14 locations.
+
+    `coordinates` are the outlines of `evaluate_glyphs`, whose phantom points
+    give the advances of fonts without `HVAR`.
+    """
+    glyph_order = font.getGlyphOrder()
+    if "HVAR" not in font:
+        return {
+            name: ot_round(coordinates[name][:, -3, 0] - coordinates[name][:, -4, 0])
+            for name in glyph_order
+        }
+
+    hmtx = font["hmtx"].metrics
+    hvar = font["HVAR"].table
+    deltas = VarStoreEvaluator(hvar.VarStore, coords).data_deltas()
+    advances = {}
+    for index, name in enumerate(glyph_order):
+        if hvar.AdvWidthMap is not None:
+            var_index = hvar.AdvWidthMap.mapping[name]
+        else:
+            var_index = index
+        outer, inner = var_index >> 16, var_index & 0xFFFF
+        advances[name] = hmtx[name][0] + ot_round(deltas[outer][:, inner])
+    return advances
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+"""Script to check the static instances against their variable fonts.
+
+The static instances of `fonts/` are made by the build tasks with
+`fonttools varLib.instancer` (or `./scripts/dedupe-instances.py instance`),
+whose command lines give the variable font and design location of each
+instance. For each variable font, the outlines and advance widths of every
+glyph are evaluated at all its instance locations at once: the location is
+normalized and mapped by `avar`, and the `gvar` deltas (with inferred deltas
+interpolated) and `HVAR` deltas are applied as matrix products over the
+locations. The results are compared point by point with the `glyf` and
+`hmtx` tables of the instances, after rounding.
+
+Variable fonts are checked in parallel. Every glyph that deviates is listed,
+and the script exits with an error:
+
+    ./scripts/verify-instances.py --report out/verify-instances.json
+
+`--instancer` makes more instances with an instancer command line and checks
+them too, e.g. at a location where the deltas round half-way:
+
+    ./scripts/verify-instances.py --instancer "fonttools varLib.instancer \
+      'fonts/test-font/variable/TestFont[opsz,wdth,wght].ttf' \
+      wght=700 wdth=125 opsz=16 -o out/verify-instances/TestFont-700-125-16.ttf"
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import shlex
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from fontfiles import open_font
+from variations import (
+    AxisMapping,
+    evaluate_advances,
+    evaluate_glyphs,
+    glyph_metrics,
+    ot_round,
+)
+
+logger = logging.getLogger()
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TASKS_DIR = ROOT_DIR / "mise" / "tasks"
+INSTANCER_COMMANDS = [["varLib.instancer"], ["dedupe-instances.py", "instance"]]
+
+
+def parse_instancer_command(words):
+    """Return the variable font, location and output of an instancer command."""
+    for command in INSTANCER_COMMANDS:
+        for start in range(len(words) - len(command) + 1):
+            if [Path(word).name for word in words[start : start + len(command)]] == (
+                command
+            ):
+                args = words[start + len(command) :]
+                break
+        else:
+            continue
+        break
+    else:
+        return None
+
+    varfont, location, output = None, {}, None
+    args = iter(args)
+    for arg in args:
+        if arg in ("-o", "--output"):
+            output = next(args, None)
+        elif arg.startswith("-"):
+            continue
+        elif "=" in arg:
+            tag, value = arg.split("=", 1)
+            try:
+                location[tag.strip()] = float(value)
+            except ValueError:
+                # axis ranges and "drop" make partial instances
+                return None
+        elif varfont is None:
+            varfont = arg
+    if varfont is None or output is None:
+        return None
+    return varfont, location, output
+
+
+def find_instances(tasks_dir):
+    """Return the instances made by the build tasks, by variable font."""
+    instances = {}
+    for task in sorted(tasks_dir.glob("fonts.build.*.sh")):
+        for line in task.read_text(encoding="utf-8").splitlines():
+            if line.lstrip().startswith("#"):
+                continue
+            try:
+                words = shlex.split(line)
+            except ValueError:
+                continue
+            parsed = parse_instancer_command(words)
+            if parsed is None:
+                continue
+            varfont, location, output = parsed
+            instances.setdefault(ROOT_DIR / varfont, []).append(
+                (ROOT_DIR / output, location)
+            )
+    return instances
+
+
+def user_locations(font, locations):
+    """Return design locations as an array, with the defaults of missing axes."""
+    return np.array(
+        [
+            [
+                location.get(axis.axisTag, axis.defaultValue)
+                for axis in font["fvar"].axes
+            ]
+            for location in locations
+        ],
+        dtype=np.float64,
+    ).reshape(len(locations), -1)
+
+
+def verify_variable_font(varfont_path, instances):
+    """Return the deviating glyphs of the instances of a variable font."""
+    varfont = open_font(varfont_path, cache=False)
+    coords = AxisMapping(varfont).normalize(
+        user_locations(varfont, [location for _, location in instances])
+    )
+    coordinates = evaluate_glyphs(varfont, coords)
+    advances = evaluate_advances(varfont, coords, coordinates)
+
+    results = {}
+    for index, (instance_path, location) in enumerate(instances):
+        name = instance_path.relative_to(ROOT_DIR).as_posix()
+        if not instance_path.exists():
+            results[name] = {"location": location, "error": "missing"}
+            continue
+        instance = open_font(instance_path, cache=False)
+        glyf = instance["glyf"]
+        hmtx, vmtx = glyph_metrics(instance)
+        deviations = []
+        if instance.getGlyphOrder() != varfont.getGlyphOrder():
+            instance.close()
+            results[name] = {"location": location, "error": "different glyph order"}
+            continue
+        for glyph_name in varfont.getGlyphOrder():
+            actual, _ = glyf._getCoordinatesAndControls(glyph_name, hmtx, vmtx)
+            actual = np.array(actual, dtype=np.float64).reshape(-1, 2)[:-4]
+            expected = ot_round(coordinates[glyph_name][index][:-4])
+            advance = int(advances[glyph_name][index])
+            if actual.shape != expected.shape:
+                deviations.append(
+                    {
+                        "glyph": glyph_name,
+                        "error": f"{len(actual)} points instead of {len(expected)}",
+                    }
+                )
+                continue
+            distance = np.abs(actual - expected).max(axis=1, initial=0)
+            advance_deviation = abs(hmtx[glyph_name][0] - advance)
+            if distance.size and distance.max() or advance_deviation:
+                worst = int(distance.argmax()) if distance.size else None
+                deviations.append(
+                    {
+                        "glyph": glyph_name,
+                        "max_deviation": float(distance.max(initial=0)),
+                        "points": int(np.count_nonzero(distance)),
+                        "worst_point": worst,
+                        "advance": [hmtx[glyph_name][0], advance],
+                    }
+                )
+        instance.close()
+        results[name] = {
+            "location": location,
+            "glyphs": len(varfont.getGlyphOrder()),
+            "deviations": deviations,
+        }
+    varfont.close()
+    return results
+
+
+def describe(deviation):
+    parts = []
+    if deviation["points"]:
+        parts.append(
+            f"{deviation['points']} points off by up to "
+            f"{deviation['max_deviation']:g} units (point {deviation['worst_point']})"
+        )
+    actual, expected = deviation["advance"]
+    if actual != expected:
+        parts.append(f"advance {actual} instead of {expected}")
+    return ", ".join(parts)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input_fonts",
+        metavar="FONTFILE",
+        nargs="*",
+        type=Path,
+        help="Instances to check (default: every instance made by the build tasks)",
+    )
+    parser.add_argument(
+        "--instancer",
+        metavar="COMMAND",
+        action="append",
+        default=[],
+        help="Make an instance with this instancer command line and check it too",
+    )
+    parser.add_argument("--report", help="Write the results as JSON to this file")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+
+    options = parser.parse_args(args)
+
+    if not options.verbose:
+        level = "WARNING"
+    elif options.verbose == 1:
+        level = "INFO"
+    else:
+        level = "DEBUG"
+    logging.basicConfig(level=level, format="%(message)s")
+    if options.verbose < 2:
+        logging.getLogger("fontTools").setLevel("WARNING")
+
+    instances = find_instances(TASKS_DIR)
+    if options.input_fonts:
+        selected = {path.absolute() for path in options.input_fonts}
+        instances = {
+            varfont: [item for item in items if item[0] in selected]
+            for varfont, items in instances.items()
+        }
+        instances = {varfont: items for varfont, items in instances.items() if items}
+        found = {path for items in instances.values() for path, _ in items}
+        for path in sorted(selected - found):
+            logger.warning("No build task makes '%s'", path)
+
+    for command in options.instancer:
+        words = shlex.split(command)
+        parsed = parse_instancer_command(words)
+        if parsed is None:
+            parser.error(f"not a full instancer command: {command!r}")
+        varfont, location, output = parsed
+        (ROOT_DIR / output).parent.mkdir(parents=True, exist_ok=True)
+        logger.info("Running: %s", command)
+        subprocess.run(words, cwd=ROOT_DIR, check=True)
+        instances.setdefault(ROOT_DIR / varfont, []).append(
+            (ROOT_DIR / output, location)
+        )
+
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(options.jobs) as executor:
+        futures = {
+            executor.submit(verify_variable_font, varfont, items): varfont
+            for varfont, items in instances.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            results.update(future.result())
+
+    failed = 0
+    for name, result in sorted(results.items()):
+        location = " ".join(
+            f"{tag}={value:g}" for tag, value in result["location"].items()
+        )
+        if "error" in result:
+            failed += 1
+            print(f"{name} ({location}): {result['error']}")
+        elif result["deviations"]:
+            failed += 1
+            print(
+                f"{name} ({location}): {len(result['deviations'])} of "
+                f"{result['glyphs']} glyphs deviate"
+            )
+            for deviation in result["deviations"]:
+                if "error" in deviation:
+                    print(f"  {deviation['glyph']}: {deviation['error']}")
+                else:
+                    print(f"  {deviation['glyph']}: {describe(deviation)}")
+        else:
+            logger.info("%s (%s): %d glyphs match", name, location, result["glyphs"])
+    print(f"{len(results)} instances, {failed} with deviations")
+
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as file:
+            json.dump(dict(sorted(results.items())), file, indent=2)
+            file.write("\n")
+        logger.info("Saved report: '%s'", options.report)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()